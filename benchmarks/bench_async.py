@@ -0,0 +1,72 @@
+# Benchmark: requests per second with many concurrent coroutines adding items
+# Compares calling TodoListManager from coroutines (every add writes the file on the event loop)
+# with AsyncTodoListManager (writes run in an executor and concurrent adds share them)
+# Also reports the longest time the event loop was blocked
+# Run with `python benchmarks/bench_async.py` from the repository root
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import AsyncTodoListManager, TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+from todopkg.items import SortedItemList, TodoItem  # noqa: E402
+
+COROUTINE_COUNTS = [1, 10, 100, 1_000]
+REQUESTS = 2_000
+LISTS = 10
+ITEMS_PER_LIST = 1_000
+
+def fill(manager):
+    for number in range(LISTS):
+        manager.todo_lists[f"List {number}"] = SortedItemList(
+            TodoItem(f"Task {n}", n % 10) for n in range(ITEMS_PER_LIST))
+    manager.save_to_file()
+
+# Requests per second and the longest gap between two ticks of a 1ms ticker
+async def measure(add, coroutines):
+    longest = 0.0
+    async def ticker():
+        nonlocal longest
+        previous = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            longest = max(longest, now - previous)
+            previous = now
+    async def client(number):
+        for n in range(REQUESTS // coroutines):
+            await add(f"List {(number + n) % LISTS}", f"New {number}-{n}", n % 10)
+    ticking = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(coroutines)))
+    elapsed = time.perf_counter() - start
+    # Let the ticker see the last stall
+    await asyncio.sleep(0.01)
+    ticking.cancel()
+    return REQUESTS / elapsed, longest
+
+async def run(directory, coroutines):
+    blocking = TodoListManager(os.path.join(directory, f"sync-{coroutines}.json"))
+    shutdown.unregister(blocking)
+    fill(blocking)
+    async def blocking_add(name, item, priority):
+        return blocking.add_item_to_todo_list(name, item, priority)
+    manager = await AsyncTodoListManager.open(os.path.join(directory, f"async-{coroutines}.json"))
+    shutdown.unregister(manager.manager)
+    fill(manager.manager)
+    return await measure(blocking_add, coroutines), await measure(manager.add_item_to_todo_list, coroutines)
+
+def main():
+    print(f"{LISTS} lists of {ITEMS_PER_LIST} items, {REQUESTS} adds")
+    print(f"{'coroutines':>10} {'sync req/s':>11} {'sync stall (ms)':>16} {'async req/s':>12} {'async stall (ms)':>17}")
+    with tempfile.TemporaryDirectory() as directory:
+        for coroutines in COROUTINE_COUNTS:
+            (sync_rate, sync_stall), (async_rate, async_stall) = asyncio.run(run(directory, coroutines))
+            print(f"{coroutines:>10} {sync_rate:>11.0f} {sync_stall * 1e3:>16.1f} {async_rate:>12.0f} {async_stall * 1e3:>17.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Benchmark: saving, opening and updating a 1M item store in the json and binary snapshot formats
+# Run with `python benchmarks/bench_binary.py` from the repository root
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+from todopkg.items import SortedItemList, TodoItem  # noqa: E402
+from todopkg.storage import convert_store, open_backend  # noqa: E402
+
+ITEM_COUNT = 1_000_000
+LIST_COUNT = 100
+
+def build_store():
+    lists = {}
+    for n in range(LIST_COUNT):
+        lists[f"List {n}"] = SortedItemList(
+            TodoItem(f"Task {i}", i % 7 if i % 5 else None,
+                     date(2023, i % 12 + 1, i % 28 + 1) if i % 3 else None)
+            for i in range(n, ITEM_COUNT, LIST_COUNT))
+    return lists
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    todo_lists = build_store()
+    print(f"{ITEM_COUNT:,} items in {LIST_COUNT} lists")
+    print(f"{'format':>8} {'save (s)':>10} {'open (s)':>10} {'add (s)':>10} {'size (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, extension in (('json', '.json'), ('binary', '.tdb')):
+            filename = os.path.join(tmp, 'store' + extension)
+            saved, _ = timed(open_backend(filename).save, todo_lists)
+            opened, manager = timed(TodoListManager, filename)
+            shutdown.unregister(manager)  # the temporary store is gone by exit time
+            assert manager.todo_lists == todo_lists
+            # Adding an item rewrites the file, unchanged lists reuse what the previous write encoded
+            manager.save_to_file()
+            added, _ = timed(manager.add_item_to_todo_list, "List 0", "New task", 1)
+            print(f"{name:>8} {saved:>10.2f} {opened:>10.2f} {added:>10.2f} {os.path.getsize(filename) / 1e6:>10.1f}")
+        converted, _ = timed(convert_store, os.path.join(tmp, 'store.json'), os.path.join(tmp, 'converted.tdb'))
+        print(f"json to binary conversion: {converted:.2f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# Benchmark: CLI commands on a 100k item store, each loading and saving the store or sent to a daemon
+# Run with `python benchmarks/bench_cli.py` from the repository root
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+LIST_COUNT = 100
+ITEMS_PER_LIST = 1_000
+COMMANDS = 20
+
+def write_store(filename):
+    data = {
+        f"List {n}": [
+            {'item': f"Task {i}", 'priority': i % 5, 'due_date': f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}
+            for i in range(ITEMS_PER_LIST)
+        ]
+        for n in range(LIST_COUNT)
+    }
+    with open(filename, 'w') as f:
+        json.dump(data, f)
+
+def cli(filename, *args):
+    subprocess.run([sys.executable, "-m", "todopkg", "--file", filename, *args],
+                   env=dict(os.environ, PYTHONPATH=SRC), check=True, stdout=subprocess.DEVNULL)
+
+# Seconds per add command, every command is a new python process
+def time_commands(filename, label):
+    start = time.perf_counter()
+    for n in range(COMMANDS):
+        cli(filename, "add", "List 42", f"{label} task {n}", "-p", "1")
+    return (time.perf_counter() - start) / COMMANDS
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "todo.json")
+        write_store(filename)
+        local = time_commands(filename, "Local")
+        daemon = subprocess.Popen([sys.executable, "-m", "todopkg", "--file", filename, "daemon"],
+                                  env=dict(os.environ, PYTHONPATH=SRC), stdout=subprocess.PIPE, text=True)
+        daemon.stdout.readline()
+        try:
+            served = time_commands(filename, "Daemon")
+        finally:
+            cli(filename, "stop")
+            daemon.wait()
+    print(f"{LIST_COUNT * ITEMS_PER_LIST:,} items, {COMMANDS} add commands")
+    print(f"  without daemon: {local * 1000:8.1f} ms per command")
+    print(f"  with daemon:    {served * 1000:8.1f} ms per command")
+
+if __name__ == '__main__':
+    main()
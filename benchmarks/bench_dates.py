@@ -0,0 +1,74 @@
+# Benchmark: cost of parsing due dates, alone and per added item
+# Compares datetime.strptime, which every add and load used before, with parse_date with an empty
+# and a warm cache. Dates are drawn from a year of distinct days, like real stores.
+# Run with `python benchmarks/bench_dates.py` from the repository root
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+from todopkg import todopkg as manager_module  # noqa: E402
+from todopkg.dates import parse_date, parse_dates  # noqa: E402
+
+STRING_COUNT = 200_000
+ADDED_ITEMS = 50_000
+
+def strptime_date(text):
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+def date_strings(count):
+    return [f"2023-{n % 12 + 1:02d}-{n % 28 + 1:02d}" for n in range(count)]
+
+# Microseconds per string
+def time_parser(parse, strings):
+    start = time.perf_counter()
+    for text in strings:
+        parse(text)
+    return (time.perf_counter() - start) / len(strings) * 1e6
+
+def time_uncached(strings):
+    return time_parser(parse_date.__wrapped__, strings)
+
+def time_bulk(strings):
+    start = time.perf_counter()
+    parse_dates(strings)
+    return (time.perf_counter() - start) / len(strings) * 1e6
+
+# Microseconds per add_item_to_todo_list call with a due date, the file is written once afterwards
+def time_adds(tmp, parse):
+    manager_module.parse_date = parse
+    try:
+        manager = TodoListManager(os.path.join(tmp, f"store_{parse.__name__}.json"))
+        shutdown.unregister(manager)  # the temporary store is gone by exit time
+        manager.create_todo_list("Work")
+        strings = date_strings(ADDED_ITEMS)
+        with manager.batch():
+            start = time.perf_counter()
+            for n, text in enumerate(strings):
+                manager.add_item_to_todo_list("Work", f"Task {n}", n % 7, text)
+            elapsed = time.perf_counter() - start
+        return elapsed / ADDED_ITEMS * 1e6
+    finally:
+        manager_module.parse_date = parse_date
+
+def main():
+    strings = date_strings(STRING_COUNT)
+    print(f"{'parser':>22} {'us/date':>9}")
+    print(f"{'strptime':>22} {time_parser(strptime_date, strings):>9.2f}")
+    print(f"{'parse_date, no cache':>22} {time_uncached(strings):>9.2f}")
+    parse_date.cache_clear()
+    print(f"{'parse_date':>22} {time_parser(parse_date, strings):>9.2f}")
+    print(f"{'parse_dates':>22} {time_bulk(strings):>9.2f}")
+    print()
+    print(f"{'add with due date':>22} {'us/item':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'strptime':>22} {time_adds(tmp, strptime_date):>9.2f}")
+        parse_date.cache_clear()
+        print(f"{'parse_date':>22} {time_adds(tmp, parse_date):>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Benchmark: cost of inserting one item into a todo list of 10^3 to 10^6 items
+# Compares SortedItemList.add with the previous append-then-sort approach
+# Run with `python benchmarks/bench_insert.py` from the repository root
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg.items import SortedItemList, item_sort_key  # noqa: E402
+
+LIST_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+MEASURED_INSERTS = 100
+
+def make_item(n):
+    return {
+        'item': f"Task {n}",
+        'priority': n % 10 if n % 4 else float('inf'),
+        'due_date': date.fromordinal(738000 + n % 365) if n % 3 else None,
+    }
+
+# Average seconds per insert into a list that already holds list_size items
+def time_sorted_insert(list_size):
+    items = SortedItemList(make_item(n) for n in range(list_size))
+    new_items = [make_item(list_size + n) for n in range(MEASURED_INSERTS)]
+    start = time.perf_counter()
+    for item_data in new_items:
+        if not items.has_item(item_data['item']):
+            items.add(item_data)
+    return (time.perf_counter() - start) / MEASURED_INSERTS
+
+def time_append_and_sort(list_size):
+    items = sorted((make_item(n) for n in range(list_size)), key=item_sort_key)
+    new_items = [make_item(list_size + n) for n in range(MEASURED_INSERTS)]
+    count = max(1, MEASURED_INSERTS * 1_000 // list_size)
+    start = time.perf_counter()
+    for item_data in new_items[:count]:
+        if all(existing['item'] != item_data['item'] for existing in items):
+            items.append(item_data)
+            items.sort(key=item_sort_key)
+    return (time.perf_counter() - start) / count
+
+def main():
+    print(f"{'items':>10} {'append+sort (us)':>17} {'sorted add (us)':>16}")
+    for list_size in LIST_SIZES:
+        legacy = time_append_and_sort(list_size)
+        sorted_add = time_sorted_insert(list_size)
+        print(f"{list_size:>10} {legacy * 1e6:>17.1f} {sorted_add * 1e6:>16.1f}")
+
+if __name__ == "__main__":
+    main()
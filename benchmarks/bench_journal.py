@@ -0,0 +1,38 @@
+# Benchmark: cost of a single add_item_to_todo_list call with and without journal mode
+# Run with `python benchmarks/bench_journal.py` from the repository root
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+
+STORE_SIZES = [1_000, 10_000, 50_000]
+MEASURED_ADDS = 200
+
+# Average seconds per add once the store already holds store_size items
+def time_adds(filename, store_size, journal):
+    manager = TodoListManager(filename, enable_auto_restore=False, journal=journal,
+                              journal_max_bytes=1 << 40, journal_max_age=float('inf'))
+    shutdown.unregister(manager)
+    manager.todo_lists["Bulk"] = [
+        {'item': f"Task {i}", 'priority': i % 7, 'due_date': None} for i in range(store_size)
+    ]
+    manager.create_todo_list("Inbox")
+    start = time.perf_counter()
+    for i in range(MEASURED_ADDS):
+        manager.add_item_to_todo_list("Inbox", f"New {i}", i % 5)
+    return (time.perf_counter() - start) / MEASURED_ADDS
+
+def main():
+    print(f"{'items':>10} {'full save (ms)':>15} {'journal (ms)':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for store_size in STORE_SIZES:
+            full = time_adds(os.path.join(tmp, f"full_{store_size}.json"), store_size, False)
+            journal = time_adds(os.path.join(tmp, f"journal_{store_size}.json"), store_size, True)
+            print(f"{store_size:>10} {full * 1000:>15.3f} {journal * 1000:>13.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Benchmark: time to open a TodoListManager against the number of stored items
+# Run with `python benchmarks/bench_load.py` from the repository root
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+
+ITEM_COUNTS = [1_000, 10_000, 50_000, 100_000]
+LIST_COUNT = 10
+
+# Write a synthetic store with item_count items spread over LIST_COUNT lists
+def write_store(filename, item_count):
+    data = {f"List {n}": [] for n in range(LIST_COUNT)}
+    for i in range(item_count):
+        data[f"List {i % LIST_COUNT}"].append({
+            'item': f"Task {i}",
+            'priority': i % 7 if i % 5 else "Infinity",
+            'due_date': f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}" if i % 3 else None,
+        })
+    with open(filename, 'w') as f:
+        json.dump(data, f)
+
+def main():
+    print(f"{'items':>10} {'open (s)':>10} {'items/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for item_count in ITEM_COUNTS:
+            filename = os.path.join(tmp, f"store_{item_count}.json")
+            write_store(filename, item_count)
+            start = time.perf_counter()
+            manager = TodoListManager(filename)
+            elapsed = time.perf_counter() - start
+            shutdown.unregister(manager)  # the temporary store is gone by exit time
+            assert sum(len(items) for items in manager.todo_lists.values()) == item_count
+            print(f"{item_count:>10} {elapsed:>10.3f} {item_count / elapsed:>12.0f}")
+
+if __name__ == "__main__":
+    main()
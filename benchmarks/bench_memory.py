@@ -0,0 +1,50 @@
+# Benchmark: memory held by 1M todo items as dictionaries and as TodoItem records
+# Run with `python benchmarks/bench_memory.py` from the repository root
+import os
+import sys
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg.items import SortedItemList, TodoItem  # noqa: E402
+
+ITEM_COUNT = 1_000_000
+
+# Item names are built up front so both representations are measured without them
+NAMES = [f"Task {n}" for n in range(ITEM_COUNT)]
+
+def priority(n):
+    return n % 10 if n % 4 else None
+
+def due_date(n):
+    return date.fromordinal(738000 + n % 365) if n % 3 else None
+
+def build_dicts():
+    return [
+        {'item': NAMES[n], 'priority': priority(n) if priority(n) is not None else float('inf'), 'due_date': due_date(n)}
+        for n in range(ITEM_COUNT)
+    ]
+
+def build_records():
+    return [TodoItem(NAMES[n], priority(n), due_date(n)) for n in range(ITEM_COUNT)]
+
+def build_sorted_list():
+    return SortedItemList(build_records())
+
+# Bytes still allocated by the structure that build returns
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+def main():
+    print(f"{'representation':>20} {'held (MB)':>10} {'peak (MB)':>10} {'bytes/item':>11}")
+    for label, build in [("dict", build_dicts), ("TodoItem", build_records), ("SortedItemList", build_sorted_list)]:
+        current, peak = measure(build)
+        print(f"{label:>20} {current / 1e6:>10.1f} {peak / 1e6:>10.1f} {current / ITEM_COUNT:>11.1f}")
+
+if __name__ == "__main__":
+    main()
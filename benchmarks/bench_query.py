@@ -0,0 +1,61 @@
+# Benchmark: top-K cross-list queries over 10^3 to 10^6 items spread across 100 lists
+# Compares TodoListManager.query with collecting, filtering and sorting every item
+# Run with `python benchmarks/bench_query.py` from the repository root
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+from todopkg.items import SortedItemList, TodoItem  # noqa: E402
+
+STORE_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LIST_COUNT = 100
+TOP_K = 10
+REPEATS = 20
+DUE_BEFORE = date.fromordinal(738000 + 180)
+
+def make_item(n):
+    return TodoItem(f"Task {n}", n % 10 if n % 4 else None,
+                    date.fromordinal(738000 + n % 365) if n % 3 else None)
+
+def make_manager(directory, store_size):
+    manager = TodoListManager(os.path.join(directory, f"todo-{store_size}.json"))
+    shutdown.unregister(manager)
+    for list_number in range(LIST_COUNT):
+        manager.todo_lists[f"List {list_number}"] = SortedItemList(
+            make_item(n) for n in range(list_number, store_size, LIST_COUNT))
+    return manager
+
+# The query without an index: filter every item of every list and sort the matches
+def full_sort_query(manager, order):
+    matches = [(name, item_data) for name, items in manager.todo_lists.items() for item_data in items
+               if item_data.due_date is not None and item_data.due_date <= DUE_BEFORE]
+    if order == 'due_date':
+        matches.sort(key=lambda entry: (entry[1].due_ordinal, entry[1].sort_key()))
+    else:
+        matches.sort(key=lambda entry: entry[1].sort_key())
+    return matches[:TOP_K]
+
+def average(function):
+    function()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        function()
+    return (time.perf_counter() - start) / REPEATS
+
+def main():
+    print(f"{'items':>10} {'order':>9} {'full sort (ms)':>15} {'query (ms)':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for store_size in STORE_SIZES:
+            manager = make_manager(directory, store_size)
+            for order in ('priority', 'due_date'):
+                full = average(lambda: full_sort_query(manager, order))
+                indexed = average(lambda: manager.query(due_before=DUE_BEFORE, limit=TOP_K, order=order))
+                print(f"{store_size:>10} {order:>9} {full * 1e3:>15.2f} {indexed * 1e3:>11.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Benchmark: printing a todo list of 10^3 to 10^5 items as a grid table
+# Compares the previous tabulate(tablefmt="grid") rendering with the built-in streaming renderer
+# Times are measured first, peak memory separately because tracemalloc slows allocations down
+# Run with `python benchmarks/bench_render.py` from the repository root
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from tabulate import tabulate  # noqa: E402
+from todopkg.items import SortedItemList, TodoItem  # noqa: E402
+from todopkg.render import write_grid  # noqa: E402
+
+LIST_SIZES = [1_000, 10_000, 100_000]
+
+# Stream that discards what is written, so only rendering is measured
+class NullStream:
+    def write(self, text):
+        pass
+
+def make_items(list_size):
+    return SortedItemList(TodoItem(f"Task {n}", n % 10 if n % 4 else None,
+                                   date.fromordinal(738000 + n % 365) if n % 3 else None) for n in range(list_size))
+
+def render_tabulate(items, stream):
+    table = []
+    for item in items:
+        priority = 'N/A' if item['priority'] == float('inf') else item['priority']
+        due_date = item['due_date'].strftime('%Y-%m-%d') if item['due_date'] else 'No due date'
+        table.append([item['item'], priority, due_date])
+    stream.write(tabulate(table, ["Item", "Priority", "Due Date"], tablefmt="grid") + "\n")
+
+def render_grid(items, stream):
+    write_grid(stream, items)
+
+def render_sample(items, stream):
+    write_grid(stream, items, sample=100)
+
+def timed(render, items):
+    start = time.perf_counter()
+    render(items, NullStream())
+    return time.perf_counter() - start
+
+def peak(render, items):
+    tracemalloc.start()
+    render(items, NullStream())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def main():
+    renderers = [('tabulate', render_tabulate), ('grid', render_grid), ('sample=100', render_sample)]
+    print(f"{'items':>8} {'renderer':>11} {'seconds':>8} {'peak MB':>8}")
+    for list_size in LIST_SIZES:
+        items = make_items(list_size)
+        for label, render in renderers:
+            seconds = timed(render, items)
+            print(f"{list_size:>8} {label:>11} {seconds:>8.3f} {peak(render, items) / 2**20:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Benchmark: save_to_file with json.dump and CustomEncoder against JsonStoreWriter
+# Run with `python benchmarks/bench_save.py` from the repository root
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import CustomEncoder  # noqa: E402
+from todopkg.items import SortedItemList, TodoItem  # noqa: E402
+from todopkg.writer import JsonStoreWriter  # noqa: E402
+
+ITEM_COUNTS = [10_000, 100_000, 1_000_000]
+LIST_COUNT = 100
+
+def build_store(item_count):
+    todo_lists = {f"List {n}": [] for n in range(LIST_COUNT)}
+    for i in range(item_count):
+        todo_lists[f"List {i % LIST_COUNT}"].append(TodoItem(
+            f"Task {i}", i % 7 if i % 5 else None, date.fromordinal(738000 + i % 365) if i % 3 else None))
+    return {name: SortedItemList(items) for name, items in todo_lists.items()}
+
+def time_call(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def main():
+    print(f"{'items':>10} {'json.dump (s)':>14} {'writer (s)':>11} {'1 list changed (s)':>19}")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "store.json")
+        for item_count in ITEM_COUNTS:
+            todo_lists = build_store(item_count)
+
+            def dump():
+                with open(filename, 'w') as f:
+                    json.dump(todo_lists, f, cls = CustomEncoder)
+            writer = JsonStoreWriter()
+            dumped = time_call(dump)
+            written = time_call(lambda: writer.write(filename, todo_lists))
+            todo_lists["List 0"].add(TodoItem("New task", 1))
+            rewritten = time_call(lambda: writer.write(filename, todo_lists))
+            print(f"{item_count:>10} {dumped:>14.3f} {written:>11.3f} {rewritten:>19.3f}")
+
+if __name__ == "__main__":
+    main()
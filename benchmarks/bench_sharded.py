@@ -0,0 +1,68 @@
+# Benchmark: json file against a sharded store for many todo lists
+# Times adding one item and renaming one list, which rewrite the whole json file but only one
+# shard or only the manifest of a sharded store, and opening the store with and without a pool.
+# The first write after opening a store copies every list, later ones only the changed lists.
+# Run with `python benchmarks/bench_sharded.py` from the repository root
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+from todopkg.storage import ShardedJsonBackend  # noqa: E402
+
+LIST_COUNT = 5_000
+ITEMS_PER_LIST = 40
+SHARD_COUNT = 64
+POOLS = [(1, 'thread'), (4, 'thread'), (4, 'process')]
+
+def build(manager):
+    with manager.batch():
+        for n in range(LIST_COUNT):
+            manager.create_todo_list(f"List {n}")
+            manager.add_items(f"List {n}", [(f"Task {i}", i % 7, f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}")
+                                            for i in range(ITEMS_PER_LIST)])
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+def open_manager(filename, backend=None):
+    manager = TodoListManager(filename, backend=backend)
+    shutdown.unregister(manager)  # the temporary store is gone by exit time
+    return manager
+
+# Times of the first add after opening the store, a later add and a rename
+def time_changes(manager, label):
+    first_add = timed(lambda: manager.add_item_to_todo_list("List 10", f"First task {label}", 1))
+    add = timed(lambda: manager.add_item_to_todo_list("List 10", f"New task {label}", 1))
+    with contextlib.redirect_stdout(io.StringIO()):
+        rename = timed(lambda: manager.change_todo_list_name("List 20", f"Renamed {label}"))
+        manager.change_todo_list_name(f"Renamed {label}", "List 20")
+    return first_add, add, rename
+
+def main():
+    print(f"{LIST_COUNT} lists of {ITEMS_PER_LIST} items, {SHARD_COUNT} shards")
+    print(f"{'store':>22} {'first add (ms)':>15} {'add (ms)':>9} {'rename (ms)':>12} {'open (s)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = [("json file", os.path.join(tmp, "todo.json"), lambda path: None)]
+        stores += [(f"sharded, {workers} {pool}", os.path.join(tmp, "todo.shards"),
+                    lambda path, workers=workers, pool=pool: ShardedJsonBackend(path, SHARD_COUNT, workers, pool))
+                   for workers, pool in POOLS]
+        for label, filename, backend in stores:
+            if not os.path.exists(filename):
+                build(open_manager(filename, backend(filename)))
+            gc.collect()  # managers of the previous store are only freed by a collection
+            first_add, add, rename = time_changes(open_manager(filename, backend(filename)), label)
+            gc.collect()
+            load = timed(lambda: open_manager(filename, backend(filename)))
+            print(f"{label:>22} {first_add * 1e3:>15.1f} {add * 1e3:>9.1f} {rename * 1e3:>12.1f} {load:>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Benchmark: opening a json store with 10k lists eagerly and lazily
+# Run with `python benchmarks/bench_startup.py` from the repository root
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+
+LIST_COUNT = 10_000
+ITEMS_PER_LIST = 20
+
+def write_store(filename):
+    data = {
+        f"List {n}": [
+            {'item': f"Task {i}", 'priority': i % 5, 'due_date': f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}
+            for i in range(ITEMS_PER_LIST)
+        ]
+        for n in range(LIST_COUNT)
+    }
+    with open(filename, 'w') as f:
+        json.dump(data, f)
+
+# Seconds to open the store and to read a single list, and the bytes held afterwards
+# Memory is traced in a separate run since tracemalloc slows down allocations
+def open_store(filename, **options):
+    start = time.perf_counter()
+    manager = TodoListManager(filename, **options)
+    opened = time.perf_counter() - start
+    manager.show_all_items_in_todo_list("List 42")
+    first_list = time.perf_counter() - start
+    shutdown.unregister(manager)
+    del manager
+    tracemalloc.start()
+    manager = TodoListManager(filename, **options)
+    manager.show_all_items_in_todo_list("List 42")
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    shutdown.unregister(manager)
+    return opened, first_list, current
+
+def main():
+    print(f"{LIST_COUNT} lists of {ITEMS_PER_LIST} items")
+    print(f"{'mode':>22} {'open (s)':>9} {'+1 list (s)':>12} {'memory (MB)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "store.json")
+        write_store(filename)
+        results = [("eager", open_store(filename)), ("lazy, scanning file", open_store(filename, lazy=True))]
+        # Saving in lazy mode writes the index file used by the next start
+        manager = TodoListManager(filename, lazy=True)
+        manager.save_to_file()
+        shutdown.unregister(manager)
+        del manager
+        results.append(("lazy, index file", open_store(filename, lazy=True)))
+        for label, (opened, first_list, memory) in results:
+            print(f"{label:>22} {opened:>9.3f} {first_list:>12.3f} {memory / 1e6:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# Benchmark suite: every TodoListManager operation against stores of 10^2 to 10^6 items
+# For every store size it reports operations per second and p50/p99 latency of each operation,
+# the peak memory of opening the store, and the sorts, saves and bytes written counted by an
+# instrumented manager. The manager persists every change as it does by default, so mutators
+# are timed with their write. With --autosave mutators only record their change and the numbers
+# are in-memory costs. save_to_file is timed on its own after a change to one list.
+# Results can be saved as a json baseline and later runs compared against it: operations whose
+# median latency grew by more than the threshold are reported and the exit status is 1. The
+# median is compared because ops/sec follows the mean, which a few slow calls move a lot.
+# Run with `python benchmarks/bench_suite.py` from the repository root, for example
+#   python benchmarks/bench_suite.py --sizes 100,10000 --save baseline.json
+#   python benchmarks/bench_suite.py --sizes 100,10000 --compare baseline.json
+#   python benchmarks/bench_suite.py --sizes 100,10000 --autosave
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+from todopkg.storage import convert_store  # noqa: E402
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+ITEMS_PER_LIST = 1_000
+EXTENSIONS = {'json': '.json', 'binary': '.tdb', 'sqlite': '.db', 'sharded': '.shards'}
+OPERATIONS = ['add_item_to_todo_list', 'remove_item_from_todo_list', 'query', 'print_all_todo_lists',
+              'save_to_file', 'load_from_file']
+
+# Synthetic store data with item_count items over lists of ITEMS_PER_LIST items
+# Priorities, missing priorities and due dates follow fixed proportions, the seed fixes the rest
+def generate_lists(item_count, seed=0):
+    rng = random.Random(seed)
+    list_count = max(1, item_count // ITEMS_PER_LIST)
+    lists = {f"List {n}": [] for n in range(list_count)}
+    for i in range(item_count):
+        lists[f"List {i % list_count}"].append({
+            'item': f"Task {i}",
+            'priority': rng.randrange(10) if rng.random() < 0.8 else "Infinity",
+            'due_date': f"2024-{rng.randrange(12) + 1:02d}-{rng.randrange(28) + 1:02d}" if rng.random() < 0.7 else None,
+        })
+    return lists
+
+# Write a store of item_count items with the given backend and return its path
+def generate_store(directory, item_count, backend):
+    source = os.path.join(directory, f"store_{item_count}.json")
+    with open(source, 'w') as f:
+        json.dump(generate_lists(item_count), f)
+    if backend == 'json':
+        return source
+    target = os.path.join(directory, f"store_{item_count}{EXTENSIONS[backend]}")
+    convert_store(source, target)
+    os.remove(source)
+    return target
+
+def open_manager(filename, **options):
+    manager = TodoListManager(filename, **options)
+    shutdown.unregister(manager)  # the temporary store is gone by exit time
+    return manager
+
+# Latency samples of an operation, each call gets the arguments prepare returns
+def sample(run, prepare, count):
+    latencies = []
+    for n in range(count):
+        args = prepare(n)
+        start = time.perf_counter()
+        run(*args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(latencies):
+    return {
+        'ops_per_sec': len(latencies) / sum(latencies),
+        'p50_ms': percentile(latencies, 0.50) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+        'samples': len(latencies),
+    }
+
+# Peak traced memory while the store is opened, in bytes
+def peak_memory(filename):
+    gc.collect()
+    tracemalloc.start()
+    manager = open_manager(filename)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    manager.backend.close()
+    return peak
+
+# Latency samples of every operation but load_from_file on an open manager
+def time_operations(manager, samples, slow_samples, rng):
+    names = list(manager.todo_lists)
+    results = {}
+    added = []
+
+    def add(n):
+        name = names[n % len(names)]
+        added.append(name)
+        return (name, f"Benchmark task {n}", rng.randrange(10), "2024-06-15")
+
+    def remove(n):
+        return (added[n], rng.randrange(len(manager.todo_lists[added[n]])))
+
+    # Every save follows a change to one list, unchanged lists are not encoded again
+    def change(n):
+        manager.add_item_to_todo_list(names[n % len(names)], f"Saved task {n}")
+        return ()
+
+    # Operations print their results, which is part of their cost but not worth showing
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results['add_item_to_todo_list'] = sample(manager.add_item_to_todo_list, add, samples)
+        results['remove_item_from_todo_list'] = sample(manager.remove_item_from_todo_list, remove, samples)
+        results['query'] = sample(lambda: manager.query(due_before="2024-03-01", max_priority=3, limit=10),
+                                  lambda n: (), samples)
+        results['print_all_todo_lists'] = sample(lambda name: manager.print_all_todo_lists(name, limit=50, file=devnull),
+                                                 lambda n: (names[n % len(names)],), samples)
+        results['save_to_file'] = sample(manager.save_to_file, change, slow_samples)
+    return results
+
+# Results of every operation for one store size
+# With autosave the mutators are timed without their write, so their numbers are in-memory costs
+def run_size(directory, item_count, backend, samples, autosave=False):
+    filename = generate_store(directory, item_count, backend)
+    slow_samples = max(3, samples // 20 if item_count < 100_000 else 3)
+    options = {'autosave': True, 'autosave_interval': 3600, 'autosave_max_pending': 10 ** 9} if autosave else {}
+    manager = open_manager(filename, instrument=True, **options)
+    results = time_operations(manager, samples, slow_samples, random.Random(item_count))
+    counters = manager.stats()
+    if manager.autosave is not None:
+        manager.autosave.stop()
+    manager.backend.close()
+    del manager
+    gc.collect()
+    results['load_from_file'] = sample(lambda: open_manager(filename).backend.close(), lambda n: (), slow_samples)
+    summary = {operation: summarize(results[operation]) for operation in OPERATIONS}
+    return {
+        'operations': summary,
+        'peak_memory_mb': peak_memory(filename) / 1e6,
+        'sorts': counters['sorts'],
+        'saves': counters['saves'],
+        'bytes_written': counters['bytes_written'],
+    }
+
+def print_results(item_count, result):
+    print(f"\n{item_count} items: peak memory {result['peak_memory_mb']:.1f} MB, {result['sorts']} sorts, "
+          f"{result['saves']} saves, {result['bytes_written'] / 1e6:.1f} MB written")
+    print(f"{'operation':>28} {'ops/sec':>12} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for operation, timing in result['operations'].items():
+        print(f"{operation:>28} {timing['ops_per_sec']:>12.1f} {timing['p50_ms']:>10.3f} {timing['p99_ms']:>10.3f}")
+
+# Operations whose median latency grew by more than threshold against the baseline
+def regressions(results, baseline, threshold):
+    found = []
+    for size, result in results.items():
+        for operation, timing in result['operations'].items():
+            reference = baseline.get('results', {}).get(size, {}).get('operations', {}).get(operation)
+            if reference is None:
+                continue
+            change = timing['p50_ms'] / reference['p50_ms'] - 1
+            print(f"{size:>10} {operation:>28} {change * 100:>+8.1f}%")
+            if change > threshold:
+                found.append((size, operation, change))
+    return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every TodoListManager operation.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma separated item counts")
+    parser.add_argument("--backend", choices=sorted(EXTENSIONS), default='json')
+    parser.add_argument("--autosave", action="store_true",
+                        help="time mutators without their write, as in-memory costs")
+    parser.add_argument("--samples", type=int, default=200, help="calls timed per fast operation")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a json baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a json baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 increase, 0.25 is 25%%")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {}
+    print("Mutators timed in memory, without their write (autosave)" if args.autosave
+          else "Mutators timed with their write (default persistence)")
+    with tempfile.TemporaryDirectory() as directory:
+        for item_count in sizes:
+            results[str(item_count)] = run_size(directory, item_count, args.backend, args.samples, args.autosave)
+            print_results(item_count, results[str(item_count)])
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'backend': args.backend, 'autosave': args.autosave, 'python': platform.python_version(),
+                       'machine': platform.machine(), 'results': results}, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nChange in p50 latency against {args.compare}")
+        if baseline.get('autosave', True) != args.autosave:
+            print("Warning: the baseline was measured with autosave " + ("on" if baseline.get('autosave', True) else "off"))
+        found = regressions(results, baseline, args.threshold)
+        for size, operation, change in found:
+            print(f"Regression: {operation} at {size} items is {change * 100:.1f}% slower")
+        return 1 if found else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# Benchmark: adds per second from 1 to 8 threads, each thread working on its own todo list
+# Compares calls serialized through one global lock (every add writes the file on its own) with
+# the manager's per-list locks, where threads waiting for a write share the next one
+# Run with `python benchmarks/bench_threads.py` from the repository root
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+from todopkg.items import SortedItemList, TodoItem  # noqa: E402
+
+THREAD_COUNTS = [1, 2, 4, 8]
+LISTS = 8
+ITEMS_PER_LIST = 2_500
+ADDS = 400
+MODES = [('json', {}), ('journal', {'journal': True}), ('autosave', {'autosave': True})]
+
+def make_manager(directory, label, threads, options):
+    manager = TodoListManager(os.path.join(directory, f"todo-{label}-{threads}.json"), **options)
+    shutdown.unregister(manager)
+    for number in range(LISTS):
+        manager.todo_lists[f"List {number}"] = SortedItemList(
+            TodoItem(f"Task {n}", n % 10) for n in range(ITEMS_PER_LIST))
+    manager.save_to_file()
+    return manager
+
+# Adds per second with ADDS adds spread over the given number of threads
+def throughput(manager, threads, global_lock=None):
+    def work(number):
+        for n in range(ADDS // threads):
+            if global_lock is None:
+                manager.add_item_to_todo_list(f"List {number}", f"New {n}", n % 10)
+            else:
+                with global_lock:
+                    manager.add_item_to_todo_list(f"List {number}", f"New {n}", n % 10)
+    workers = [threading.Thread(target=work, args=(number,)) for number in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    manager.flush()
+    return ADDS / (time.perf_counter() - start)
+
+def main():
+    print(f"{LISTS} lists of {ITEMS_PER_LIST} items, {ADDS} adds")
+    print(f"{'mode':>9} {'threads':>8} {'global lock (ops/s)':>20} {'list locks (ops/s)':>19}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, options in MODES:
+            for threads in THREAD_COUNTS:
+                baseline = make_manager(directory, label + '-global', threads, options)
+                serialized = throughput(baseline, threads, threading.Lock())
+                manager = make_manager(directory, label, threads, options)
+                concurrent = throughput(manager, threads)
+                for used in (baseline, manager):
+                    if used.autosave is not None:
+                        used.autosave.stop()
+                print(f"{label:>9} {threads:>8} {serialized:>20.0f} {concurrent:>19.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Benchmark: importing and exporting tasks as CSV and NDJSON
+# Imports ROW_COUNT rows spread over LIST_COUNT lists, then exports them again, and reports the
+# peak memory of the export next to the memory the store itself takes. A loop of
+# add_item_to_todo_list calls in a batch is timed on the same rows for comparison.
+# Run with `python benchmarks/bench_transfer.py` from the repository root
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+
+ROW_COUNT = 500_000
+LIST_COUNT = 50
+LOOP_ROWS = 50_000  # rows added one by one, the loop is too slow for all of them
+
+def write_csv(filename, count):
+    rng = random.Random(0)
+    with open(filename, 'w') as f:
+        f.write("list,item,priority,due_date\n")
+        for i in range(count):
+            priority = rng.randrange(10) if rng.random() < 0.8 else ''
+            due_date = f"2024-{rng.randrange(12) + 1:02d}-{rng.randrange(28) + 1:02d}" if rng.random() < 0.7 else ''
+            f.write(f"List {i % LIST_COUNT},Task {i},{priority},{due_date}\n")
+
+def open_manager(filename):
+    manager = TodoListManager(filename)
+    shutdown.unregister(manager)  # the temporary store is gone by exit time
+    return manager
+
+def timed(action):
+    start = time.perf_counter()
+    result = action()
+    return time.perf_counter() - start, result
+
+def main():
+    print(f"{ROW_COUNT} rows over {LIST_COUNT} lists")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "tasks.csv")
+        write_csv(source, ROW_COUNT)
+        with contextlib.redirect_stdout(io.StringIO()):
+            loop_manager = open_manager(os.path.join(tmp, "loop.json"))
+            rows = []
+            with open(source) as f:
+                next(f)
+                for line, _ in zip(f, range(LOOP_ROWS)):
+                    name, item, priority, due_date = line.rstrip("\n").split(",")
+                    rows.append((name, item, int(priority) if priority else None, due_date or None))
+
+            def loop():
+                with loop_manager.batch():
+                    for name, item, priority, due_date in rows:
+                        if name not in loop_manager.todo_lists:
+                            loop_manager.create_todo_list(name)
+                        loop_manager.add_item_to_todo_list(name, item, priority, due_date)
+            loop_seconds = timed(loop)[0]
+            manager = open_manager(os.path.join(tmp, "todo.json"))
+            import_seconds, report = timed(lambda: manager.import_tasks(source))
+        print(f"add_item_to_todo_list loop, {LOOP_ROWS} rows: {loop_seconds:.2f} s")
+        print(f"import_tasks csv: {import_seconds:.2f} s, {report['imported']} imported, "
+              f"{len(report['rejected'])} rejected")
+        for extension in ("csv", "ndjson"):
+            target = os.path.join(tmp, f"export.{extension}")
+            with contextlib.redirect_stdout(io.StringIO()):
+                export_seconds = timed(lambda: manager.export_tasks(target))[0]
+                # Tracing slows the export down, so memory is measured on a second export
+                gc.collect()
+                tracemalloc.start()
+                manager.export_tasks(target)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            with contextlib.redirect_stdout(io.StringIO()):
+                reader = open_manager(os.path.join(tmp, f"reimport_{extension}.json"))
+                reimport_seconds = timed(lambda: reader.import_tasks(target))[0]
+            print(f"export_tasks {extension}: {export_seconds:.2f} s, peak memory {peak / 1e6:.1f} MB, "
+                  f"{os.path.getsize(target) / 1e6:.1f} MB written; import_tasks {extension}: {reimport_seconds:.2f} s")
+        gc.collect()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            open_manager(os.path.join(tmp, "todo.json"))
+        print(f"opening the store: peak memory {tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB")
+        tracemalloc.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Benchmark: undoing a change against reading the store again
+# Undo makes the inverse of the latest change, so it costs as much as the change, while the
+# only way back before was load_from_file, which reads every list. The manager runs with
+# autosave, so changes, undos and redos are timed without the save that follows them.
+# Run with `python benchmarks/bench_undo.py` from the repository root
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+
+LIST_COUNT = 100
+ITEMS_PER_LIST = 1_000
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+def main():
+    print(f"{LIST_COUNT} lists of {ITEMS_PER_LIST} items")
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        manager = TodoListManager(os.path.join(tmp, "todo.json"), autosave=True, autosave_interval=3600,
+                                  autosave_max_pending=10 ** 9)
+        shutdown.unregister(manager)  # the temporary store is gone by exit time
+        for n in range(LIST_COUNT):
+            manager.create_todo_list(f"List {n}")
+            manager.add_items(f"List {n}", [(f"Task {i}", i % 7, f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}")
+                                            for i in range(ITEMS_PER_LIST)])
+        manager.flush()
+        changes = [("add one item", lambda: manager.add_item_to_todo_list("List 1", "New task", 3)),
+                   ("remove one item", lambda: manager.remove_item_from_todo_list("List 2", 500)),
+                   ("rename a list", lambda: manager.change_todo_list_name("List 3", "Renamed")),
+                   (f"add {ITEMS_PER_LIST} items", lambda: manager.add_items("List 5", [f"Added {i}" for i in range(ITEMS_PER_LIST)])),
+                   (f"delete a list of {ITEMS_PER_LIST}", lambda: manager.delete_todo_list("List 4"))]
+        for label, change in changes:
+            rows.append((label, timed(change), timed(manager.undo), timed(manager.redo)))
+        manager.flush()
+        load = timed(manager.load_from_file)
+        manager.autosave.stop()
+    print(f"{'change':>22} {'change (ms)':>12} {'undo (ms)':>10} {'redo (ms)':>10}")
+    for label, change, undo, redo in rows:
+        print(f"{label:>22} {change * 1e3:>12.3f} {undo * 1e3:>10.3f} {redo * 1e3:>10.3f}")
+    print(f"{'load_from_file':>22} {load * 1e3:>12.3f}")
+
+if __name__ == "__main__":
+    main()
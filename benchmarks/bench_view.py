@@ -0,0 +1,67 @@
+# Benchmark: reading one list of a 1M item binary store through TodoStoreView and TodoListManager
+# Run with `python benchmarks/bench_view.py` from the repository root
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+from todopkg.binary import BinarySnapshotWriter  # noqa: E402
+from todopkg.items import SortedItemList, TodoItem  # noqa: E402
+from todopkg.view import TodoStoreView  # noqa: E402
+
+ITEM_COUNT = 1_000_000
+LIST_COUNT = 100
+
+def write_store(filename):
+    lists = {}
+    for n in range(LIST_COUNT):
+        lists[f"List {n}"] = SortedItemList(
+            TodoItem(f"Task {i}", i % 7 if i % 5 else None,
+                     date(2023, i % 12 + 1, i % 28 + 1) if i % 3 else None)
+            for i in range(n, ITEM_COUNT, LIST_COUNT))
+    BinarySnapshotWriter().write(filename, lists)
+
+# Seconds to open the store and to show one list, and the bytes allocated by both
+# Memory is traced in a separate run since tracemalloc slows down allocations
+def read_list(open_store, filename):
+    start = time.perf_counter()
+    store = open_store(filename)
+    opened = time.perf_counter() - start
+    shown = store.show_all_items_in_todo_list("List 42")
+    elapsed = time.perf_counter() - start
+    close(store)
+    tracemalloc.start()
+    store = open_store(filename)
+    store.show_all_items_in_todo_list("List 42")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    close(store)
+    return opened, elapsed, peak, shown
+
+def close(store):
+    if isinstance(store, TodoListManager):
+        shutdown.unregister(store)  # the temporary store is gone by exit time
+    else:
+        store.close()
+    gc.collect()
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'store.tdb')
+        write_store(filename)
+        print(f"{ITEM_COUNT:,} items in {LIST_COUNT} lists, showing one list of {ITEM_COUNT // LIST_COUNT:,} items")
+        print(f"{'reader':>16} {'open (s)':>10} {'open+show (s)':>14} {'peak (MB)':>10}")
+        results = {}
+        for name, open_store in (('TodoListManager', TodoListManager), ('TodoStoreView', TodoStoreView)):
+            opened, elapsed, peak, results[name] = read_list(open_store, filename)
+            print(f"{name:>16} {opened:>10.3f} {elapsed:>14.3f} {peak / 1e6:>10.1f}")
+        assert results['TodoListManager'] == results['TodoStoreView']
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Stress test: several processes adding items to the same json store at once
+# Counts the updates lost with independent managers (last writer wins) and with shared=True
+# Run with `python benchmarks/stress_shared.py` from the repository root
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todopkg import TodoListManager  # noqa: E402
+from todopkg import shutdown  # noqa: E402
+
+PROCESSES = 8
+ADDS_PER_PROCESS = 200
+
+def worker(filename, shared, number, start):
+    manager = TodoListManager(filename, shared=shared)
+    shutdown.unregister(manager)
+    start.wait()
+    manager.create_todo_list(f"Worker {number}")
+    for n in range(ADDS_PER_PROCESS):
+        # Half of the adds go to the process's own list, half to a list every process uses
+        if n % 2:
+            manager.add_item_to_todo_list("Common", f"Task {number}-{n}")
+        else:
+            manager.add_item_to_todo_list(f"Worker {number}", f"Task {n}", n % 5)
+
+# Run every worker against a fresh store and return (lost updates, seconds)
+def run(directory, shared):
+    filename = os.path.join(directory, f"todo-{'shared' if shared else 'plain'}.json")
+    manager = TodoListManager(filename, shared=shared)
+    shutdown.unregister(manager)
+    manager.create_todo_list("Common")
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    processes = [context.Process(target=worker, args=(filename, shared, number, start))
+                 for number in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    began = time.perf_counter()
+    start.set()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - began
+    stored = TodoListManager(filename)
+    shutdown.unregister(stored)
+    count = sum(len(items) for items in stored.todo_lists.values())
+    return PROCESSES * ADDS_PER_PROCESS - count, elapsed
+
+def main():
+    print(f"{PROCESSES} processes x {ADDS_PER_PROCESS} adds")
+    print(f"{'mode':>8} {'lost updates':>13} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for shared in (False, True):
+            lost, elapsed = run(directory, shared)
+            print(f"{'shared' if shared else 'plain':>8} {lost:>13} {elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,15 @@
 from .todopkg import TodoListManager
-from .todopkg import CustomEncoder
\ No newline at end of file
+
+# CustomEncoder imports json, AsyncTodoListManager imports asyncio and TodoStoreView imports mmap,
+# so they are only imported when they are used
+def __getattr__(name):
+    if name == 'CustomEncoder':
+        from .writer import CustomEncoder
+        return CustomEncoder
+    if name == 'AsyncTodoListManager':
+        from .aio import AsyncTodoListManager
+        return AsyncTodoListManager
+    if name == 'TodoStoreView':
+        from .view import TodoStoreView
+        return TodoStoreView
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
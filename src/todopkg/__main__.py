@@ -1,7 +1,9 @@
+import sys
+from .cli import main
 from .todopkg import TodoListManager
 
-# Simple example function to demonstrate how to use todopkg package
-def main():
+# Simple example function to demonstrate how to use todopkg package, run it with python -m todopkg demo
+def demo():
     # Initialize the TodoListManager
     manager = TodoListManager(enable_auto_restore=False)  # Assuming you don't want to load from the Json file right now
 
@@ -45,6 +47,12 @@ def main():
     print("\nAll lists after deletion:")
     manager.print_all_todo_lists()
 
+    # Undo the deletion, the list comes back with its items
+    print("Undo the deletion of todo list 'Work'")
+    manager.undo()
+    print("\nAll lists after undo:")
+    manager.print_all_todo_lists()
+
     # Demonstrate save to file and load from file
     print("\nSaving lists to file.\n")
     manager.save_to_file()
@@ -56,4 +64,4 @@ def main():
     manager.print_all_todo_lists()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
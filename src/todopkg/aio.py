@@ -0,0 +1,184 @@
+import asyncio
+import contextlib
+import functools
+from .storage import LazyTodoLists
+from .todopkg import TodoListManager
+
+# Stands in for the autosave thread of the manager wrapped by AsyncTodoListManager
+# Mutators only queue their changes, and the async manager writes them from an executor
+class ExecutorWrites:
+
+    def notify(self, pending):
+        pass
+
+    def stop(self):
+        pass
+
+# asyncio front end of TodoListManager
+# Every method of TodoListManager is a coroutine here. Changes are made in memory right away and
+# the coroutine returns once they are written to disk. Writes run in the event loop's default
+# executor, and coroutines whose changes are waiting for a write share the next one, so many
+# concurrent changes cost a few writes. Lazy and shared stores read from disk when a list is used,
+# so their calls run in the executor as well.
+class AsyncTodoListManager:
+
+    # Constructor, the arguments are the same as for TodoListManager without the autosave options
+    # Restoring the store reads the file before returning, use open from a running event loop
+    def __init__(self, filename='todolist.json', enable_auto_restore=True, journal=False,
+                 journal_max_bytes=1024 * 1024, journal_max_age=300, backend=None, lazy=False, shared=False,
+                 change_buffer=1024, instrument=False, history_depth=100):
+        self.manager = TodoListManager(filename, enable_auto_restore, journal, journal_max_bytes,
+                                       journal_max_age, backend, lazy, shared=shared,
+                                       change_buffer=change_buffer, instrument=instrument,
+                                       history_depth=history_depth)
+        self.manager.autosave = ExecutorWrites()
+        self._writing = None  # task running the current write
+        self._batch_task = None  # task inside batch
+        self._batch_lock = asyncio.Lock()
+
+    # Create a manager without blocking the event loop while the store is restored
+    @classmethod
+    async def open(cls, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(cls, *args, **kwargs))
+
+    @property
+    def filename(self):
+        return self.manager.filename
+
+    @property
+    def todo_lists(self):
+        return self.manager.todo_lists
+
+    # Change feed of the manager, see TodoListManager.subscribe
+    # Callbacks run where the change is made: on the event loop for in-memory stores, and in the
+    # executor for shared and lazy stores, load_from_file and refresh
+    def subscribe(self, callback):
+        return self.manager.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        return self.manager.unsubscribe(callback)
+
+    def changes_since(self, version):
+        return self.manager.changes_since(version)
+
+    @property
+    def version(self):
+        return self.manager.version
+
+    # Counters of an instrumented manager, see TodoListManager.stats
+    # Operations run on the event loop are timed without the wait for their write
+    def stats(self, reset=False):
+        return self.manager.stats(reset)
+
+    async def create_todo_list(self, name):
+        return await self._change(self.manager.create_todo_list, name)
+
+    async def delete_todo_list(self, name):
+        return await self._change(self.manager.delete_todo_list, name)
+
+    async def show_all_todo_list(self):
+        return await self._call(self.manager.show_all_todo_list)
+
+    async def change_todo_list_name(self, old_name, new_name):
+        return await self._change(self.manager.change_todo_list_name, old_name, new_name)
+
+    async def add_item_to_todo_list(self, name, item, priority=None, due_date=None):
+        return await self._change(self.manager.add_item_to_todo_list, name, item, priority, due_date)
+
+    async def add_items(self, name, entries):
+        return await self._change(self.manager.add_items, name, entries)
+
+    async def show_all_items_in_todo_list(self, name):
+        return await self._call(self.manager.show_all_items_in_todo_list, name)
+
+    async def query(self, due_before=None, due_after=None, max_priority=None, lists=None, limit=None, order='priority'):
+        return await self._call(self.manager.query, due_before, due_after, max_priority, lists, limit, order)
+
+    async def print_all_todo_lists(self, list_name = None, limit = None, offset = 0, sample = None, tablefmt = "grid", file = None):
+        return await self._call(self.manager.print_all_todo_lists, list_name, limit, offset, sample, tablefmt, file)
+
+    async def remove_item_from_todo_list(self, name, index):
+        return await self._change(self.manager.remove_item_from_todo_list, name, index)
+
+    async def remove_items(self, name, indices):
+        return await self._change(self.manager.remove_items, name, indices)
+
+    async def undo(self):
+        return await self._change(self.manager.undo)
+
+    async def redo(self):
+        return await self._change(self.manager.redo)
+
+    # Import and export read or write files, so they run in the executor
+    async def import_tasks(self, path, format=None, create_lists=True, chunk_size=10_000):
+        return await self._change(self.manager.import_tasks, path, format, create_lists, chunk_size, offload=True)
+
+    async def export_tasks(self, path, format=None, lists=None):
+        return await self._call(self.manager.export_tasks, path, format, lists, offload=True)
+
+    # Group changes so they are written once when the block exits, see TodoListManager.batch
+    # Other coroutines wait until the block exits
+    @contextlib.asynccontextmanager
+    async def batch(self):
+        if self._batch_task is asyncio.current_task():
+            with self.manager.batch():
+                yield self
+            return
+        async with self._batch_lock:
+            self._batch_task = asyncio.current_task()
+            try:
+                with self.manager.batch():
+                    yield self
+            finally:
+                self._batch_task = None
+        await self._written()
+
+    # Wait until every change made so far is written and durable
+    async def flush(self):
+        if self._batch_task is asyncio.current_task():
+            self.manager.flush()
+            return
+        await self._written()
+
+    async def save_to_file(self):
+        await self._call(self.manager.save_to_file, offload=True)
+
+    async def load_from_file(self):
+        await self._call(self.manager.load_from_file, offload=True)
+
+    async def refresh(self):
+        return await self._call(self.manager.refresh, offload=True)
+
+    # Run a mutator and wait until its change is written
+    async def _change(self, method, *args, offload=False):
+        result = await self._call(method, *args, offload=offload)
+        if self._batch_task is not asyncio.current_task():
+            await self._written()
+        return result
+
+    # Run a TodoListManager method, in the executor when it may read or write files
+    # Calls made inside a batch run on the event loop, which holds the manager locks
+    async def _call(self, method, *args, offload=False):
+        if self._batch_task is asyncio.current_task():
+            return method(*args)
+        while self._batch_task is not None:
+            async with self._batch_lock:
+                pass
+        if offload or self.manager.shared or isinstance(self.manager.todo_lists, LazyTodoLists):
+            return await asyncio.get_running_loop().run_in_executor(None, functools.partial(method, *args))
+        return method(*args)
+
+    # Wait until the changes queued so far are written, starting a write if none is running
+    # Changes queued while a write runs are all covered by the next one
+    async def _written(self):
+        target = self.manager._queued
+        while self.manager._written < target:
+            if self._writing is None:
+                self._writing = asyncio.ensure_future(self._write())
+            await asyncio.shield(self._writing)
+
+    async def _write(self):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.manager.flush)
+        finally:
+            self._writing = None
@@ -0,0 +1,48 @@
+import threading
+import weakref
+
+# Background thread that flushes pending changes of a TodoListManager
+# A flush happens every interval seconds while there are pending changes, or as soon as
+# max_pending changes are waiting
+# flush is a bound method of the manager, which the thread only references weakly while nothing
+# is pending, so an idle manager can be garbage collected and its thread exits
+class AutosaveThread(threading.Thread):
+
+    def __init__(self, flush, interval=1.0, max_pending=100):
+        super().__init__(name="todopkg-autosave", daemon=True)
+        self._flush = weakref.WeakMethod(flush)
+        self._holding = None  # strong reference to flush while changes are pending
+        self.interval = interval
+        self.max_pending = max_pending
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    # Called after every change with the number of pending changes
+    def notify(self, pending):
+        self._holding = self._flush()
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    # Stop the thread, pending changes are left for the caller to flush
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+    def run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            flush = self._holding or self._flush()
+            if flush is None:
+                break
+            self._holding = None
+            try:
+                flush()
+            except Exception as e:  # Keep the thread alive, the changes stay pending
+                print(f"Warning: Autosave failed, changes will be retried. Error: {e}")
+                self._holding = flush
+            del flush
@@ -0,0 +1,203 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from operator import attrgetter
+from .items import ItemSnapshot, SortedItemList, TodoItem, collector_paused
+
+# Binary snapshot format, version 1
+# Every number is little-endian and every section starts at a multiple of 8 bytes:
+#   header       magic b'TODOSNAP', format version u16, flags u16 (0), list count u32,
+#                item count u64, text length in bytes u64
+#   list sizes   u64 per list, the number of items of each list in store order
+#   offsets      u64 per string plus one, where each string starts in the text in bytes;
+#                the list names come first, then the item names of every list in order
+#   priorities   i64 per item, NO_PRIORITY when missing
+#   due dates    i32 per item, date ordinal or NO_DUE_DATE when missing
+#   text         every string concatenated and encoded as utf-8
+# Items are stored in the sorted order of their list. Loading maps the file and reads each column
+# with memoryview.cast, so no field is parsed: the text is decoded once and item names are slices
+# of it, and the lists are built without sorting them again. Since every string can be found from
+# the offsets, TodoStoreView reads single items straight from the mapped file.
+MAGIC = b'TODOSNAP'
+VERSION = 1
+HEADER = struct.Struct('<8sHHIQQ')
+COLUMN_CODES = {'Q': 8, 'q': 8, 'i': 4}  # array type codes of the columns and their sizes in bytes
+
+# Writes todo lists to a binary snapshot file
+# The file is written to '<filename>.<pid>.tmp', fsynced and renamed over the target. The columns
+# of lists that did not change since the previous write are reused, so saving a store after a
+# small change only reads the items of the lists that changed.
+class BinarySnapshotWriter:
+
+    def __init__(self):
+        self._cache = {}  # list name -> (items, version, columns)
+
+    def write(self, filename, todo_lists):
+        names = list(todo_lists)
+        cache = {}
+        lists = [self._columns(name, todo_lists[name], cache) for name in names]
+        names_columns = ListColumns.of_strings(names)
+        text = names_columns.text + b''.join(columns.text for columns in lists)
+        sizes = array('Q', (len(columns.priorities) for columns in lists))
+        lengths = array('Q', names_columns.lengths)
+        priorities = array('q')
+        due_ordinals = array('i')
+        for columns in lists:
+            lengths.extend(columns.lengths)
+            priorities.extend(columns.priorities)
+            due_ordinals.extend(columns.due_ordinals)
+        offsets = array('Q', accumulate(lengths, initial=0))
+        if sys.byteorder != 'little':
+            for column in (sizes, offsets, priorities, due_ordinals):
+                column.byteswap()
+        temporary = f'{filename}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, 0, len(names), len(priorities), len(text)))
+                for column in (sizes, offsets, priorities, due_ordinals):
+                    f.write(column)
+                f.write(bytes(padding(len(due_ordinals) * 4)))
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, filename)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        # Only lists that are still in the store stay cached
+        self._cache = cache
+
+    # Columns of a list, reused when the same list has not changed since the last write
+    def _columns(self, name, items, cache):
+        if isinstance(items, (SortedItemList, ItemSnapshot)):
+            cached = self._cache.get(name)
+            if cached is not None and cached[0] is items and cached[1] == items.version:
+                cache[name] = cached
+                return cached[2]
+            columns = ListColumns(items)
+            cache[name] = (items, items.version, columns)
+            return columns
+        return ListColumns([TodoItem.from_mapping(item_data) for item_data in items])
+
+# Encoded item names, their lengths in bytes, priorities and due ordinals of the items of one list
+class ListColumns:
+    __slots__ = ('text', 'lengths', 'priorities', 'due_ordinals')
+
+    def __init__(self, items=()):
+        self.set_strings(list(map(attrgetter('item'), items)))
+        self.priorities = array('q', map(attrgetter('priority_value'), items))
+        self.due_ordinals = array('i', map(attrgetter('due_ordinal'), items))
+
+    # Columns holding only the given strings, used for the list names
+    @classmethod
+    def of_strings(cls, strings):
+        columns = cls()
+        columns.set_strings(strings)
+        return columns
+
+    def set_strings(self, strings):
+        try:
+            text = ''.join(strings)
+        except TypeError:
+            raise ValueError("The binary format only stores list and item names that are text.")
+        self.text = text.encode('utf-8')
+        # Characters and bytes only differ in length for text outside the ascii range
+        if len(self.text) == len(text):
+            self.lengths = array('Q', map(len, strings))
+        else:
+            self.lengths = array('Q', (len(string.encode('utf-8')) for string in strings))
+
+# Read a binary snapshot into todo_lists
+# Lists that already exist in todo_lists are merged with the stored items
+def read_snapshot(filename, todo_lists):
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise ValueError("The file is not a todopkg binary snapshot.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            names, lists = decode_snapshot(mapped)
+    for name, items in zip(names, lists):
+        if name in todo_lists:
+            stored = todo_lists[name]
+            stored.extend(item_data for item_data in items if not stored.has_item(item_data.item))
+        else:
+            todo_lists[name] = items
+    return todo_lists
+
+# List names and SortedItemList lists of a snapshot held in a bytes-like buffer
+def decode_snapshot(buffer):
+    layout = SnapshotLayout(buffer)
+    with memoryview(buffer) as view:
+        sizes = layout.column(view, 'sizes')
+        offsets = layout.column(view, 'offsets')
+        priorities = layout.column(view, 'priorities')
+        due_ordinals = layout.column(view, 'due_ordinals')
+        with view[layout.text_start:layout.text_start + layout.text_length] as raw:
+            text = bytes(raw)
+    if offsets[-1] != len(text) or sum(sizes) != layout.item_count:
+        raise ValueError("The binary snapshot is truncated or corrupted.")
+    with collector_paused():
+        if text.isascii():
+            # Byte offsets are character offsets, decode once and slice
+            text = text.decode('ascii')
+            strings = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+        else:
+            strings = [text[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+        names = strings[:layout.list_count]
+        items = list(map(make_item, strings[layout.list_count:], priorities, due_ordinals))
+    lists = []
+    start = 0
+    for size in sizes:
+        lists.append(SortedItemList.from_sorted(items[start:start + size]))
+        start += size
+    return names, lists
+
+# TodoItem from its stored fields
+def make_item(item, priority_value, due_ordinal):
+    item_data = TodoItem.__new__(TodoItem)
+    item_data.item = item
+    item_data.priority_value = priority_value
+    item_data.due_ordinal = due_ordinal
+    return item_data
+
+# Positions of the sections of a snapshot, checked against the size of the buffer
+class SnapshotLayout:
+
+    def __init__(self, buffer):
+        if len(buffer) < HEADER.size:
+            raise ValueError("The file is not a todopkg binary snapshot.")
+        magic, version, flags, self.list_count, self.item_count, self.text_length = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("The file is not a todopkg binary snapshot.")
+        if version != VERSION:
+            raise ValueError(f"Binary snapshot version {version} is not supported, this version of todopkg reads version {VERSION}.")
+        self.sections = {}
+        position = HEADER.size
+        for section, code, count in (('sizes', 'Q', self.list_count),
+                                     ('offsets', 'Q', self.list_count + self.item_count + 1),
+                                     ('priorities', 'q', self.item_count),
+                                     ('due_ordinals', 'i', self.item_count)):
+            self.sections[section] = (position, code, count)
+            position += count * COLUMN_CODES[code]
+        self.text_start = position + padding(position)
+        if len(buffer) != self.text_start + self.text_length:
+            raise ValueError("The binary snapshot is truncated or corrupted.")
+
+    # Values of a column as a list, read straight from the buffer
+    def column(self, view, section):
+        position, code, count = self.sections[section]
+        with view[position:position + count * COLUMN_CODES[code]] as raw:
+            if sys.byteorder == 'little':
+                with raw.cast(code) as values:
+                    return values.tolist()
+            values = array(code)
+            values.frombytes(raw)
+            values.byteswap()
+            return values.tolist()
+
+# Bytes needed after position to reach a multiple of 8
+def padding(position):
+    return -position % 8
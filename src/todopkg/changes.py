@@ -0,0 +1,82 @@
+import threading
+from collections import deque, namedtuple
+
+# A change made to the lists of a TodoListManager
+# version  position of the change in the feed, starting at 1
+# kind     'create', 'delete' or 'rename' for lists, 'add' or 'remove' for items, and 'reload'
+#          when the lists were read again from the file and consumers have to read them again
+# name     list the change applies to, None for 'reload'
+# index    position of the item in the list after it was added, or before it was removed, and
+#          for lists the position of a deleted list or of a restored one, None for a new list
+#          that comes after the others
+# item     the TodoItem that was added or removed, or the items of a deleted list
+# new_name new name of a renamed list
+# Applying the changes in version order to a copy of the lists reproduces them: items are
+# inserted at or removed from index in the order the changes were made, and a renamed list keeps
+# its position.
+ChangeEvent = namedtuple('ChangeEvent', 'version kind name index item new_name', defaults=(None, None, None))
+
+# Change events of a TodoListManager
+# The latest events are kept in a ring buffer of capacity events for changes_since, and every
+# event is passed to the subscribed callbacks as it is published. Callbacks run in the thread that
+# made the change, after the feed lock is released, so changes made by different threads at the
+# same time may reach a callback out of version order.
+class ChangeFeed:
+
+    def __init__(self, capacity=1024):
+        self.version = 0  # version of the latest event
+        self._events = deque(maxlen=capacity)
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    # Call callback(event) for every event published from now on
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+        return callback
+
+    # Stop calling callback, returns False if it was not subscribed
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback not in self._subscribers:
+                return False
+            subscribers = list(self._subscribers)
+            subscribers.remove(callback)
+            self._subscribers = subscribers
+        return True
+
+    # Events published after version, oldest first
+    # Returns None when some of them already left the ring buffer, or when version is not one
+    # this feed handed out, in which case the consumer has to read the whole store again
+    def changes_since(self, version):
+        with self._lock:
+            if version > self.version or version < 0:
+                return None
+            if version == self.version:
+                return []
+            missing = self.version - version
+            if missing > len(self._events):
+                return None
+            return list(self._events)[-missing:]
+
+    # Publish (kind, name, index, item, new_name) changes in the order they were made
+    # Without subscribers only the changes the ring buffer can hold are turned into events
+    def publish(self, changes):
+        if not changes:
+            return
+        with self._lock:
+            subscribers = self._subscribers
+            first = self.version + 1
+            self.version += len(changes)
+            if not subscribers and len(changes) > self._events.maxlen:
+                skipped = len(changes) - self._events.maxlen
+                changes = changes[skipped:]
+                first += skipped
+            events = [ChangeEvent(version, *change) for version, change in enumerate(changes, first)]
+            self._events.extend(events)
+        for event in events:
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception as e:  # One failing subscriber must not break the mutator or the others
+                    print(f"Warning: A change subscriber failed. Error: {e}")
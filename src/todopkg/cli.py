@@ -0,0 +1,185 @@
+import argparse
+import os
+import sys
+from . import shutdown
+from .items import format_item
+from .todopkg import TodoListManager
+
+# Command-line interface, run with python -m todopkg
+# Commands run against the store given by --file. When a daemon started with the daemon command
+# is listening on the store's socket, commands are sent to it and cost one round trip instead of
+# loading and saving the store. Exit status is 0 on success, 1 when the command failed and 2 for
+# usage errors.
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m todopkg", description="Manage todo lists from the command line.")
+    parser.add_argument("--file", help="store to use, todolist.json by default")
+    parser.add_argument("--backend", choices=["json", "sqlite", "binary", "sharded"], help="storage backend, chosen from the file extension by default")
+    parser.add_argument("--journal", action="store_true", help="append changes to a journal instead of rewriting the file")
+    parser.add_argument("--socket", help="daemon socket, FILE.sock by default or $TODOPKG_SOCKET")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    command = commands.add_parser("create", help="create a todo list")
+    command.add_argument("name")
+    command = commands.add_parser("delete", help="delete a todo list")
+    command.add_argument("name")
+    command = commands.add_parser("rename", help="rename a todo list")
+    command.add_argument("old_name")
+    command.add_argument("new_name")
+    command = commands.add_parser("add", help="add an item to a todo list")
+    command.add_argument("name")
+    command.add_argument("item")
+    command.add_argument("-p", "--priority", type=int)
+    command.add_argument("-d", "--due", help="due date as YYYY-MM-DD")
+    command = commands.add_parser("rm", help="remove an item from a todo list by index")
+    command.add_argument("name")
+    command.add_argument("index", type=int)
+    command = commands.add_parser("show", help="list the todo lists, or the items of one list")
+    command.add_argument("name", nargs="?")
+    command = commands.add_parser("print", help="print todo lists as tables")
+    command.add_argument("name", nargs="?")
+    command.add_argument("--limit", type=int)
+    command.add_argument("--offset", type=int, default=0)
+    command.add_argument("--sample", type=int)
+    command.add_argument("--format", dest="tablefmt", default="grid")
+    command = commands.add_parser("query", help="find items across todo lists")
+    command.add_argument("--due-before")
+    command.add_argument("--due-after")
+    command.add_argument("--max-priority", type=int)
+    command.add_argument("--list", dest="lists", action="append", help="search this list, may be repeated")
+    command.add_argument("--limit", type=int)
+    command.add_argument("--order", choices=["priority", "due_date"], default="priority")
+    command = commands.add_parser("daemon", help="keep the store in memory and serve commands on a Unix socket")
+    command.add_argument("--autosave", action="store_true", help="write changes in the background instead of before replying")
+    commands.add_parser("stop", help="stop the daemon")
+    commands.add_parser("demo", help="run the example program")
+    return parser
+
+# Entry point, returns the exit status
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = build_parser().parse_args(argv)
+    if args.command == "demo":
+        from .__main__ import demo
+        demo()
+        return 0
+    if args.command == "daemon":
+        return serve(args)
+    path = socket_path(args)
+    if args.socket or args.command == "stop" or os.path.exists(path):
+        if not unix_sockets():
+            print("The daemon needs Unix domain sockets, which this platform does not have.")
+            return 1
+        from .daemon import request
+        try:
+            status, output = request(path, argv, args.file and os.path.abspath(args.file))
+        except OSError:
+            if args.socket or args.command == "stop":
+                print(f"No todopkg daemon is listening on {path}.")
+                return 1
+        else:
+            sys.stdout.write(output)
+            return status
+    manager = open_manager(args)
+    # Mutators save their own changes, there is nothing left to save at exit
+    shutdown.unregister(manager)
+    return run(manager, args)
+
+# Whether the platform has the Unix domain sockets the daemon listens on
+def unix_sockets():
+    import socket
+    return hasattr(socket, "AF_UNIX")
+
+# Default store and socket paths
+def store_path(args):
+    return args.file or "todolist.json"
+
+def socket_path(args):
+    return args.socket or os.environ.get("TODOPKG_SOCKET") or store_path(args) + ".sock"
+
+def open_manager(args, autosave=False):
+    return TodoListManager(store_path(args), journal=args.journal, backend=args.backend, autosave=autosave)
+
+# Run a parsed command against manager and print its output, returns the exit status
+def run(manager, args):
+    if args.command == "create":
+        return status(manager.create_todo_list(args.name) is True)
+    if args.command == "delete":
+        return status(manager.delete_todo_list(args.name) is True)
+    if args.command == "rename":
+        return status(manager.change_todo_list_name(args.old_name, args.new_name) is True)
+    if args.command == "add":
+        result = manager.add_item_to_todo_list(args.name, args.item, args.priority, args.due)
+        return status(result == "Item added successfully.")
+    if args.command == "rm":
+        result = manager.remove_item_from_todo_list(args.name, args.index)
+        return status(result == f"Item at index {args.index} removed from TodoList {args.name}.")
+    if args.command == "show":
+        if args.name is None:
+            for name, items in manager.show_all_todo_list().items():
+                print(f"{name} ({len(items)} items)")
+            return 0
+        result = manager.show_all_items_in_todo_list(args.name)
+        if not isinstance(result, list):
+            return 1
+        for index, line in enumerate(result):
+            print(f"{index}: {line}")
+        return 0
+    if args.command == "print":
+        result = manager.print_all_todo_lists(args.name, args.limit, args.offset, args.sample, args.tablefmt)
+        return status(result is True)
+    if args.command == "query":
+        result = manager.query(args.due_before, args.due_after, args.max_priority, args.lists, args.limit, args.order)
+        if not isinstance(result, list):
+            return 1
+        for name, item_data in result:
+            print(f"{name}: {format_item(item_data)}")
+        return 0
+    print(f"Unknown command: {args.command}")
+    return 2
+
+def status(succeeded):
+    return 0 if succeeded else 1
+
+# Run the daemon in the foreground until it receives the stop command, SIGTERM or Ctrl-C
+# Commands sent by clients run on the daemon's manager, stop ends serve_forever after replying.
+# Commands asking for another backend, or for a journal the daemon does not keep, are refused.
+def serve(args):
+    import signal
+    if not unix_sockets():
+        print("The daemon needs Unix domain sockets, which this platform does not have.")
+        return 1
+    from .daemon import TodoDaemon
+    from .storage import backend_for
+    path = socket_path(args)
+    backend = args.backend or backend_for(store_path(args))
+
+    def execute(argv):
+        command = build_parser().parse_args(argv)
+        if command.command == "stop":
+            server.stop()
+            print("Daemon stopped.")
+            return 0
+        if command.backend not in (None, backend) or command.journal and not args.journal:
+            journal = " with a journal" if args.journal else " without a journal"
+            print(f"Error: The daemon serves {manager.filename} with the {backend} backend{journal}, "
+                  f"stop it to use other storage options.")
+            return 1
+        return run(manager, command)
+
+    try:
+        manager = open_manager(args, autosave=args.autosave)
+        server = TodoDaemon(path, store_path(args), execute)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Serving {manager.filename} on {path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.flush()
+    return 0
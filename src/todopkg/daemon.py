@@ -0,0 +1,91 @@
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+from contextlib import redirect_stderr, redirect_stdout, suppress
+
+# Server of the daemon command, keeps one TodoListManager in memory for many CLI calls
+# Each request is a json line {"argv": [...], "file": path or null} holding the command line of
+# the CLI call, answered by a json line {"status": exit status, "output": printed text}. A
+# connection may send several requests. Commands run one at a time since their output is
+# captured from stdout, and each command still saves its changes before it replies.
+class TodoDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    # execute runs a command line and returns its exit status, filename is the store it serves
+    # A socket left behind by a daemon that is no longer running is replaced
+    def __init__(self, path, filename, execute):
+        self.filename = os.path.abspath(filename)
+        self.execute = execute
+        self.stopping = False
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            if listening(path):
+                raise OSError(f"A todopkg daemon is already listening on {path}.")
+            os.unlink(path)
+        super().__init__(path, CommandHandler)
+
+    # Run a command line and return its exit status and output
+    # Calls made for another store are refused instead of changing this one
+    def run(self, argv, filename=None):
+        if filename is not None and filename != self.filename:
+            return 1, f"The daemon on {self.server_address} serves {self.filename}, not {filename}.\n"
+        output = io.StringIO()
+        with self._lock, redirect_stdout(output), redirect_stderr(output):
+            try:
+                status = self.execute(argv)
+            except SystemExit as e:  # argparse exits on invalid command lines
+                status = e.code if isinstance(e.code, int) else 2
+            except Exception as e:
+                print(f"Error: {e}")
+                status = 1
+        return status, output.getvalue()
+
+    # Stop serving once the reply to the current request is sent
+    def stop(self):
+        self.stopping = True
+
+    def server_close(self):
+        super().server_close()
+        with suppress(FileNotFoundError):
+            os.unlink(self.server_address)
+
+# Handles the requests of one connection
+class CommandHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                status, output = self.server.run(list(request["argv"]), request.get("file"))
+            except (ValueError, KeyError, TypeError):
+                status, output = 2, "Invalid request.\n"
+            self.wfile.write((json.dumps({"status": status, "output": output}) + "\n").encode())
+            if self.server.stopping:
+                self.server.shutdown()
+                return
+
+# Whether a daemon accepts connections on path
+def listening(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(path)
+        except OSError:
+            return False
+    return True
+
+# Send a command line to the daemon listening on path and return its exit status and output
+# filename is the absolute path of the store the command is meant for, None for any store
+# Raises OSError when no daemon is listening
+def request(path, argv, filename=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall((json.dumps({"argv": list(argv), "file": filename}) + "\n").encode())
+        with connection.makefile("rb") as replies:
+            reply = replies.readline()
+    if not reply:
+        raise ConnectionError(f"The daemon on {path} closed the connection.")
+    reply = json.loads(reply)
+    return reply["status"], reply["output"]
@@ -0,0 +1,43 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+DATE_CACHE_SIZE = 4096  # number of distinct date strings kept parsed
+
+# Parse a 'YYYY-MM-DD' due date string into a date
+# Accepts exactly the strings datetime.strptime(text, "%Y-%m-%d") accepts: it raises ValueError
+# for the others and TypeError for values that are not strings. Canonical dates, which is every
+# date todopkg writes, are checked by shape and read with date.fromisoformat instead of going
+# through the locale and regex handling of strptime, which is only used for the other spellings
+# it allows, like '2023-1-5'. Stores reuse a small set of dates, so results are kept in an LRU
+# cache of DATE_CACHE_SIZE strings.
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(text):
+    if not isinstance(text, str):
+        raise TypeError(f"Due date must be a string, not {type(text).__name__}.")
+    if (len(text) == 10 and text[4] == '-' and text[7] == '-' and text.isascii()
+            and text[:4].isdigit() and text[5:7].isdigit() and text[8:].isdigit()):
+        return date.fromisoformat(text)
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+# Parse the due dates of many items at once, for import paths
+# Returns one entry per value: the date, None for a missing (empty) due date, or the error
+# message for a value that is not a valid date. Each distinct string is parsed once.
+def parse_dates(values):
+    parsed = {}
+    results = []
+    for value in values:
+        if not value:
+            results.append(None)
+            continue
+        try:
+            result = parsed[value]
+        except KeyError:
+            try:
+                result = parse_date(value)
+            except (TypeError, ValueError):
+                result = "Due date must be in YYYY-MM-DD format."
+            parsed[value] = result
+        except TypeError:  # Unhashable values like lists can't be dates
+            result = "Due date must be in YYYY-MM-DD format."
+        results.append(result)
+    return results
@@ -0,0 +1,38 @@
+import threading
+from collections import deque
+
+# Undo and redo stacks of a TodoListManager, see TodoListManager.undo
+# An entry is the list of (kind, name, index, item, new_name) changes one call or one batch
+# committed, the same tuples the change feed publishes. They are all that is needed to make the
+# inverse changes: added and removed items are the TodoItems themselves and a deleted list is
+# kept as the item of its change, so an entry shares its items with the lists and the feed
+# instead of copying them. Each stack keeps the latest depth entries.
+class UndoHistory:
+
+    def __init__(self, depth=100):
+        self._undo = deque(maxlen=depth)
+        self._redo = deque(maxlen=depth)
+        self._lock = threading.Lock()
+
+    # Remember the changes of a new call, the undone ones can't be redone after it
+    def record(self, changes):
+        with self._lock:
+            self._undo.append(changes)
+            self._redo.clear()
+
+    # Forget every entry, used when the lists are read again and the changes no longer apply
+    def clear(self):
+        with self._lock:
+            self._undo.clear()
+            self._redo.clear()
+
+    # Take the latest entry to undo, or to redo with redo=True, None when there is none
+    def pop(self, redo=False):
+        with self._lock:
+            stack = self._redo if redo else self._undo
+            return stack.pop() if stack else None
+
+    # Add the changes that reverted an entry, to the redo stack with redo=True
+    def push(self, changes, redo=False):
+        with self._lock:
+            (self._redo if redo else self._undo).append(changes)
@@ -0,0 +1,296 @@
+import gc
+import threading
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import date
+from itertools import count
+
+NO_PRIORITY = -1  # stored priority of an item without a priority
+NO_DUE_DATE = 0  # stored due date ordinal of an item without a due date
+MAX_ORDINAL = date.max.toordinal()
+VERSIONS = count(1)  # versions of SortedItemList states, never handed out twice
+_sorting = threading.local()  # full sorts made by the current thread
+
+# Compact record of a single todo item
+# The priority is stored as an int (NO_PRIORITY when missing) and the due date as a date ordinal
+# (NO_DUE_DATE when missing). Reading it like the dictionaries used before still works:
+# item_data['priority'] is float('inf') without a priority and item_data['due_date'] is a date or None
+class TodoItem(Mapping):
+    __slots__ = ('item', 'priority_value', 'due_ordinal')
+    _keys = ('item', 'priority', 'due_date')
+
+    # Constructor, priority is an int, None or float('inf'), due_date is a date or None
+    def __init__(self, item, priority=None, due_date=None):
+        self.item = item
+        self.priority_value = NO_PRIORITY if priority is None or priority == float('inf') else priority
+        self.due_ordinal = NO_DUE_DATE if due_date is None else due_date.toordinal()
+
+    # Build an item from a mapping with 'item', 'priority' and 'due_date' keys
+    @classmethod
+    def from_mapping(cls, item_data):
+        if isinstance(item_data, TodoItem):
+            return item_data
+        return cls(item_data['item'], item_data.get('priority'), item_data.get('due_date'))
+
+    @property
+    def priority(self):
+        return float('inf') if self.priority_value == NO_PRIORITY else self.priority_value
+
+    @property
+    def due_date(self):
+        return None if self.due_ordinal == NO_DUE_DATE else date.fromordinal(self.due_ordinal)
+
+    # Same order as item_sort_key, items without a priority or due date sort last
+    def sort_key(self):
+        return (self.priority_value == NO_PRIORITY, self.priority_value, self.due_ordinal or MAX_ORDINAL)
+
+    def __lt__(self, other):
+        if self.priority_value != other.priority_value:
+            if self.priority_value == NO_PRIORITY:
+                return False
+            return other.priority_value == NO_PRIORITY or self.priority_value < other.priority_value
+        return (self.due_ordinal or MAX_ORDINAL) < (other.due_ordinal or MAX_ORDINAL)
+
+    # Dictionary style read access
+    def __getitem__(self, key):
+        if key == 'item':
+            return self.item
+        if key == 'priority':
+            return self.priority
+        if key == 'due_date':
+            return self.due_date
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return 3
+
+    def __eq__(self, other):
+        if isinstance(other, TodoItem):
+            return (self.item == other.item and self.priority_value == other.priority_value
+                    and self.due_ordinal == other.due_ordinal)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    # Plain dictionary in the json file format, the due date is an ISO string
+    def to_dict(self):
+        due_date = self.due_date
+        return {'item': self.item, 'priority': self.priority,
+                'due_date': due_date.isoformat() if due_date is not None else None}
+
+    def __repr__(self):
+        return f"TodoItem({self.item!r}, priority={self.priority!r}, due_date={self.due_date!r})"
+
+    def __reduce__(self):
+        return (TodoItem, (self.item, self.priority_value if self.priority_value != NO_PRIORITY else None,
+                           self.due_date))
+
+# Text shown for an item by show_all_items_in_todo_list
+def format_item(item_data):
+    item_string = f"Item: {item_data['item']}"
+    if item_data['priority'] == float('inf'):
+        item_string += ", Priority: No priority specified"  # format the returned list to be more user-friendly
+    else:
+        item_string += f", Priority: {item_data['priority']}"
+    if item_data['due_date'] is None:
+        item_string += ", Due date: No due date"  # format the returned list to be more user-friendly
+    else:
+        item_string += f", Due date: {item_data['due_date'].strftime('%Y-%m-%d')}"
+    return item_string
+
+# Sort key used by every todo list, priority field has higher priority than due_date field
+# Items without a due date are placed after every item with the same priority
+def item_sort_key(item_data):
+    if isinstance(item_data, TodoItem):
+        return item_data.sort_key()
+    due_date = item_data['due_date']
+    return (item_data['priority'], due_date if due_date is not None else date.max)
+
+# Number of full sorts of a SortedItemList the current thread has made
+# An instrumented TodoListManager counts the sorts its calls make from the change of this number
+def thread_sorts():
+    return getattr(_sorting, 'count', 0)
+
+def _count_sort():
+    SortedItemList.sorts += 1
+    _sorting.count = thread_sorts() + 1
+
+# List of TodoItem records kept in sorted order with an index of item names
+# Items are inserted with a binary search, and the name index makes duplicate checks O(1).
+# Positional access and indexing behave like a plain list. Dictionaries are converted to TodoItem.
+# version changes with every modification so writers can tell whether a list changed. No two
+# lists of the process ever share a version, so a version also tells which list it belongs to.
+# SortedItemList.sorts counts the full sorts of every list in the process, see also thread_sorts.
+class SortedItemList(list):
+    __slots__ = ('_names', 'version')
+    sorts = 0
+
+    # Constructor, the given items are sorted once
+    def __init__(self, items=()):
+        super().__init__(sorted(map(TodoItem.from_mapping, items), key=TodoItem.sort_key))
+        if len(self) > 1:
+            _count_sort()
+        self._reindex()
+
+    # Build a list from TodoItem records that are already in sorted order, such as a snapshot
+    # read from disk, without sorting them again
+    @classmethod
+    def from_sorted(cls, items):
+        sorted_list = cls()
+        list.extend(sorted_list, items)
+        sorted_list._reindex()
+        return sorted_list
+
+    # Whether an item with the given name is in the list
+    def has_item(self, item):
+        return item in self._names
+
+    # Insert an item at its sorted position and return that position
+    # Items that compare equal keep their insertion order, like a stable sort would
+    def add(self, item_data):
+        item_data = TodoItem.from_mapping(item_data)
+        index = bisect_right(self, item_data)
+        super().insert(index, item_data)
+        self._names.add(item_data.item)
+        self.version = next(VERSIONS)
+        return index
+
+    # Position of an item found through its sort order, raises ValueError if it is not in the list
+    def locate(self, item_data):
+        item_data = TodoItem.from_mapping(item_data)
+        index = bisect_left(self, item_data)
+        while index < len(self) and not item_data < self[index]:
+            if self[index].item == item_data.item:
+                return index
+            index += 1
+        raise ValueError(f"{item_data.item} is not in the list")
+
+    # Put an item back at the position it was removed from, used to undo a removal
+    def reinsert(self, index, item_data):
+        super().insert(index, item_data)
+        self._names.add(item_data.item)
+        self.version = next(VERSIONS)
+
+    # Appending keeps the list sorted, so it is the same as add
+    def append(self, item_data):
+        self.add(item_data)
+
+    # Add many items, sorting once instead of inserting them one by one
+    def extend(self, items):
+        items = [TodoItem.from_mapping(item_data) for item_data in items]
+        if len(items) < 8:
+            for item_data in items:
+                self.add(item_data)
+            return
+        super().extend(items)
+        super().sort(key=TodoItem.sort_key)
+        _count_sort()
+        self._names.update(item_data.item for item_data in items)
+        self.version = next(VERSIONS)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def pop(self, index=-1):
+        item_data = super().pop(index)
+        self._names.discard(item_data.item)
+        self.version = next(VERSIONS)
+        return item_data
+
+    def remove(self, item_data):
+        self.pop(self.locate(item_data))
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            super().__delitem__(index)
+            self._reindex()
+        else:
+            self.pop(index)
+
+    def clear(self):
+        super().clear()
+        self._reindex()
+
+    # The list is always sorted, sorting only restores the order after items were modified in place
+    def sort(self, key=None, reverse=False):
+        super().sort(key=TodoItem.sort_key)
+        _count_sort()
+        self._reindex()
+
+    # Operations that would break the sorted order are not supported
+    def insert(self, index, item_data):
+        raise TypeError("SortedItemList keeps its items sorted, use add instead of insert.")
+
+    def __setitem__(self, index, item_data):
+        raise TypeError("SortedItemList keeps its items sorted, items cannot be assigned by index.")
+
+    def reverse(self):
+        raise TypeError("SortedItemList keeps its items sorted and cannot be reversed.")
+
+    def __imul__(self, count):
+        raise TypeError("SortedItemList cannot contain duplicate items.")
+
+    # Copies and pickles rebuild the index from the items
+    def __reduce__(self):
+        return (SortedItemList, (list(self),))
+
+    def copy(self):
+        return SortedItemList(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def _reindex(self):
+        self._names = {item_data.item for item_data in self}
+        self.version = next(VERSIONS)
+
+# Copy of a SortedItemList taken at its current version
+# Used to write a list to disk while other threads keep changing the original
+class ItemSnapshot(list):
+    __slots__ = ('version',)
+
+    def __init__(self, items):
+        super().__init__(items)
+        self.version = items.version
+
+# Return todo_lists[name] as a SortedItemList, converting a plain list assigned by the caller
+def sorted_items(todo_lists, name):
+    items = todo_lists[name]
+    if not isinstance(items, SortedItemList):
+        items = todo_lists[name] = SortedItemList(items)
+    return items
+
+# Put a list into todo_lists as its position-th list, or after the others when position is None
+# The lists behind it keep their order, and lazily read lists are moved without reading them
+def place_list(todo_lists, name, items, position=None):
+    todo_lists[name] = items
+    if position is None:
+        return
+    for other in list(todo_lists)[position:-1]:
+        if isinstance(todo_lists, dict):
+            todo_lists[other] = todo_lists.pop(other)
+        else:
+            todo_lists.move_to_end(other)
+
+# Give a list a new name, it stays at its position among the lists
+def rename_list(todo_lists, old_name, new_name):
+    position = list(todo_lists).index(old_name)
+    place_list(todo_lists, new_name, todo_lists.pop(old_name), position)
+
+# Pause the cyclic garbage collector while many items are created
+# Items can't be part of a reference cycle, but every collection triggered by the allocations
+# would traverse all the items created so far, which more than doubles the time to build them
+@contextmanager
+def collector_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
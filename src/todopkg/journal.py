@@ -0,0 +1,148 @@
+import os
+import time
+from .dates import parse_date
+from .items import NO_PRIORITY, SortedItemList, TodoItem, place_list, rename_list, sorted_items
+
+# Append-only journal of mutations kept beside the json snapshot
+# Every mutation is written as one compact json array per line:
+#   ["create", name] or ["create", name, position] for a list restored at its old position
+#   ["delete", name]
+#   ["rename", old_name, new_name]
+#   ["add", name, item, priority or null, "YYYY-MM-DD" or null]
+#   ["remove", name, index, item]
+# The first line is a ["base", size, mtime_ns] header describing the snapshot the journal
+# applies to, so a journal left behind by an interrupted compaction is never replayed twice
+# json is imported by the methods that read or write records, importing the package does not load it
+class TodoJournal:
+
+    # Constructor, the journal is compacted once it grows past max_bytes or max_age seconds
+    def __init__(self, filename, max_bytes=1024 * 1024, max_age=300):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._file = None
+        self._size = 0
+        self._started = None
+
+    # Whether the journal is ready to accept records
+    def is_open(self):
+        return self._file is not None
+
+    # Append mutation records, each one costs O(1) regardless of the store size
+    # Returns the number of bytes appended
+    def append(self, records):
+        import json
+        lines = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+        self._file.write(lines)
+        self._file.flush()
+        self._size += len(lines)
+        if self._started is None:
+            self._started = time.monotonic()
+        return len(lines)
+
+    # Force the appended records to disk
+    def sync(self):
+        os.fsync(self._file.fileno())
+
+    # Whether the journal has passed its size or age threshold
+    def needs_compaction(self):
+        if self._size >= self.max_bytes:
+            return True
+        return self._started is not None and time.monotonic() - self._started >= self.max_age
+
+    # Start an empty journal for the snapshot that was just written
+    def reset(self, snapshot_filename):
+        import json
+        self.close()
+        self._file = open(self.filename, 'w')
+        self._size = 0
+        self._started = None
+        self._file.write(json.dumps(["base", *snapshot_stat(snapshot_filename)]) + '\n')
+        self._file.flush()
+
+    # Apply every journaled mutation to todo_lists and keep appending to the same journal
+    # A missing, stale or unreadable journal is replaced by an empty one
+    def replay(self, snapshot_filename, todo_lists):
+        self.close()
+        records = self._read_records(snapshot_filename)
+        if records is None:
+            self.reset(snapshot_filename)
+            return 0
+        for record in records:
+            apply_record(todo_lists, record)
+        self._file = open(self.filename, 'a')
+        self._size = os.path.getsize(self.filename)
+        # The journal was started when the snapshot was written, possibly by an earlier process,
+        # so short-lived processes that each append a few records still compact it once it is old
+        age = max(time.time() - os.path.getmtime(snapshot_filename), 0)
+        self._started = time.monotonic() - age if records else None
+        return len(records)
+
+    # Close the underlying file
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # Read the records written after the header, None if the journal does not match the snapshot
+    def _read_records(self, snapshot_filename):
+        import json
+        if not os.path.isfile(self.filename):
+            return None
+        records = []
+        with open(self.filename, 'r') as f:
+            header = f.readline()
+            try:
+                if json.loads(header) != ["base", *snapshot_stat(snapshot_filename)]:
+                    return None
+            except json.JSONDecodeError:
+                return None
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # a torn final line from an interrupted write
+        return records
+
+# Size and modification time identifying a snapshot file
+def snapshot_stat(snapshot_filename):
+    stat = os.stat(snapshot_filename)
+    return [stat.st_size, stat.st_mtime_ns]
+
+# Apply a single journal record to todo_lists
+def apply_record(todo_lists, record):
+    op = record[0]
+    if op == "create":
+        if record[1] not in todo_lists:
+            place_list(todo_lists, record[1], SortedItemList(), record[2] if len(record) > 2 else None)
+    elif op == "delete":
+        todo_lists.pop(record[1], None)
+    elif op == "rename":
+        old_name, new_name = record[1], record[2]
+        if old_name in todo_lists and new_name not in todo_lists:
+            rename_list(todo_lists, old_name, new_name)
+    elif op == "add":
+        name, item, priority, due_date = record[1:5]
+        if name not in todo_lists:
+            return
+        items = sorted_items(todo_lists, name)
+        if items.has_item(item):
+            return
+        items.add(TodoItem(item, priority, parse_date(due_date) if due_date else None))
+    elif op == "remove":
+        name, index, item = record[1:4]
+        if name not in todo_lists:
+            return
+        items = sorted_items(todo_lists, name)
+        if not items.has_item(item):
+            return
+        # Fall back to a search by name when the list differs from the one that was journaled
+        if not (0 <= index < len(items) and items[index].item == item):
+            index = next(position for position, item_data in enumerate(items) if item_data.item == item)
+        items.pop(index)
+
+# Build the journal record for an added item
+def add_record(name, item_data):
+    due_date = item_data.due_date
+    return ("add", name, item_data.item, None if item_data.priority_value == NO_PRIORITY else item_data.priority_value,
+            due_date.isoformat() if due_date is not None else None)
@@ -0,0 +1,124 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # fcntl is only available on Unix
+    fcntl = None
+
+# Advisory lock shared by every process that opens the same store
+# The lock file also holds a generation number that every locked write increases, so a process
+# can tell that the store changed even when the modification time of the file did not
+class StoreLock:
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    # Whether advisory file locks are supported on this platform
+    @staticmethod
+    def available():
+        return fcntl is not None
+
+    # Hold the lock for the duration of the block and yield the open lock file
+    # Readers can share the lock, writers hold it exclusively
+    @contextmanager
+    def hold(self, exclusive=True):
+        with open(self.filename, 'a+') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield f
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # Generation number stored in the held lock file, 0 before the first write
+    @staticmethod
+    def generation(f):
+        f.seek(0)
+        try:
+            return int(f.read() or 0)
+        except ValueError:
+            return 0
+
+    # Store the next generation number in the held lock file and return it
+    @staticmethod
+    def advance(f):
+        generation = StoreLock.generation(f) + 1
+        f.seek(0)
+        f.truncate()
+        f.write(str(generation))
+        f.flush()
+        return generation
+
+# Identity of the current version of a file, None when it does not exist
+# A rewrite through os.replace always changes the inode, so the stamp changes even when the size
+# and modification time happen to be the same
+def file_stamp(filename):
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+# Thread locks of a TodoListManager
+# The store lock guards which lists exist, and every list has its own lock guarding its items, so
+# threads working on different lists don't wait for each other. Locks are always taken in the
+# order store lock, then list locks, and only holders of the store lock take several list locks.
+class ListLocks:
+
+    # Constructor, contains(name) tells whether a list exists
+    def __init__(self, contains):
+        self.store = threading.RLock()
+        self._contains = contains
+        self._locks = {}  # list name -> RLock
+
+    # Lock of an existing list, created on first use, the store lock must be held
+    def of(self, name):
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks[name] = threading.RLock()
+        return lock
+
+    # Hold the lock of a single list, or the store lock if the list does not exist
+    # The store lock is only held to look the lock up, not while waiting for it. Without the list
+    # it is held for the whole block, so a list another thread creates meanwhile is not changed
+    # without its lock.
+    @contextmanager
+    def holding(self, name):
+        while True:
+            self.store.acquire()
+            if not self._contains(name):
+                lock = self.store
+                break
+            lock = self.of(name)
+            self.store.release()
+            lock.acquire()
+            # The list may have been renamed or deleted while this thread was waiting
+            if self._locks.get(name) is lock:
+                break
+            lock.release()
+        try:
+            yield
+        finally:
+            lock.release()
+
+    # Hold the store lock and the locks of the given lists, of every list when names is None
+    @contextmanager
+    def exclusive(self, names=None):
+        with self.store:
+            locks = list(self._locks.values()) if names is None else [self.of(name) for name in names]
+            for lock in locks:
+                lock.acquire()
+            try:
+                yield
+            finally:
+                for lock in reversed(locks):
+                    lock.release()
+
+    # Move the lock of a renamed list to its new name, the store lock and list lock must be held
+    def rename(self, old_name, new_name):
+        self._locks[new_name] = self._locks.pop(old_name)
+
+    # Forget the lock of a deleted list, the store lock and list lock must be held
+    def discard(self, name):
+        self._locks.pop(name, None)
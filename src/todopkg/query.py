@@ -0,0 +1,165 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import islice
+from .items import MAX_ORDINAL, NO_DUE_DATE, NO_PRIORITY, TodoItem
+
+UNDATED = MAX_ORDINAL + 1  # ordinal that sorts items without a due date after every real date
+APPLY_LIMIT = 1000  # item changes to one list at once past which sorting it again is cheaper
+
+# Cross-list queries over todo lists
+# Results come from lazily merging one sorted run per list with a heap, so asking for the top K
+# items costs O(K log L) heap work for L lists instead of sorting every item in the store.
+#
+# order='priority' follows the order of the lists themselves. Within one priority the items of a
+# list are already sorted by due date, so a due date range is a contiguous slice of every priority
+# group and is found with a binary search.
+#
+# order='due_date' uses DueDateIndex, which keeps every list's items sorted by due date. Committed
+# changes are applied to it item by item, and a list is only sorted again when it changed some
+# other way since the previous query.
+class DueDateIndex:
+
+    def __init__(self):
+        self._lists = {}  # list name -> [items, version, items in due date order, due ordinals]
+
+    # Items of a SortedItemList in due date order together with their due ordinals for binary
+    # searches, items without a due date come last with an ordinal past every real date
+    # With cache=False a list that has to be sorted again is not kept, used while a batch is open
+    # since its changes are applied once it is committed
+    def entries(self, name, items, cache=True):
+        cached = self._lists.get(name)
+        if cached is not None and cached[0] is items and cached[1] == items.version:
+            return cached[2], cached[3]
+        ordered = sorted(items, key=due_order_key)
+        ordinals = [item_data.due_ordinal or UNDATED for item_data in ordered]
+        if cache:
+            self._lists[name] = [items, items.version, ordered, ordinals]
+        return ordered, ordinals
+
+    # Apply committed (kind, name, index, item, new_name) changes to the lists kept in due date
+    # order, every changed list is locked
+    # An added item goes after the items with the same key, where sorting the list again puts it,
+    # and a removed one is found with a binary search, so a change costs O(log n) comparisons and
+    # moving the items after it instead of sorting the list again at the next query. Lists with
+    # more than APPLY_LIMIT added or removed items are left to be sorted again instead.
+    def apply(self, changes):
+        if not self._lists:
+            return
+        counts = Counter(change[1] for change in changes if change[0] in ('add', 'remove'))
+        for name, count in counts.items():
+            if count > APPLY_LIMIT:
+                self._lists.pop(name, None)
+        changed = {}
+        for change in changes:
+            kind, name = change[0], change[1]
+            cached = self._lists.get(name)
+            if cached is None:
+                continue
+            if kind == 'add':
+                ordered, ordinals = cached[2], cached[3]
+                item_data = change[3]
+                index = bisect_right(ordered, due_order_key(item_data), key=due_order_key)
+                ordered.insert(index, item_data)
+                ordinals.insert(index, item_data.due_ordinal or UNDATED)
+                changed[id(cached)] = cached
+            elif kind == 'remove':
+                ordered, ordinals = cached[2], cached[3]
+                item_data = change[3]
+                index = bisect_left(ordered, due_order_key(item_data), key=due_order_key)
+                while index < len(ordered) and ordered[index] is not item_data:
+                    index += 1
+                if index == len(ordered):
+                    del self._lists[name]  # the list changed some other way, it is sorted again
+                    continue
+                del ordered[index]
+                del ordinals[index]
+                changed[id(cached)] = cached
+            elif kind == 'delete':
+                del self._lists[name]
+            elif kind == 'rename':
+                self._lists[change[4]] = self._lists.pop(name)
+        # The lists now match their items as they were committed
+        for cached in changed.values():
+            cached[1] = cached[0].version
+
+    # Forget lists that are no longer in the store
+    def prune(self, names):
+        for name in list(self._lists):
+            if name not in names:
+                del self._lists[name]
+
+# Due date first, items without one last, then the order of the list
+def due_order_key(item_data):
+    return (item_data.due_ordinal or UNDATED, item_data.priority_value == NO_PRIORITY, item_data.priority_value)
+
+# Merge matching items of the given SortedItemList lists and return up to limit (list name, item) pairs
+# due_after and due_before are inclusive date ordinals, max_priority an inclusive int, and None
+# leaves a bound open
+def run_query(todo_lists, names, index, due_after=None, due_before=None, max_priority=None,
+              limit=None, order='priority', cache=True):
+    runs = []
+    for name in names:
+        items = todo_lists[name]
+        if order == 'due_date':
+            run = due_date_run(index, name, items, due_after, due_before, max_priority, cache)
+        else:
+            run = priority_run(items, due_after, due_before, max_priority)
+        runs.append(tagged(name, run))
+    if order == 'due_date':
+        merged = heapq.merge(*runs, key=lambda entry: due_order_key(entry[0]))
+    else:
+        merged = heapq.merge(*runs, key=lambda entry: entry[0].sort_key())
+    return [(name, item_data) for item_data, name in islice(merged, limit)]
+
+# Pair each item of a run with the name of its list
+def tagged(name, run):
+    for item_data in run:
+        yield item_data, name
+
+# Items of a list in list order, skipping to the due date range inside every priority group
+def priority_run(items, due_after, due_before, max_priority):
+    position = 0
+    count = len(items)
+    while position < count:
+        priority = items[position].priority_value
+        if max_priority is not None and (priority == NO_PRIORITY or priority > max_priority):
+            return
+        # The group of this priority ends before the first item with a larger priority
+        group_end = bisect_right(items, probe(priority, UNDATED), position, count)
+        start, end = position, group_end
+        if due_after is not None:
+            start = bisect_left(items, probe(priority, due_after), start, end)
+        if due_before is not None:
+            end = bisect_right(items, probe(priority, due_before), start, end)
+        for item_index in range(start, end):
+            item_data = items[item_index]
+            # Items without a due date sort last in their group and match no due date range
+            if item_data.due_ordinal == NO_DUE_DATE and (due_after is not None or due_before is not None):
+                break
+            yield item_data
+        position = group_end
+
+# Items of a list in due date order, limited to the due date range with binary searches
+def due_date_run(index, name, items, due_after, due_before, max_priority, cache=True):
+    ordered, ordinals = index.entries(name, items, cache)
+    start = bisect_left(ordinals, due_after) if due_after is not None else 0
+    if due_before is not None:
+        end = bisect_right(ordinals, due_before)
+    elif due_after is not None:
+        end = bisect_left(ordinals, UNDATED)
+    else:
+        end = len(ordinals)
+    for item_index in range(start, end):
+        item_data = ordered[item_index]
+        priority = item_data.priority_value
+        if max_priority is not None and (priority == NO_PRIORITY or priority > max_priority):
+            continue
+        yield item_data
+
+# Item that compares like an item with the given priority value and due ordinal
+def probe(priority, due_ordinal):
+    item_data = TodoItem(None)
+    item_data.priority_value = priority
+    item_data.due_ordinal = due_ordinal
+    return item_data
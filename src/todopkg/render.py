@@ -0,0 +1,225 @@
+import math
+import re
+from datetime import date
+from functools import lru_cache
+from itertools import islice
+from .items import NO_DUE_DATE, NO_PRIORITY, TodoItem
+
+HEADERS = ("Item", "Priority", "Due Date")
+MIN_PADDING = 2  # extra width every header gets, like tabulate
+BUFFERED_LINES = 1024  # lines collected before each write to the stream
+TRUNCATED = "..."
+
+# Column types, a column has the most generic type of its cells
+EMPTY, BOOL, INT, FLOAT, STR = range(5)
+THOUSANDS = re.compile(r'^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$')
+NUMBER_START = frozenset("+-.iInN")  # first characters of numbers besides digits and whitespace
+
+# Print (name, total item count, items to show) entries the way print_all_todo_lists does
+# offset is the position of the first shown item. Returns True, or the error message when
+# tablefmt needs the tabulate package and it is not installed.
+def print_lists(stream, lists_to_print, offset=0, sample=None, tablefmt="grid"):
+    for name, total, items in lists_to_print:
+        title = f"Todo List: {name}"
+        separator = "-" * (11 + len(title))
+        print(separator, file=stream)
+        print(title, file=stream)
+        print(separator, file=stream)
+        if not total:
+            print("This TodoList is empty.", file=stream)
+            continue
+        if not items:
+            print(f"No items to show, the TodoList has {total} items.", file=stream)
+            continue
+        if tablefmt == "grid":
+            write_grid(stream, items, sample)
+        else:
+            try:
+                from tabulate import tabulate
+            except ImportError:
+                print(f"The {tablefmt} table format requires the tabulate package.", file=stream)
+                return f"The {tablefmt} table format requires the tabulate package."
+            table = [[item_data['item'], 'N/A' if item_data['priority'] == float('inf') else item_data['priority'],
+                      item_data['due_date'].strftime('%Y-%m-%d') if item_data['due_date'] else 'No due date']
+                     for item_data in items]
+            print(tabulate(table, list(HEADERS), tablefmt=tablefmt), file=stream)
+        if len(items) < total:
+            print(f"Showing items {offset + 1}-{offset + len(items)} of {total}.", file=stream)
+        print(file=stream)
+    return True
+
+# Grid table renderer used by print_all_todo_lists
+# The output is the same as tabulate(rows, HEADERS, tablefmt="grid") of tabulate 0.10.0, including
+# how it tells numbers from text and aligns numeric columns, but rows are formatted from the
+# TodoItem fields and written to the stream as they are produced instead of building the whole
+# table in memory. Every character is taken to be one column wide, tabs included, the way tabulate
+# measures them without wcwidth. With wcwidth installed tabulate counts wide characters as two
+# columns and tabs and other control characters as -1, so cells with them are aligned differently.
+# ANSI color codes count as text here, while tabulate leaves them out of the widths.
+# Column types and widths are measured on every row, or only on the first sample rows, in which
+# case longer cells are truncated.
+def write_grid(stream, items, sample=None):
+    types = [EMPTY, INT, STR]
+    widths = [len(header) + MIN_PADDING for header in HEADERS]
+    # First pass: column types, the item column is the only one whose type depends on the data
+    for item_data in sampled(items, sample):
+        item_data = TodoItem.from_mapping(item_data)
+        if types[0] != STR:
+            types[0] = max(types[0], cell_type(item_data.item))
+        if item_data.priority_value == NO_PRIORITY:
+            types[1] = STR
+    # Second pass: column widths, numbers in a float column are padded so their decimal points line up
+    decimals, integral = -1, 0
+    for item_data in sampled(items, sample):
+        cells = row_cells(TodoItem.from_mapping(item_data), types)
+        for column, cell in enumerate(cells):
+            width = cell_width(cell)
+            if width > widths[column]:
+                widths[column] = width
+        if types[0] == FLOAT:
+            point = after_point(cells[0])
+            decimals = max(decimals, point)
+            integral = max(integral, len(cells[0]) - point)
+    if types[0] == FLOAT:
+        widths[0] = max(widths[0], integral + decimals)
+    aligns = [align_for(column_type) for column_type in types]
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+    header = '| ' + ' | '.join(align(title, width, column_align)
+                               for title, width, column_align in zip(HEADERS, widths, aligns)) + ' |'
+    lines = [border, header, border.replace('-', '=')]
+    # Last pass: format and write every row
+    for item_data in items:
+        item_data = TodoItem.from_mapping(item_data)
+        cells = row_cells(item_data, types)
+        if types[0] == FLOAT:
+            cells[0] = pad_decimal(cells[0], decimals)
+        if sample is not None:
+            cells = [truncate(cell, width) for cell, width in zip(cells, widths)]
+        if is_multiline(cells[0]):
+            lines.extend(multiline_row(cells, widths, aligns))
+        else:
+            lines.append('| ' + ' | '.join(align(cell, width, column_align)
+                                           for cell, width, column_align in zip(cells, widths, aligns)) + ' |')
+        lines.append(border)
+        if len(lines) >= BUFFERED_LINES:
+            stream.write('\n'.join(lines) + '\n')
+            lines = []
+    if lines:
+        stream.write('\n'.join(lines) + '\n')
+
+# Rows the column types and widths are measured on
+def sampled(items, sample):
+    return items if sample is None else islice(items, sample)
+
+# Formatted cells of a row, the item cell follows the type of its column
+def row_cells(item_data, types):
+    priority = 'N/A' if item_data.priority_value == NO_PRIORITY else str(item_data.priority_value)
+    return [format_cell(item_data.item, types[0]), priority, format_due_date(item_data.due_ordinal)]
+
+# Due date cell, real data reuses a small number of dates
+@lru_cache(maxsize=4096)
+def format_due_date(ordinal):
+    if ordinal == NO_DUE_DATE:
+        return 'No due date'
+    return date.fromordinal(ordinal).isoformat()
+
+# The least generic type of a single cell, following tabulate's rules
+# 'True' and 'False' are booleans, and numbers may have surrounding whitespace, underscores and
+# thousands separators
+def cell_type(value):
+    if value is None:
+        return EMPTY
+    if isinstance(value, str):
+        if not value:
+            return EMPTY
+        if value in ('True', 'False'):
+            return BOOL
+        # Most item names can't be numbers, which saves the conversions below
+        first = value[0]
+        if first not in NUMBER_START and not first.isdigit() and not first.isspace():
+            return STR
+        if is_convertible(int, value) or ('.' not in value and THOUSANDS.match(value)):
+            return INT
+        if is_number(value) or THOUSANDS.match(value):
+            return FLOAT
+        return STR
+    if hasattr(value, 'isoformat'):
+        return STR
+    if isinstance(value, bool):
+        return BOOL
+    if type(value) is int:
+        return INT
+    if type(value) is float or (not isinstance(value, bytes) and is_convertible(float, value)):
+        return FLOAT
+    return STR
+
+def is_convertible(conversion, value):
+    try:
+        conversion(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+# Whether a string is a number, strings that only overflow to infinity are not
+def is_number(value):
+    if not is_convertible(float, value):
+        return False
+    number = float(value)
+    return not (math.isinf(number) or math.isnan(number)) or value.lower() in ("inf", "-inf", "nan")
+
+# Text of a cell
+# Float columns are formatted with the 'g' format after dropping thousands separators. Numbers
+# keep the whitespace around them and right aligned, text is stripped and left aligned.
+def format_cell(value, column_type):
+    if value is None or value == '':
+        return ''
+    if column_type == FLOAT:
+        try:
+            return format(float(value.replace(',', '') if isinstance(value, str) else value), 'g')
+        except (ValueError, TypeError):
+            pass
+    text = value if isinstance(value, str) else str(value)
+    return text if column_type in (INT, FLOAT) else text.strip()
+
+# Whether a cell is printed on several lines
+def is_multiline(cell):
+    return '\n' in cell or '\r' in cell
+
+def cell_width(cell):
+    if is_multiline(cell):
+        return max(map(len, cell.splitlines()), default=0)
+    return len(cell)
+
+# Digits after the decimal point of a formatted number, -1 without one or for other text
+def after_point(cell):
+    if not (is_number(cell) or THOUSANDS.match(cell)) or is_convertible(int, cell):
+        return -1
+    position = cell.rfind('.')
+    if position < 0:
+        position = cell.lower().rfind('e')
+    return len(cell) - position - 1 if position >= 0 else -1
+
+# Pad a number so that the decimal points of a column line up
+def pad_decimal(cell, decimals):
+    return cell + ' ' * (decimals - after_point(cell))
+
+def align_for(column_type):
+    return 'right' if column_type in (INT, FLOAT) else 'left'
+
+def align(cell, width, column_align):
+    return cell.rjust(width) if column_align == 'right' else cell.ljust(width)
+
+# Cut a cell to the column width, used when widths come from a sample
+def truncate(cell, width):
+    if cell_width(cell) <= width:
+        return cell
+    return '\n'.join(line if len(line) <= width else line[:max(width - len(TRUNCATED), 0)] + TRUNCATED[:width]
+                     for line in (cell.splitlines() if is_multiline(cell) else [cell]))
+
+# Lines of a row whose item spans several lines, the other cells are on its first line
+def multiline_row(cells, widths, aligns):
+    columns = [cell.splitlines() for cell in cells]
+    height = max(len(column) for column in columns)
+    return ['| ' + ' | '.join(align(column[line] if line < len(column) else '', width, column_align)
+                              for column, width, column_align in zip(columns, widths, aligns)) + ' |'
+            for line in range(height)]
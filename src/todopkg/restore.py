@@ -0,0 +1,54 @@
+from .dates import parse_date
+from .items import SortedItemList, TodoItem
+
+# Build todo lists from decoded json data in a single pass
+# Every list is validated and sorted once, nothing is written to disk, and the
+# target dictionary is only updated after the whole data set passed validation
+def restore_todo_lists(data, todo_lists):
+    # Ensure that the data is a dictionary
+    if not isinstance(data, dict):
+        raise ValueError("The file does not contain a valid todo list format.")
+    restored = {}
+    for todo_list_name, tasks in data.items():
+        # Validate that tasks is a list of dictionaries
+        if not isinstance(tasks, list) or not all(isinstance(task, dict) for task in tasks):
+            raise ValueError(f"Tasks for {todo_list_name} are not in a valid format.")
+        # Lists that already exist in memory are merged with the restored tasks
+        items = [TodoItem.from_mapping(item_data) for item_data in todo_lists.get(todo_list_name, ())]
+        seen = {item_data.item for item_data in items}
+        for task in tasks:
+            item_data = restore_item(todo_list_name, task)
+            if item_data is None:
+                continue
+            if item_data.item in seen:
+                print(f"Item {item_data.item} already exists in the TodoList {todo_list_name}.")
+                continue
+            seen.add(item_data.item)
+            items.append(item_data)
+        # Sort the list once after all of its tasks are restored
+        restored[todo_list_name] = SortedItemList(items)
+    todo_lists.update(restored)
+    return todo_lists
+
+# Convert a single stored task into the in-memory item format
+# Returns None for tasks that add_item_to_todo_list would have rejected
+def restore_item(todo_list_name, task):
+    item_name = task.get('item')
+    priority = task.get('priority')
+    due_date = task.get('due_date')  # This should be a string in the format 'YYYY-MM-DD'
+    if priority == "Infinity":
+        priority = float('inf')
+    elif not isinstance(priority, (int, float)):
+        raise ValueError(f"Invalid priority for {item_name} in {todo_list_name}.")
+    elif priority != float('inf') and (not isinstance(priority, int) or priority < 0):
+        print("Priority must be a non-negative integer.")
+        return None
+    if due_date:
+        try:
+            due_date = parse_date(due_date)
+        except (TypeError, ValueError):
+            print("Due date must be in YYYY-MM-DD format.")
+            return None
+    else:
+        due_date = None
+    return TodoItem(item_name, priority, due_date)
@@ -0,0 +1,29 @@
+import atexit
+import weakref
+
+# Flushes every TodoListManager that is still alive when the program exits
+# A single atexit hook serves all managers, and the registry only holds weak references, so a
+# manager that is no longer used can be garbage collected instead of living until exit. Managers
+# with changes waiting for the autosave thread are kept alive by that thread until they are written.
+_managers = weakref.WeakSet()
+_hooked = False
+
+# Save manager when the program exits
+def register(manager):
+    global _hooked
+    if not _hooked:
+        atexit.register(save_all)
+        _hooked = True
+    _managers.add(manager)
+
+# Don't save manager when the program exits
+def unregister(manager):
+    _managers.discard(manager)
+
+# Save every registered manager, one failing save does not stop the others
+def save_all():
+    for manager in list(_managers):
+        try:
+            manager._save_at_exit()
+        except Exception as e:
+            print(f"Warning: An error occurred while saving {manager.filename} at exit. Error: {e}")
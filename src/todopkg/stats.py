@@ -0,0 +1,70 @@
+import threading
+import time
+from contextlib import contextmanager
+from .items import thread_sorts
+
+# Counters of an instrumented TodoListManager, see TodoListManager.stats
+# Operations are timed from the call to the return, including the time spent waiting for locks
+# and the write that makes the change durable. Sorts are the ones the thread made during the
+# outermost call of the manager, since lists don't know which manager they belong to, and bytes
+# are counted by the storage backend.
+class ManagerStats:
+
+    def __init__(self, backend=None):
+        self._lock = threading.Lock()
+        self._local = threading.local()  # whether the thread is inside a timed call
+        self.reset(backend)
+
+    # Start counting again from zero
+    def reset(self, backend=None):
+        with self._lock:
+            self._operations = {}  # operation name -> [calls, total seconds, slowest call]
+            self._saves = 0
+            self._sorts = 0
+            self._bytes = getattr(backend, 'bytes_written', 0)
+
+    # Record one call of an operation
+    def record(self, operation, seconds):
+        with self._lock:
+            timer = self._operations.get(operation)
+            if timer is None:
+                self._operations[operation] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    # Time a call of an operation and count the sorts made by the outermost call of the thread
+    @contextmanager
+    def timing(self, operation):
+        outermost = not getattr(self._local, 'active', False)
+        self._local.active = True
+        sorts = thread_sorts()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if outermost:
+                self._local.active = False
+                with self._lock:
+                    self._sorts += thread_sorts() - sorts
+            self.record(operation, seconds)
+
+    # Record one write to the storage backend
+    def record_save(self):
+        with self._lock:
+            self._saves += 1
+
+    # Counters as plain values
+    def snapshot(self, backend):
+        with self._lock:
+            operations = {operation: {'calls': calls, 'seconds': total, 'mean_seconds': total / calls, 'max_seconds': slowest}
+                          for operation, (calls, total, slowest) in sorted(self._operations.items())}
+            return {
+                'operations': operations,
+                'sorts': self._sorts,
+                'saves': self._saves,
+                'bytes_written': getattr(backend, 'bytes_written', 0) - self._bytes,
+            }
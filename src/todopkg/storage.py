@@ -0,0 +1,818 @@
+import json
+import os
+import re
+from collections.abc import MutableMapping
+from .dates import parse_date
+from .items import NO_DUE_DATE, NO_PRIORITY, SortedItemList, TodoItem, collector_paused, sorted_items
+from .journal import apply_record, snapshot_stat
+from .locking import StoreLock, file_stamp
+from .restore import restore_todo_lists
+from .writer import CustomEncoder, JsonStoreWriter  # noqa: F401 (CustomEncoder is re-exported)
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+BINARY_EXTENSIONS = ('.tdb',)
+SHARDED_EXTENSIONS = ('.shards',)
+SHARD_FILE = re.compile(r'shard-\d+-\d+\.json')
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Interface between TodoListManager and the place its todo lists are stored
+# Mutations are described by the records documented in journal.py
+# bytes_written counts the bytes of every file the backend wrote, SQLite writes are not counted
+class StorageBackend:
+    bytes_written = 0
+
+    # Whether there is stored data to load
+    def exists(self):
+        raise NotImplementedError
+
+    # Restore the stored lists into todo_lists and return the mapping the manager should use
+    def load(self, todo_lists):
+        raise NotImplementedError
+
+    # Write the complete state of todo_lists
+    def save(self, todo_lists):
+        raise NotImplementedError
+
+    # Persist the given mutation records, backends without incremental writes save everything
+    def persist(self, todo_lists, records):
+        self.save(todo_lists)
+
+    # Whether the next persist writes whole lists, the manager only copies the lists for it then
+    # Otherwise persist is given None instead of the lists
+    def writes_lists(self):
+        return True
+
+    # Make sure everything persisted so far survives a crash
+    def sync(self):
+        pass
+
+    # Release files or connections held by the backend
+    def close(self):
+        pass
+
+# Todo lists stored in a single json file, optionally with an append-only journal
+# In lazy mode only the position of every list in the file is read when the store is opened,
+# from the '<filename>.index' file written by save or by scanning the file when that is stale,
+# and each list is decoded the first time it is used
+class JsonFileBackend(StorageBackend):
+
+    # Constructor, journal is a TodoJournal or None to rewrite the file on every mutation
+    def __init__(self, filename, journal=None, lazy=False):
+        self.filename = filename
+        self.journal = journal
+        self.lazy = lazy
+        self.index_filename = filename + '.index'
+        self.writer = JsonStoreWriter()
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    # Restore the lists from the json file and replay the journal
+    def load(self, todo_lists):
+        if not os.path.isfile(self.filename):
+            raise FileNotFoundError(f"The file {self.filename} does not exist.")
+        if self.lazy and not todo_lists:
+            todo_lists = LazyTodoLists(self._read_index(), self._load_list)
+            if self.journal is not None:
+                self.journal.replay(self.filename, todo_lists)
+            return todo_lists
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            raise ValueError("The file could not be decoded as JSON.")
+        # Validate and build every list in one pass without replaying add_item_to_todo_list
+        restore_todo_lists(data, todo_lists)
+        # Apply the mutations journaled since the json file was last written
+        if self.journal is not None:
+            self.journal.replay(self.filename, todo_lists)
+        return todo_lists
+
+    # Save to json file one list at a time, see JsonStoreWriter
+    # Lists a lazy store never decoded are copied from the current file as they are
+    # In journal mode this is the compaction step and starts an empty journal
+    def save(self, todo_lists):
+        raw_lists = todo_lists.unloaded_positions() if isinstance(todo_lists, LazyTodoLists) else None
+        positions = self.writer.write(self.filename, todo_lists, raw_lists)
+        self.bytes_written += os.path.getsize(self.filename)
+        if isinstance(todo_lists, LazyTodoLists):
+            todo_lists.relocate(positions)
+        if self.lazy:
+            with open(self.index_filename, 'w') as f:
+                json.dump({'base': snapshot_stat(self.filename),
+                           'lists': [[name, *position] for name, position in positions.items()]}, f)
+        if self.journal is not None:
+            self.journal.reset(self.filename)
+
+    # Positions of every list in the json file, from the index file when it matches the file
+    def _read_index(self):
+        try:
+            with open(self.index_filename, 'r') as f:
+                index = json.load(f)
+            if index['base'] == snapshot_stat(self.filename):
+                return {name: (offset, length) for name, offset, length in index['lists']}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        with open(self.filename, 'rb') as f:
+            return scan_json_index(f.read())
+
+    # Decode a single list from its position in the json file
+    def _load_list(self, name, position):
+        offset, length = position
+        with open(self.filename, 'rb') as f:
+            f.seek(offset)
+            tasks = json.loads(f.read(length))
+        return restore_todo_lists({name: tasks}, {})[name]
+
+    # Append the records to the journal, or rewrite the whole file without one
+    # A journal that passes its threshold with this append is compacted by the next write, which
+    # is given the lists
+    def persist(self, todo_lists, records):
+        if self.journal is None or not self.journal.is_open():
+            self.save(todo_lists)
+            return
+        self.bytes_written += self.journal.append(records)
+        if todo_lists is not None and self.journal.needs_compaction():
+            self.save(todo_lists)
+
+    def writes_lists(self):
+        return self.journal is None or not self.journal.is_open() or self.journal.needs_compaction()
+
+    # Saves are fsynced by the writer, journal appends are fsynced here
+    def sync(self):
+        if self.journal is not None and self.journal.is_open():
+            self.journal.sync()
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+# Json file shared by several processes, each with its own TodoListManager
+# Every write takes an exclusive advisory lock on '<filename>.lock' for the whole
+# read-modify-write. If another process wrote the file since this one last read it, the file is
+# read again and the new mutation records are replayed on top of it before writing, so concurrent
+# changes are merged instead of the last writer overwriting the others. Conflicting records
+# (an item added to a list another process deleted, a rename onto a name that now exists) are
+# dropped the same way a journal replay drops them.
+class SharedJsonBackend(JsonFileBackend):
+
+    def __init__(self, filename):
+        if not StoreLock.available():
+            raise ValueError("Shared mode requires advisory file locks (fcntl), which this platform does not support.")
+        super().__init__(filename)
+        self.lock = StoreLock(filename + '.lock')
+        self.version = None  # (generation, file stamp) of the contents last read or written
+
+    # Read the current contents of the file, replacing todo_lists
+    def load(self, todo_lists):
+        with self.lock.hold(exclusive=False) as lock_file:
+            todo_lists = self._read()
+            self.version = (StoreLock.generation(lock_file), file_stamp(self.filename))
+        return todo_lists
+
+    # Bring todo_lists up to date with the file if another process changed it
+    # Returns True when the lists were read again
+    def refresh(self, todo_lists):
+        with self.lock.hold(exclusive=False) as lock_file:
+            version = (StoreLock.generation(lock_file), file_stamp(self.filename))
+            if version == self.version:
+                return False
+            fresh = self._read()
+            self.version = version
+        replace_contents(todo_lists, fresh)
+        return True
+
+    # A full save merges with the file like any other write, see persist
+    def save(self, todo_lists):
+        self.persist(todo_lists, [])
+
+    # Write the records under the lock, replaying them on the current file if it changed
+    # Returns True when the lists were replaced with the merged contents of the file
+    def persist(self, todo_lists, records):
+        merged = False
+        with self.lock.hold() as lock_file:
+            if (StoreLock.generation(lock_file), file_stamp(self.filename)) != self.version:
+                fresh = self._read()
+                for record in records:
+                    apply_record(fresh, record)
+                replace_contents(todo_lists, fresh)
+                merged = True
+            self.writer.write(self.filename, todo_lists)
+            self.version = (StoreLock.advance(lock_file), file_stamp(self.filename))
+            self.bytes_written += os.path.getsize(self.filename)
+        return merged
+
+    # Lists stored in the file, empty if there is no file yet
+    def _read(self):
+        if not os.path.isfile(self.filename):
+            return {}
+        return JsonFileBackend.load(self, {})
+
+# Todo lists stored in a binary snapshot file, optionally with an append-only journal
+# The format is described in binary.py: loading maps the file and builds the lists from its
+# columns without parsing any field, and saving writes the columns of every list in one pass.
+class BinaryFileBackend(StorageBackend):
+
+    # Constructor, journal is a TodoJournal or None to rewrite the file on every mutation
+    def __init__(self, filename, journal=None):
+        from .binary import BinarySnapshotWriter
+        self.filename = filename
+        self.journal = journal
+        self.writer = BinarySnapshotWriter()
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    # Restore the lists from the snapshot and replay the journal
+    def load(self, todo_lists):
+        from .binary import read_snapshot
+        if not os.path.isfile(self.filename):
+            raise FileNotFoundError(f"The file {self.filename} does not exist.")
+        read_snapshot(self.filename, todo_lists)
+        if self.journal is not None:
+            self.journal.replay(self.filename, todo_lists)
+        return todo_lists
+
+    # In journal mode this is the compaction step and starts an empty journal
+    def save(self, todo_lists):
+        self.writer.write(self.filename, todo_lists)
+        self.bytes_written += os.path.getsize(self.filename)
+        if self.journal is not None:
+            self.journal.reset(self.filename)
+
+    # Append the records to the journal, or rewrite the whole file without one
+    # A journal that passes its threshold with this append is compacted by the next write, which
+    # is given the lists
+    def persist(self, todo_lists, records):
+        if self.journal is None or not self.journal.is_open():
+            self.save(todo_lists)
+            return
+        self.bytes_written += self.journal.append(records)
+        if todo_lists is not None and self.journal.needs_compaction():
+            self.save(todo_lists)
+
+    def writes_lists(self):
+        return self.journal is None or not self.journal.is_open() or self.journal.needs_compaction()
+
+    # Saves are fsynced by the writer, journal appends are fsynced here
+    def sync(self):
+        if self.journal is not None and self.journal.is_open():
+            self.journal.sync()
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+# Todo lists spread over several json files in a directory, with a manifest
+# Every list gets a numeric id when it is first written and is stored in shard file id %
+# shard_count, under its id. The manifest, 'manifest.json' in the directory, holds the names and
+# ids of the lists in store order and the file of every shard:
+#   {"format": 1, "shard_count": 16, "generation": 7, "next_id": 40,
+#    "shards": {"0": "shard-0-7.json", ...}, "lists": [["Work", 0], ["Home", 1], ...]}
+# A write only rewrites the shards holding lists that changed, found through the version of every
+# list, and a rename only rewrites the manifest since the list keeps its id. Shard files are
+# written under new names and the manifest is replaced last, so a crash leaves the previous
+# complete store in place. Shards can be read by a pool of threads or processes.
+class ShardedJsonBackend(StorageBackend):
+    MANIFEST_FORMAT = 1
+
+    # Constructor, directory holds the manifest and the shard files
+    # shard_count only applies to a new store, existing stores keep the count they were written with
+    # With workers > 1 shards are loaded by a pool of that many threads, or processes with
+    # pool='process', which decode and sort the lists in parallel
+    def __init__(self, directory, shard_count=16, workers=1, pool='thread'):
+        if not isinstance(shard_count, int) or shard_count < 1:
+            raise ValueError("Shard count must be a positive integer.")
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("Workers must be a positive integer.")
+        if pool not in ('thread', 'process'):
+            raise ValueError("Pool must be 'thread' or 'process'.")
+        self.filename = directory
+        self.manifest_filename = os.path.join(directory, 'manifest.json')
+        self.shard_count = shard_count
+        self.workers = workers
+        self.pool = pool
+        self.generation = 0
+        self.next_id = 0
+        self.shards = {}  # shard index -> file name, shards without lists have no file
+        self.lists = {}  # list name -> (id, version) of the stored contents, version None if unknown
+        self.writers = {}  # shard index -> JsonStoreWriter
+        self.swept = False  # whether shard files left behind by a crash were removed
+
+    def exists(self):
+        return os.path.exists(self.manifest_filename)
+
+    # Restore the lists of every shard
+    # Lists that already exist in todo_lists are merged with the stored items
+    def load(self, todo_lists):
+        manifest = self._read_manifest()
+        stored = self._load_shards(list(manifest['shards'].values()))
+        self.shard_count = manifest['shard_count']
+        self.generation = manifest['generation']
+        self.next_id = manifest['next_id']
+        self.shards = {int(shard): file for shard, file in manifest['shards'].items()}
+        self.lists = {}
+        for name, list_id in manifest['lists']:
+            if list_id not in stored:
+                raise ValueError("The sharded store is truncated or corrupted.")
+            items = stored[list_id]
+            if name in todo_lists:
+                existing = sorted_items(todo_lists, name)
+                existing.extend(item_data for item_data in items if not existing.has_item(item_data.item))
+                self.lists[name] = (list_id, None)
+            else:
+                todo_lists[name] = items
+                self.lists[name] = (list_id, items.version)
+        return todo_lists
+
+    # Rewrite the shards whose lists changed since the previous write, then the manifest
+    def save(self, todo_lists):
+        lists, changed = self._assign_ids(todo_lists)
+        removed = {list_id for list_id, version in self.lists.values()} - {list_id for list_id, version in lists.values()}
+        dirty = {list_id % self.shard_count for list_id in changed | removed}
+        if not dirty and list(lists.items()) == list(self.lists.items()) and self.exists():
+            return
+        os.makedirs(self.filename, exist_ok=True)
+        if self.generation == 0 and self.exists():
+            # Replacing a store this backend did not load, its files must not be overwritten
+            self.generation = self._read_manifest()['generation']
+        generation = self.generation + 1
+        shards = dict(self.shards)
+        for shard in sorted(dirty):
+            members = {str(list_id): todo_lists[name] for name, (list_id, version) in lists.items()
+                       if list_id % self.shard_count == shard}
+            shards.pop(shard, None)
+            if members:
+                shards[shard] = f'shard-{shard}-{generation}.json'
+                writer = self.writers.setdefault(shard, JsonStoreWriter())
+                writer.write(os.path.join(self.filename, shards[shard]), members)
+                self.bytes_written += os.path.getsize(os.path.join(self.filename, shards[shard]))
+        self._write_manifest({
+            'format': self.MANIFEST_FORMAT,
+            'shard_count': self.shard_count,
+            'generation': generation,
+            'next_id': self.next_id,
+            'shards': {str(shard): shards[shard] for shard in sorted(shards)},
+            'lists': [[name, list_id] for name, (list_id, version) in lists.items()],
+        })
+        # The new manifest is in place, the files it replaced are no longer needed
+        replaced = set(self.shards.values()) - set(shards.values())
+        self.generation, self.shards, self.lists = generation, shards, lists
+        self._remove_shard_files(replaced)
+
+    # (id, version) of every list of todo_lists and the ids of the lists whose contents changed
+    # Unchanged lists keep their id, and so does a list stored under another name before, which
+    # is how renames are found. Changed lists keep the id of their name unless a renamed list took
+    # it, new lists get the next free id.
+    def _assign_ids(self, todo_lists):
+        by_version = {version: (name, list_id) for name, (list_id, version) in self.lists.items() if version is not None}
+        lists = {}
+        taken = set()
+        for name, items in todo_lists.items():
+            version = getattr(items, 'version', None)
+            known = self.lists.get(name)
+            if version is None:
+                continue
+            if known is not None and known[1] == version:
+                lists[name] = known
+                taken.add(known[0])
+            elif version in by_version and by_version[version][0] not in todo_lists:
+                lists[name] = (by_version[version][1], version)
+                taken.add(by_version[version][1])
+        changed = set()
+        for name, items in todo_lists.items():
+            if name in lists:
+                continue
+            known = self.lists.get(name)
+            if known is not None and known[0] not in taken:
+                list_id = known[0]
+            else:
+                list_id = self.next_id
+                self.next_id += 1
+            taken.add(list_id)
+            changed.add(list_id)
+            lists[name] = (list_id, getattr(items, 'version', None))
+        # Keep the order of todo_lists
+        return {name: lists[name] for name in todo_lists}, changed
+
+    # Lists of the given shard files as {list id: SortedItemList}
+    def _load_shards(self, files):
+        paths = [os.path.join(self.filename, file) for file in files]
+        if self.workers == 1 or len(paths) < 2:
+            shards = map(read_shard, paths)
+            return {list_id: items for shard in shards for list_id, items in shard.items()}
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        if self.pool == 'thread':
+            with ThreadPoolExecutor(self.workers) as executor:
+                shards = list(executor.map(read_shard, paths))
+            return {list_id: items for shard in shards for list_id, items in shard.items()}
+        from .binary import make_item
+        with ProcessPoolExecutor(self.workers) as executor:
+            shards = list(executor.map(read_shard_columns, paths))
+        stored = {}
+        with collector_paused():
+            for shard in shards:
+                for list_id, columns in shard.items():
+                    stored[list_id] = SortedItemList.from_sorted(list(map(make_item, *columns)))
+        return stored
+
+    def _read_manifest(self):
+        if not os.path.isfile(self.manifest_filename):
+            raise FileNotFoundError(f"The file {self.manifest_filename} does not exist.")
+        try:
+            with open(self.manifest_filename, 'r') as f:
+                manifest = json.load(f)
+        except json.JSONDecodeError:
+            raise ValueError("The shard manifest could not be decoded as JSON.")
+        if not isinstance(manifest, dict) or manifest.get('format') != self.MANIFEST_FORMAT:
+            raise ValueError("The file is not a todopkg shard manifest.")
+        return manifest
+
+    # Replace the manifest, the commit point of every write
+    def _write_manifest(self, manifest):
+        temporary = f'{self.manifest_filename}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'w') as f:
+                json.dump(manifest, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.manifest_filename)
+            self.bytes_written += os.path.getsize(self.manifest_filename)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    # Remove shard files, and on the first write the ones a crashed write left behind
+    def _remove_shard_files(self, files):
+        if not self.swept:
+            current = set(self.shards.values())
+            files = set(files) | {file for file in os.listdir(self.filename)
+                                  if SHARD_FILE.fullmatch(file) and file not in current}
+            self.swept = True
+        for file in files:
+            try:
+                os.remove(os.path.join(self.filename, file))
+            except FileNotFoundError:
+                pass
+
+# Lists of one shard file as {list id: SortedItemList}
+def read_shard(path):
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except json.JSONDecodeError:
+        raise ValueError("The file could not be decoded as JSON.")
+    return {int(list_id): items for list_id, items in restore_todo_lists(data, {}).items()}
+
+# Lists of one shard file as {list id: (item names, priorities, due ordinals)} in sorted order
+# Used by worker processes, columns are much cheaper to send back than TodoItem objects
+def read_shard_columns(path):
+    return {list_id: ([item_data.item for item_data in items],
+                      [item_data.priority_value for item_data in items],
+                      [item_data.due_ordinal for item_data in items])
+            for list_id, items in read_shard(path).items()}
+
+# Make todo_lists hold exactly the lists of fresh without replacing the mapping itself
+def replace_contents(todo_lists, fresh):
+    todo_lists.clear()
+    todo_lists.update(fresh)
+
+# Todo lists stored in an SQLite database using the standard library sqlite3 module
+# sqlite3 is imported when the database is first opened, json stores never load it
+# Every mutation updates only the rows it touches, and lists are read from the database
+# the first time they are used instead of when the manager is opened
+class SqliteBackend(StorageBackend):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS todo_lists (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS todo_items (
+            id INTEGER PRIMARY KEY,
+            list_id INTEGER NOT NULL REFERENCES todo_lists (id) ON DELETE CASCADE,
+            item TEXT,
+            priority INTEGER,
+            due_date INTEGER,
+            UNIQUE (list_id, item)
+        );
+        CREATE INDEX IF NOT EXISTS todo_items_order ON todo_items (list_id, priority, due_date);
+        CREATE INDEX IF NOT EXISTS todo_items_priority ON todo_items (priority);
+        CREATE INDEX IF NOT EXISTS todo_items_due_date ON todo_items (due_date);
+    """
+    # Same order as TodoItem, items without a priority or due date come last and ties keep
+    # their insertion order
+    ORDER = "ORDER BY priority IS NULL, priority, due_date IS NULL, due_date, id"
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._connection = None
+        self._stored = {}  # name -> version of the list the database holds, see save
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    # Open the database and read the list names, items are read lazily by load_list
+    def load(self, todo_lists):
+        if not os.path.isfile(self.filename):
+            raise FileNotFoundError(f"The file {self.filename} does not exist.")
+        import sqlite3
+        try:
+            names = [row[0] for row in self.connection.execute("SELECT name FROM todo_lists ORDER BY id")]
+        except sqlite3.DatabaseError:
+            raise ValueError("The file could not be read as an SQLite database.")
+        if not todo_lists:
+            return LazyTodoLists(dict.fromkeys(names), self.load_list)
+        # Lists that already exist in memory are merged with the stored items
+        for name in names:
+            stored = self.load_list(name)
+            if name in todo_lists:
+                items = todo_lists[name]
+                items.extend(item_data for item_data in stored if not items.has_item(item_data.item))
+            else:
+                todo_lists[name] = stored
+        return todo_lists
+
+    # Read the items of a single list, ORDER already returns them in sorted order
+    def load_list(self, name, position=None):
+        rows = self.connection.execute(
+            "SELECT item, priority, due_date FROM todo_items"
+            " WHERE list_id = (SELECT id FROM todo_lists WHERE name = ?) " + self.ORDER, (name,))
+        items = []
+        for item, priority, due_ordinal in rows:
+            item_data = TodoItem(item)
+            if priority is not None:
+                item_data.priority_value = priority
+            if due_ordinal is not None:
+                item_data.due_ordinal = due_ordinal
+            items.append(item_data)
+        items = SortedItemList.from_sorted(items)
+        self._stored[name] = items.version
+        return items
+
+    # Replace the stored lists with todo_lists in one transaction
+    # Lists that were never loaded from the database are left untouched, and so are lists whose
+    # version, or the version of their snapshot, is the one the database already holds
+    def save(self, todo_lists):
+        loaded = todo_lists.loaded_items() if isinstance(todo_lists, LazyTodoLists) else todo_lists.items()
+        with self.connection:
+            stored = {row[0] for row in self.connection.execute("SELECT name FROM todo_lists")}
+            self.connection.executemany(
+                "DELETE FROM todo_lists WHERE name = ?", [(name,) for name in stored if name not in todo_lists])
+            saved = {}
+            for name, items in loaded:
+                version = getattr(items, 'version', None)
+                if version is not None and name in stored and self._stored.get(name) == version:
+                    saved[name] = version
+                    continue
+                self.connection.execute("INSERT OR IGNORE INTO todo_lists (name) VALUES (?)", (name,))
+                list_id = self._list_id(name)
+                self.connection.execute("DELETE FROM todo_items WHERE list_id = ?", (list_id,))
+                self.connection.executemany(
+                    "INSERT INTO todo_items (list_id, item, priority, due_date) VALUES (?, ?, ?, ?)",
+                    [(list_id, *item_row(item_data)) for item_data in items])
+                saved[name] = version
+        self._stored = saved
+
+    # Apply each record to the rows it touches, all records share one transaction
+    # Given the lists, the stored lists and those the records touched now match the database,
+    # otherwise the lists the records touched are written again by the next save
+    def persist(self, todo_lists, records):
+        with self.connection:
+            for record in records:
+                self._apply(record)
+        touched = {record[1] for record in records} | {record[2] for record in records if record[0] == "rename"}
+        if todo_lists is None:
+            for name in touched:
+                self._stored.pop(name, None)
+            return
+        loaded = todo_lists.loaded_items() if isinstance(todo_lists, LazyTodoLists) else todo_lists.items()
+        self._stored = {name: getattr(items, 'version', None) for name, items in loaded
+                        if name in self._stored or name in touched}
+
+    def writes_lists(self):
+        return False
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    # The database connection, opened and initialised on first use
+    # The manager serialises access, so the connection may be used by its autosave thread
+    @property
+    def connection(self):
+        if self._connection is None:
+            import sqlite3
+            self._connection = sqlite3.connect(self.filename, check_same_thread=False)
+            self._connection.execute("PRAGMA foreign_keys = ON")
+            self._connection.executescript(self.SCHEMA)
+        return self._connection
+
+    def _list_id(self, name):
+        return self.connection.execute("SELECT id FROM todo_lists WHERE name = ?", (name,)).fetchone()[0]
+
+    def _apply(self, record):
+        op = record[0]
+        if op == "create":
+            if len(record) > 2 and record[2] is not None:
+                self._insert_list(record[1], record[2])
+            else:
+                self.connection.execute("INSERT OR IGNORE INTO todo_lists (name) VALUES (?)", (record[1],))
+        elif op == "delete":
+            self.connection.execute("DELETE FROM todo_lists WHERE name = ?", (record[1],))
+        elif op == "rename":
+            self.connection.execute("UPDATE todo_lists SET name = ? WHERE name = ?", (record[2], record[1]))
+        elif op == "add":
+            name, item, priority, due_date = record[1:5]
+            self.connection.execute(
+                "INSERT OR IGNORE INTO todo_items (list_id, item, priority, due_date)"
+                " VALUES ((SELECT id FROM todo_lists WHERE name = ?), ?, ?, ?)",
+                (name, item, priority, parse_date(due_date).toordinal() if due_date else None))
+        elif op == "remove":
+            self.connection.execute(
+                "DELETE FROM todo_items WHERE list_id = (SELECT id FROM todo_lists WHERE name = ?) AND item = ?",
+                (record[1], record[3]))
+
+    # Store a new list as the position-th list, lists are read in id order
+    # The lists from that position on get ids past the largest one, with the foreign keys of their
+    # items checked once the transaction commits
+    def _insert_list(self, name, position):
+        following = self.connection.execute(
+            "SELECT id FROM todo_lists ORDER BY id LIMIT 1 OFFSET ?", (position,)).fetchone()
+        if following is None or self.connection.execute(
+                "SELECT 1 FROM todo_lists WHERE name = ?", (name,)).fetchone() is not None:
+            self.connection.execute("INSERT OR IGNORE INTO todo_lists (name) VALUES (?)", (name,))
+            return
+        list_id = following[0]
+        shift = self.connection.execute("SELECT MAX(id) FROM todo_lists").fetchone()[0]
+        if not self.connection.in_transaction:
+            self.connection.execute("BEGIN")
+        self.connection.execute("PRAGMA defer_foreign_keys = ON")
+        self.connection.execute("UPDATE todo_lists SET id = id + ? WHERE id >= ?", (shift, list_id))
+        self.connection.execute("UPDATE todo_items SET list_id = list_id + ? WHERE list_id >= ?", (shift, list_id))
+        self.connection.execute("INSERT INTO todo_lists (id, name) VALUES (?, ?)", (list_id, name))
+
+# Column values stored for an item, missing fields are NULL
+def item_row(item_data):
+    item_data = TodoItem.from_mapping(item_data)
+    priority = None if item_data.priority_value == NO_PRIORITY else item_data.priority_value
+    due_ordinal = None if item_data.due_ordinal == NO_DUE_DATE else item_data.due_ordinal
+    return (item_data.item, priority, due_ordinal)
+
+# Mapping of list names to todo lists whose items are loaded on first access
+# Membership checks, iteration over names and len never load a list
+class LazyTodoLists(MutableMapping):
+
+    # Constructor, positions maps each stored list name to where the backend finds it, and
+    # loader(name, position) returns the SortedItemList for that list
+    def __init__(self, positions, loader):
+        self._positions = dict(positions)
+        self._lists = dict.fromkeys(self._positions)
+        self._loader = loader
+
+    # Whether the items of the list were already read
+    def is_loaded(self, name):
+        return name not in self._positions
+
+    # Positions of the lists that were not read yet
+    def unloaded_positions(self):
+        return dict(self._positions)
+
+    # Update the positions of the lists that were not read yet after the store was rewritten
+    def relocate(self, positions):
+        for name in self._positions:
+            self._positions[name] = positions[name]
+
+    # (name, items) pairs of the lists that were already read
+    def loaded_items(self):
+        return [(name, items) for name, items in self._lists.items() if name not in self._positions]
+
+    # Move a list after the others, like OrderedDict.move_to_end, without reading it
+    def move_to_end(self, name):
+        self._lists[name] = self._lists.pop(name)
+
+    def __getitem__(self, name):
+        items = self._lists[name]
+        if name in self._positions:
+            items = self._lists[name] = self._loader(name, self._positions.pop(name))
+        return items
+
+    def __setitem__(self, name, items):
+        self._positions.pop(name, None)
+        self._lists[name] = items
+
+    def __delitem__(self, name):
+        del self._lists[name]
+        self._positions.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._lists
+
+    def __iter__(self):
+        return iter(self._lists)
+
+    def __len__(self):
+        return len(self._lists)
+
+    def __repr__(self):
+        return f"LazyTodoLists({list(self._lists)!r})"
+
+# Positions of the top level lists in a json document, used when the index file is stale
+# The bytes are decoded as latin-1 so character offsets are byte offsets, which is safe because
+# every byte of a multi-byte utf-8 character is outside the ascii range json syntax uses
+def scan_json_index(data):
+    text = data.decode('latin-1')
+    decoder = json.JSONDecoder()
+    position = JSON_WHITESPACE.match(text).end()
+    if text[position:position + 1] != '{':
+        raise ValueError("The file does not contain a valid todo list format.")
+    position = JSON_WHITESPACE.match(text, position + 1).end()
+    positions = {}
+    closed = text[position:position + 1] == '}'
+    while not closed:
+        if text[position:position + 1] != '"':
+            raise ValueError("The file could not be decoded as JSON.")
+        key_end = json.decoder.scanstring(text, position + 1)[1]
+        key = json.loads(data[position:key_end])
+        position = JSON_WHITESPACE.match(text, key_end).end()
+        if text[position:position + 1] != ':':
+            raise ValueError("The file could not be decoded as JSON.")
+        position = JSON_WHITESPACE.match(text, position + 1).end()
+        if text[position:position + 1] != '[':
+            raise ValueError(f"Tasks for {key} are not in a valid format.")
+        # The C decoder finds the end of the list, the decoded value is discarded
+        try:
+            end = decoder.raw_decode(text, position)[1]
+        except json.JSONDecodeError:
+            raise ValueError("The file could not be decoded as JSON.")
+        positions[key] = (position, end - position)
+        position = JSON_WHITESPACE.match(text, end).end()
+        separator = text[position:position + 1]
+        if separator == ',':
+            position = JSON_WHITESPACE.match(text, position + 1).end()
+        elif separator == '}':
+            closed = True
+        else:
+            raise ValueError("The file could not be decoded as JSON.")
+    if text[position + 1:].strip():
+        raise ValueError("The file could not be decoded as JSON.")
+    return positions
+
+# Create the backend for filename
+# backend is None to choose from the file extension, 'json', 'sqlite', 'binary', 'sharded' or a
+# StorageBackend instance. shared=True selects SharedJsonBackend for json files used by several processes at once
+def open_backend(filename, backend=None, journal=None, lazy=False, shared=False):
+    if isinstance(backend, StorageBackend):
+        return backend
+    if backend is None:
+        backend = backend_for(filename)
+    if shared:
+        if backend != 'json' or journal is not None or lazy:
+            raise ValueError("Shared mode is only available for the json backend without journal or lazy loading.")
+        return SharedJsonBackend(filename)
+    if backend == 'json':
+        return JsonFileBackend(filename, journal, lazy)
+    if backend == 'sqlite':
+        if journal is not None:
+            raise ValueError("Journal mode is only available for the json and binary backends.")
+        return SqliteBackend(filename)
+    if backend == 'binary':
+        if lazy:
+            raise ValueError("Lazy loading is only available for the json backend.")
+        return BinaryFileBackend(filename, journal)
+    if backend == 'sharded':
+        if journal is not None:
+            raise ValueError("Journal mode is only available for the json and binary backends.")
+        if lazy:
+            raise ValueError("Lazy loading is only available for the json backend.")
+        return ShardedJsonBackend(filename)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+# Backend name for a file extension, json unless the extension is a known sqlite, binary or
+# sharded one
+def backend_for(filename):
+    extension = os.path.splitext(os.path.normpath(filename))[1].lower()
+    if extension in SQLITE_EXTENSIONS:
+        return 'sqlite'
+    if extension in BINARY_EXTENSIONS:
+        return 'binary'
+    if extension in SHARDED_EXTENSIONS:
+        return 'sharded'
+    return 'json'
+
+# Copy the lists stored in source to target, replacing target
+# The backends are chosen from the file extensions unless given, so this converts between the
+# json, binary and sqlite formats. Returns the number of lists copied.
+def convert_store(source, target, source_backend=None, target_backend=None):
+    reader = open_backend(source, source_backend)
+    writer = open_backend(target, target_backend)
+    try:
+        todo_lists = reader.load({})
+        if isinstance(todo_lists, LazyTodoLists):
+            todo_lists = {name: todo_lists[name] for name in todo_lists}
+        writer.save(todo_lists)
+    finally:
+        reader.close()
+        writer.close()
+    return len(todo_lists)
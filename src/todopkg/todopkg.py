@@ -1,61 +1,176 @@
-import atexit
-import json
+import functools
 import os
-from datetime import date, datetime
-from tabulate import tabulate
-
-# Class to encode the due date and priority when saving the lists to the json file
-class CustomEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, date):
-            return obj.isoformat()
-        if isinstance(obj, float) and obj == float('inf'):
-            return "Infinity"
-        return json.JSONEncoder.default(self, obj)
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import date
+from . import shutdown
+from .changes import ChangeFeed
+from .dates import parse_date, parse_dates
+from .history import UndoHistory
+from .items import ItemSnapshot, SortedItemList, TodoItem, collector_paused, format_item, place_list, rename_list, sorted_items
+from .journal import TodoJournal, add_record
+from .locking import ListLocks
+from .query import DueDateIndex, run_query
+
+# Storage backends, table rendering and CustomEncoder import json, sqlite3 and re, so they are
+# only imported once a manager is created or a table is printed. Autosave and instrumentation
+# are imported by the managers that use them.
+def __getattr__(name):
+    if name == 'CustomEncoder':
+        from .writer import CustomEncoder
+        return CustomEncoder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Run a TodoListManager method that changes which lists exist while holding the store lock
+# In shared mode every lock is held and the lists are first brought up to date with changes made
+# by other processes
+def synchronized(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._entered(), self._locks.exclusive(None if self.shared else ()):
+            if self.shared:
+                self.refresh()
+            return method(self, *args, **kwargs)
+    return locked
+
+# Run a TodoListManager method that works on the items of one list while holding that list's lock
+# The list name is the first argument of the method
+def list_synchronized(method):
+    @functools.wraps(method)
+    def locked(self, name, *args, **kwargs):
+        if self.shared:
+            return synchronized(method)(self, name, *args, **kwargs)
+        with self._entered(), self._locks.holding(name):
+            return method(self, name, *args, **kwargs)
+    return locked
+
+# Time every call of a public TodoListManager method when the manager is instrumented
+# Applied outside the locking decorators, so the time includes waiting for locks and the write
+def instrumented(method):
+    name = method.__name__
+    @functools.wraps(method)
+    def timed(self, *args, **kwargs):
+        if self._stats is None:
+            return method(self, *args, **kwargs)
+        with self._stats.timing(name):
+            return method(self, *args, **kwargs)
+    return timed
+
+# Error message of an invalid item priority, None for a valid one
+def check_priority(priority):
+    if priority is not None and priority != float('inf'):
+        if not isinstance(priority, int) or priority < 0:
+            return "Priority must be a non-negative integer."
+    return None
 
 # Main todo list class
 class TodoListManager:  
     
     # Constructor, optional filename parameter with default value 'todolist.json'
-    def __init__(self, filename='todolist.json', enable_auto_restore=True):
+    # With journal=True every mutation is appended to '<filename>.journal' instead of rewriting
+    # the whole file, and the journal is compacted into the json file once it passes
+    # journal_max_bytes or journal_max_age seconds
+    # The storage backend is chosen from the file extension ('.db', '.sqlite' and '.sqlite3' use
+    # SQLite, anything else json) or explicitly with backend='json', 'sqlite' or a StorageBackend
+    # With lazy=True the json file is opened by reading where each list is stored, and each list
+    # is decoded the first time it is used (SQLite stores are always read lazily)
+    # With autosave=True mutators only record their change, and a background thread saves every
+    # autosave_interval seconds or once autosave_max_pending changes are waiting
+    # With shared=True several processes can use the same json file, every write is made under
+    # a file lock and merged with the changes other processes made since this one last read it
+    # change_buffer is the number of change events kept for changes_since
+    # With instrument=True every operation is timed and sorts, saves and written bytes are
+    # counted, see stats
+    # history_depth is the number of calls or batches undo can revert, see undo
+    # The manager can be used from several threads. Changes to different lists run concurrently,
+    # and threads whose changes are waiting to be written share a single write
+    def __init__(self, filename='todolist.json', enable_auto_restore=True, journal=False,
+                 journal_max_bytes=1024 * 1024, journal_max_age=300, backend=None, lazy=False,
+                 autosave=False, autosave_interval=1.0, autosave_max_pending=100, shared=False,
+                 change_buffer=1024, instrument=False, history_depth=100):
         self.todo_lists = {}
         self.filename = filename
+        self.journal = None
+        self._batch = None  # pending (record, undo, change) triples while a batch is open
+        self._pending = []  # records waiting to be written
+        self._queued = 0  # number of records ever added to _pending
+        self._written = 0  # number of those records that were written
+        self._snapshots = {}  # list name -> (list, version, ItemSnapshot) of the previous write
+        self._locks = ListLocks(lambda name: name in self.todo_lists)
+        self._pending_lock = threading.Lock()
+        self._persist_lock = threading.Lock()  # held while writing, taken before any other lock
+        self._local = threading.local()  # per thread lock depth and the changes it waits for
+        self._due_index = DueDateIndex()
+        self._feed = ChangeFeed(change_buffer)
+        self._history = UndoHistory(history_depth)
+        self._stats = None
+        if instrument:
+            from .stats import ManagerStats
+            self._stats = ManagerStats()
+        self.autosave = None
+        self.shared = False
+        if journal:
+            self.journal = TodoJournal(filename + '.journal', journal_max_bytes, journal_max_age)
+        from .storage import open_backend
+        self.backend = open_backend(filename, backend, self.journal, lazy, shared)
+        self.shared = shared
+        if self._stats is not None:
+            self._stats.reset(self.backend)
         # Attempt to load from file, proceed regardless of errors
-        if os.path.exists(self.filename) and enable_auto_restore:
+        if self.backend.exists() and enable_auto_restore:
             try:
                 self.load_from_file()
             except Exception as e:  # Catch any exception that load_from_file could raise
                 print(f"Warning: An error occurred while loading the file. Proceeding without loading. Error: {e}")
-        # Register save_to_file to execute upon program exit
-        atexit.register(self.save_to_file)
+        if autosave:
+            from .autosave import AutosaveThread
+            self.autosave = AutosaveThread(self.flush, autosave_interval, autosave_max_pending)
+            self.autosave.start()
+        # Register the final save to execute upon program exit
+        shutdown.register(self)
 
     # Create a new todo list
+    @instrumented
+    @synchronized
     def create_todo_list(self, name):
         try:
             if name in self.todo_lists:
                 raise ValueError(f"TodoList named {name} already exists.")
-            self.todo_lists[name] = []
-            self.save_to_file()
+            self.todo_lists[name] = SortedItemList()
+            self._commit(("create", name), lambda: self.todo_lists.pop(name), ("create", name))
         except ValueError as e:
             print(f"Error: {e}")
             return False
         return True
 
     # Delete a certain todo list
+    @instrumented
+    @synchronized
     def delete_todo_list(self, name):
         if name not in self.todo_lists:
             print(f"No TodoList named '{name}' found.")
             return False
-        del self.todo_lists[name]
+        # The change is committed while holding the list's lock, so the undo history has it
+        # before any later change to the list
+        # The change keeps the position of the list, so undo can put it back there
+        with self._locks.of(name):
+            position = list(self.todo_lists).index(name)
+            items = self.todo_lists.pop(name)
+            self._locks.discard(name)
+            self._commit(("delete", name), lambda: place_list(self.todo_lists, name, items, position),
+                         ("delete", name, position, items))
         print(f"TodoList named '{name}' deleted")
-        self.save_to_file()
         return True
 
     # Show all todo lists
+    @instrumented
     def show_all_todo_list(self):
         return self.todo_lists
 
     # Change todo list name
+    @instrumented
+    @synchronized
     def change_todo_list_name(self, old_name, new_name):
         if old_name not in self.todo_lists:
             print(f"No TodoList named '{old_name}' found.")
@@ -63,89 +178,190 @@ class TodoListManager:
         if new_name in self.todo_lists:
             print(f"TodoList named '{new_name}' already exists.")
             return f"TodoList named '{new_name}' already exists."
-        self.todo_lists[new_name] = self.todo_lists.pop(old_name)
+        with self._locks.of(old_name):
+            rename_list(self.todo_lists, old_name, new_name)
+            self._locks.rename(old_name, new_name)
+            self._commit(("rename", old_name, new_name), lambda: self._undo_rename(old_name, new_name),
+                         ("rename", old_name, None, None, new_name))
         print(f"Successfully changed TodoList '{old_name}' to '{new_name}'")
-        self.save_to_file()
         return True
 
+    # Give a renamed list its old name back, it keeps its position among the lists
+    # A list deleted after the rename and then restored has lost its lock, which is made again
+    def _undo_rename(self, old_name, new_name):
+        rename_list(self.todo_lists, new_name, old_name)
+        self._locks.of(new_name)
+        self._locks.rename(new_name, old_name)
+
     # Maintain two optional fields used for sorting, priority field has higher priority than due_date field
+    @instrumented
+    @list_synchronized
     def add_item_to_todo_list(self, name, item, priority=None, due_date=None):
         if name not in self.todo_lists:
             print(f"No TodoList named {name} found.")
             return f"No TodoList named {name} found."
-        for existing_item in self.todo_lists[name]:
-            if existing_item['item'] == item:
-                print(f"Item {item} already exists in the TodoList {name}.")
-                return "Item already exists in the TodoList."
-        if priority is not None and priority != float('inf'):
-            if not isinstance(priority, int) or priority < 0:
-                print("Priority must be a non-negative integer.")
-                return "Priority must be a non-negative integer."
-        item_data = {'item': item, 'priority': priority if priority is not None else float('inf')}
+        items = sorted_items(self.todo_lists, name)
+        if items.has_item(item):
+            print(f"Item {item} already exists in the TodoList {name}.")
+            return "Item already exists in the TodoList."
+        item_data = self._build_item(item, priority, due_date)
+        if isinstance(item_data, str):
+            print(item_data)
+            return item_data
+        # Insert the item at its sorted position
+        index = items.add(item_data)
+        self._commit(add_record(name, item_data), lambda: items.remove(item_data), ("add", name, index, item_data))
+        return "Item added successfully."
+
+    # Add several items to a todo list with a single save
+    # Each entry is an item name, a dict with 'item', 'priority' and 'due_date' keys, or an
+    # (item, priority, due_date) tuple. Returns the add_item_to_todo_list result for every entry.
+    @instrumented
+    @list_synchronized
+    def add_items(self, name, entries):
+        if name not in self.todo_lists:
+            print(f"No TodoList named {name} found.")
+            return f"No TodoList named {name} found."
+        # Items, records and change events are allocated for every entry, see collector_paused
+        with collector_paused():
+            items = sorted_items(self.todo_lists, name)
+            results = []
+            added = []
+            seen = set()
+            for entry in entries:
+                if isinstance(entry, dict):
+                    item, priority, due_date = entry.get('item'), entry.get('priority'), entry.get('due_date')
+                elif isinstance(entry, tuple):
+                    item, priority, due_date = (entry + (None, None))[:3]
+                else:
+                    item, priority, due_date = entry, None, None
+                if items.has_item(item) or item in seen:
+                    print(f"Item {item} already exists in the TodoList {name}.")
+                    results.append("Item already exists in the TodoList.")
+                    continue
+                item_data = self._build_item(item, priority, due_date)
+                if isinstance(item_data, str):
+                    print(item_data)
+                    results.append(item_data)
+                    continue
+                seen.add(item)
+                added.append(item_data)
+                results.append("Item added successfully.")
+            self._insert_items(name, items, added)
+        return results
+
+    # Sort validated new items into a list once and commit them, the caller holds the list's lock
+    def _insert_items(self, name, items, added):
+        if not added:
+            return
+        items.extend(added)
+        # Change events list the new items in list order, so inserting them one by one at their
+        # index rebuilds the list. Items with the same sort key would make locate scan them all,
+        # one pass over the list finds every new item instead.
+        if len(items) == len(added):
+            positions = enumerate(items)  # the list was empty
+        else:
+            added_ids = {id(item_data) for item_data in added}
+            positions = [(index, item_data) for index, item_data in enumerate(items) if id(item_data) in added_ids]
+        self._commit_all([(add_record(name, item_data), lambda item_data=item_data: items.remove(item_data),
+                           ("add", name, index, item_data))
+                          for index, item_data in positions])
+
+    # Validate the optional fields of a new item
+    # Returns the item data, or the error message when a field is invalid
+    def _build_item(self, item, priority, due_date):
+        message = check_priority(priority)
+        if message is not None:
+            return message
         if due_date:
             try:
-                item_data['due_date'] = datetime.strptime(due_date, "%Y-%m-%d").date()
+                due_date = parse_date(due_date)
             except ValueError:
-                print("Due date must be in YYYY-MM-DD format.")
                 return "Due date must be in YYYY-MM-DD format."
         else:
-            item_data['due_date'] = None
-        self.todo_lists[name].append(item_data)
-        # Sort the list after insertion
-        self.todo_lists[name].sort(
-            key=lambda x: (x['priority'], x['due_date'] if x['due_date'] is not None else datetime.max.date())
-        )
-        self.save_to_file()
-        return "Item added successfully."
+            due_date = None
+        return TodoItem(item, priority, due_date)
 
     # Return list in a user-friendly format
+    @instrumented
+    @list_synchronized
     def show_all_items_in_todo_list(self, name):
         if name not in self.todo_lists:
             print(f"No TodoList named {name} found.")
             return f"No TodoList named {name} found."  # Returning a message instead of raising an error
-        formatted_items = []
-        for item_data in self.todo_lists[name]:
-            item_string = f"Item: {item_data['item']}"
-            if item_data['priority'] == float('inf'):
-                item_string += ", Priority: No priority specified"  # format the returned list to be more user-friendly
-            else:
-                item_string += f", Priority: {item_data['priority']}"  
-            if item_data['due_date'] is None:
-                item_string += ", Due date: No due date"  # format the returned list to be more user-friendly
-            else:
-                item_string += f", Due date: {item_data['due_date'].strftime('%Y-%m-%d')}"
-            formatted_items.append(item_string)
-        return formatted_items
+        return [format_item(item_data) for item_data in self.todo_lists[name]]
     
+    # Find items across todo lists, most urgent first
+    # due_after and due_before are inclusive bounds given as dates or 'YYYY-MM-DD' strings, items
+    # without a due date never match them. max_priority is an inclusive bound, items without a
+    # priority never match it. lists limits the search to some lists and limit caps the number of
+    # results. order='priority' returns items in the order of the lists, order='due_date' returns
+    # the earliest due dates first. Returns a list of (list name, item) pairs.
+    @instrumented
+    @synchronized
+    def query(self, due_before=None, due_after=None, max_priority=None, lists=None, limit=None, order='priority'):
+        if order not in ('priority', 'due_date'):
+            print("Order must be 'priority' or 'due_date'.")
+            return "Order must be 'priority' or 'due_date'."
+        if max_priority is not None and (not isinstance(max_priority, int) or max_priority < 0):
+            print("Priority must be a non-negative integer.")
+            return "Priority must be a non-negative integer."
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            print("Limit must be a non-negative integer.")
+            return "Limit must be a non-negative integer."
+        bounds = []
+        for bound in (due_after, due_before):
+            if bound is not None and not isinstance(bound, date):
+                try:
+                    bound = parse_date(bound)
+                except (TypeError, ValueError):
+                    print("Due date must be in YYYY-MM-DD format.")
+                    return "Due date must be in YYYY-MM-DD format."
+            bounds.append(bound.toordinal() if bound is not None else None)
+        names = list(self.todo_lists) if lists is None else list(lists)
+        for name in names:
+            if name not in self.todo_lists:
+                print(f"No TodoList named {name} found.")
+                return f"No TodoList named {name} found."
+        with self._locks.exclusive(names):
+            for name in names:
+                sorted_items(self.todo_lists, name)
+            if order == 'due_date':
+                self._due_index.prune(self.todo_lists)
+            return run_query(self.todo_lists, names, self._due_index, bounds[0], bounds[1], max_priority, limit, order,
+                             cache=self._batch is None)
+
     # Print all todo lists (or a single todo list) in a table format
-    def print_all_todo_lists(self, list_name = None):
-        lists_to_print = self.show_all_todo_list().items()
-        if list_name:  # If a specific list name is provided
-            if list_name in self.todo_lists:
-                lists_to_print = [(list_name, self.todo_lists[list_name])]
-            else:
-                print(f"No TodoList named '{list_name}' found.")
-                return False
-        for name, items in lists_to_print:
-            title = f"Todo List: {name}"
-            separator = "-" * (11 + len(title))
-            print(separator)
-            print(title)
-            print(separator)
-            if not items:
-                print("This TodoList is empty.")
-                continue
-            table = []
-            headers = ["Item", "Priority", "Due Date"]
-            for item in items:
-                priority = 'N/A' if item['priority'] == float('inf') else item['priority']
-                due_date = item['due_date'].strftime('%Y-%m-%d') if item['due_date'] else 'No due date'
-                table.append([item['item'], priority, due_date])
-            print(tabulate(table, headers, tablefmt="grid"))
-            print()
-        return True
-            
+    # limit and offset print a page of every list, and sample measures the column widths on the
+    # first sample rows only and truncates longer cells, which is faster for very long lists.
+    # Grid tables are rendered by todopkg itself, other tablefmt values need the tabulate package.
+    # file is the stream to write to, sys.stdout by default.
+    @instrumented
+    def print_all_todo_lists(self, list_name = None, limit = None, offset = 0, sample = None, tablefmt = "grid", file = None):
+        for value, message in ((limit, "Limit must be a non-negative integer."),
+                               (offset, "Offset must be a non-negative integer."),
+                               (sample, "Sample must be a non-negative integer.")):
+            if value is not None and (not isinstance(value, int) or value < 0):
+                print(message, file=file)
+                return message
+        from .render import print_lists
+        stream = file if file is not None else sys.stdout
+        with self._locks.exclusive():
+            lists_to_print = self.show_all_todo_list().items()
+            if list_name:  # If a specific list name is provided
+                if list_name in self.todo_lists:
+                    lists_to_print = [(list_name, self.todo_lists[list_name])]
+                else:
+                    print(f"No TodoList named '{list_name}' found.", file=stream)
+                    return False
+            # Print copies of the shown rows so other threads can change the lists while the tables are printed
+            end = None if limit is None else offset + limit
+            lists_to_print = [(name, len(items), items[offset:end]) for name, items in lists_to_print]
+        return print_lists(stream, lists_to_print, offset, sample, tablefmt)
+
     # Remove an item from the specified todo list
+    @instrumented
+    @list_synchronized
     def remove_item_from_todo_list(self, name, index):
         if name not in self.todo_lists:
             print(f"No TodoList named {name} found.")
@@ -156,45 +372,507 @@ class TodoListManager:
         if not isinstance(index, int) or index < 0 or index >= len(self.todo_lists[name]):
             print(f"Index {index} is out of range for TodoList {name}.")
             return f"Index {index} is out of range for TodoList {name}."
-        del self.todo_lists[name][index]
-        # Sort the list after deletion
-        self.todo_lists[name].sort(
-            key=lambda x: (x['priority'], x['due_date'] if x['due_date'] is not None else datetime.max.date())
-        )
-        self.save_to_file()
+        # Removing an item keeps the remaining items sorted
+        items = sorted_items(self.todo_lists, name)
+        removed = items.pop(index)
+        self._commit(("remove", name, index, removed['item']), lambda: items.reinsert(index, removed),
+                     ("remove", name, index, removed))
         print(f"Item at index {index} removed from TodoList {name}.")
         return f"Item at index {index} removed from TodoList {name}."
-    
-    # Save to json file using the custom encoder
+
+    # Remove several items from the specified todo list with a single save
+    # Indices refer to the list before any of them is removed
+    @instrumented
+    @list_synchronized
+    def remove_items(self, name, indices):
+        if name not in self.todo_lists:
+            print(f"No TodoList named {name} found.")
+            return f"No TodoList named {name} found."
+        indices = list(indices)
+        for index in indices:
+            if not isinstance(index, int):
+                print(f"Invalid index: {index}. Index must be an integer.")
+                return f"Invalid index: {index}. Index must be an integer."
+            if index < 0 or index >= len(self.todo_lists[name]):
+                print(f"Index {index} is out of range for TodoList {name}.")
+                return f"Index {index} is out of range for TodoList {name}."
+        items = sorted_items(self.todo_lists, name)
+        indices = sorted(set(indices), reverse=True)
+        changes = []
+        # Remove from the back so the remaining indices stay valid
+        for index in indices:
+            removed = items.pop(index)
+            changes.append((("remove", name, index, removed['item']),
+                            lambda index=index, removed=removed: items.reinsert(index, removed),
+                            ("remove", name, index, removed)))
+        self._commit_all(changes)
+        print(f"{len(indices)} items removed from TodoList {name}.")
+        return f"{len(indices)} items removed from TodoList {name}."
+
+    # Add the tasks of a CSV or NDJSON file, see transfer for the file layout
+    # The format comes from the file extension ('.csv', '.ndjson' or '.jsonl') unless format is
+    # 'csv' or 'ndjson'. The file is read and checked in chunks of chunk_size rows, and the new
+    # items of each list are sorted into it once the whole file is read. Rows are checked like
+    # add_item_to_todo_list: a row with an invalid priority or due date, an item its list already
+    # has, no list name or item, or text that is not valid UTF-8 is rejected and the other rows are
+    # still added. Missing lists are created, or their rows are rejected when create_lists is False.
+    # The import is a single batch: it is written once, undone as one step, and an error leaves the
+    # lists unchanged. Other threads wait until the import is done.
+    # Returns {'imported': number of items added, 'rejected': [(line number, message), ...]}
+    @instrumented
+    @synchronized
+    def import_tasks(self, path, format=None, create_lists=True, chunk_size=10_000):
+        from .transfer import chunked, read_tasks, task_format
+        format = task_format(path, format)
+        if format not in ('csv', 'ndjson'):
+            print(format)
+            return format
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            print("Chunk size must be a positive integer.")
+            return "Chunk size must be a positive integer."
+        try:
+            f = open(path, 'rb')
+        except OSError as e:
+            print(f"Could not open {path}: {e.strerror}.")
+            return f"Could not open {path}: {e.strerror}."
+        added = {}  # list name -> (sorted list or None for a new list, new items, new item names)
+        rejected = []
+        # The import is one batch, so it is written and undone as a whole and an error leaves the
+        # lists as they were. Items are created for every row, see collector_paused
+        with f, self.batch(), collector_paused():
+            rows = read_tasks(f, format)
+            if isinstance(rows, str):
+                print(rows)
+                return rows
+            for chunk in chunked(rows, chunk_size):
+                self._check_rows(chunk, create_lists, added, rejected)
+            # Sorting the items of every chunk into the lists would sort the lists again for every
+            # chunk. Missing lists are only created once they get an item.
+            for name, (items, new_items, seen) in added.items():
+                if new_items and items is None:
+                    self.create_todo_list(name)
+                    items = self.todo_lists[name]
+                self._insert_items(name, items, new_items)
+        imported = sum(len(new_items) for items, new_items, seen in added.values())
+        print(f"{imported} tasks imported, {len(rejected)} rows rejected.")
+        return {'imported': imported, 'rejected': rejected}
+
+    # Check a chunk of imported (line number, row) pairs, every lock is held
+    # The items of valid rows are added to added, rejected rows to rejected
+    # The due dates of the chunk are parsed together, each distinct date once
+    def _check_rows(self, chunk, create_lists, added, rejected):
+        due_dates = parse_dates([row[3] if not isinstance(row, str) and isinstance(row[3], str) else None
+                                 for number, row in chunk])
+        for (number, row), due in zip(chunk, due_dates):
+            if isinstance(row, str):
+                rejected.append((number, row))
+                continue
+            name, item, priority, due_date = row
+            if not isinstance(name, str) or not name or not isinstance(item, str) or not item:
+                rejected.append((number, "Row must have a list name and an item."))
+                continue
+            if name not in added:
+                if name not in self.todo_lists and not create_lists:
+                    rejected.append((number, f"No TodoList named {name} found."))
+                    continue
+                added[name] = (sorted_items(self.todo_lists, name) if name in self.todo_lists else None, [], set())
+            items, new_items, seen = added[name]
+            if item in seen or items is not None and items.has_item(item):
+                rejected.append((number, "Item already exists in the TodoList."))
+                continue
+            message = check_priority(priority)
+            if message is None and (isinstance(due, str) or due_date is not None and not isinstance(due_date, str)):
+                message = "Due date must be in YYYY-MM-DD format."
+            if message is not None:
+                rejected.append((number, message))
+                continue
+            seen.add(item)
+            new_items.append(TodoItem(item, priority, due))
+
+    # Write the items of every list, or of the lists named in lists, to a CSV or NDJSON file
+    # The format is chosen like for import_tasks. Lists are copied one at a time while holding
+    # their lock and written row by row, so only the largest list is held in memory twice. The
+    # file is written under a temporary name and moved into place once complete.
+    # Returns the number of items written.
+    @instrumented
+    @synchronized
+    def export_tasks(self, path, format=None, lists=None):
+        from .transfer import task_format, write_tasks
+        format = task_format(path, format)
+        if format not in ('csv', 'ndjson'):
+            print(format)
+            return format
+        names = list(self.todo_lists) if lists is None else list(lists)
+        for name in names:
+            if name not in self.todo_lists:
+                print(f"No TodoList named {name} found.")
+                return f"No TodoList named {name} found."
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'w', newline='', encoding='utf-8') as f:
+                count = write_tasks(f, format, self._export_rows(names))
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        print(f"{count} tasks exported to {path}.")
+        return count
+
+    # (list name, item) pairs of the given lists, each list is copied under its lock
+    def _export_rows(self, names):
+        for name in names:
+            with self._locks.exclusive([name]):
+                items = list(sorted_items(self.todo_lists, name))
+            for item_data in items:
+                yield name, item_data
+
+    # Revert the latest call of a mutator, or the latest batch, that is not undone yet
+    # The inverse changes are made like any other change: they are saved, published to the change
+    # feed and cost as much as the reverted changes, without copying the lists. Up to
+    # history_depth calls can be undone. Lists read again from the file, including changes merged
+    # from other processes in shared mode, clear the history.
+    # Returns True, or a message when there is nothing to undo
+    @instrumented
+    @synchronized
+    def undo(self):
+        return self._step(False)
+
+    # Make the latest undone changes again, until a new change is made
+    # Returns True, or a message when there is nothing to redo
+    @instrumented
+    @synchronized
+    def redo(self):
+        return self._step(True)
+
+    # Revert the latest entry of the undo history, or of the redo history, and keep its inverse
+    def _step(self, redo):
+        if self._batch is not None:
+            print("Undo and redo are not available inside a batch.")
+            return "Undo and redo are not available inside a batch."
+        with self._locks.exclusive():
+            changes = self._history.pop(redo)
+            if changes is None:
+                print("Nothing to redo." if redo else "Nothing to undo.")
+                return "Nothing to redo." if redo else "Nothing to undo."
+            try:
+                # Reverting many items allocates records and change events for each, see collector_paused
+                with collector_paused():
+                    reverted = self._revert(changes)
+            except BaseException:
+                self._history.push(changes, redo)
+                raise
+            self._history.push([change for record, undo, change in reverted], not redo)
+            self._persist([record for record, undo, change in reverted])
+            self._publish([change for record, undo, change in reverted])
+        return True
+
+    # Make the inverse of (kind, name, index, item, new_name) changes, newest first, every lock is held
+    # Returns the (record, undo, change) triples of the inverse changes. If one of them fails,
+    # the ones already made are rolled back.
+    def _revert(self, changes):
+        reverted = []
+        changes = changes[::-1]
+        try:
+            position = 0
+            while position < len(changes):
+                change = changes[position]
+                position += 1
+                kind, name = change[0], change[1]
+                if kind == "create":
+                    list_index = list(self.todo_lists).index(name)
+                    items = self.todo_lists.pop(name)
+                    self._locks.discard(name)
+                    reverted.append((("delete", name),
+                                     lambda name=name, items=items, list_index=list_index: place_list(self.todo_lists, name, items, list_index),
+                                     ("delete", name, list_index, items)))
+                elif kind == "delete":
+                    # Deleted lists are never changed, the restored list is a new one with the same
+                    # items, at the position the list had
+                    list_index = change[2]
+                    items = SortedItemList(change[3])
+                    place_list(self.todo_lists, name, items, list_index)
+                    reverted.append((("create", name, list_index), lambda name=name: self.todo_lists.pop(name),
+                                     ("create", name, list_index)))
+                    reverted.extend((add_record(name, item_data), lambda items=items, index=index: items.pop(index),
+                                     ("add", name, index, item_data))
+                                    for index, item_data in enumerate(items))
+                elif kind == "rename":
+                    new_name = change[4]
+                    self._undo_rename(name, new_name)
+                    reverted.append((("rename", new_name, name), lambda name=name, new_name=new_name: self._undo_rename(new_name, name),
+                                     ("rename", new_name, None, None, name)))
+                elif kind == "add":
+                    # Items added together, like by add_items, are found with one pass over the list,
+                    # since finding each through locate scans every item with the same sort key
+                    added = [change[3]]
+                    while position < len(changes) and changes[position][0] == "add" and changes[position][1] == name:
+                        added.append(changes[position][3])
+                        position += 1
+                    items = sorted_items(self.todo_lists, name)
+                    if len(added) == 1:
+                        indices = [items.locate(added[0])]
+                    else:
+                        added_ids = {id(item_data) for item_data in added}
+                        indices = [index for index, item_data in enumerate(items) if id(item_data) in added_ids]
+                    # Removing from the back keeps the indices of the other items valid
+                    for index in reversed(indices):
+                        item_data = items.pop(index)
+                        reverted.append((("remove", name, index, item_data.item),
+                                         lambda items=items, index=index, item_data=item_data: items.reinsert(index, item_data),
+                                         ("remove", name, index, item_data)))
+                elif kind == "remove":
+                    # Added like any other item, so it has the position a replay of the record gives it
+                    items = sorted_items(self.todo_lists, name)
+                    item_data = change[3]
+                    index = items.add(item_data)
+                    reverted.append((add_record(name, item_data), lambda items=items, index=index: items.pop(index),
+                                     ("add", name, index, item_data)))
+        except BaseException:
+            for record, undo, change in reversed(reverted):
+                undo()
+            raise
+        return reverted
+
+    # Group mutations so they are saved once when the outermost block exits
+    # If the block raises, every mutation made inside it is undone and nothing is saved
+    # Other threads wait until the block exits
+    @contextmanager
+    def batch(self):
+        with self._entered(), self._locks.exclusive():
+            outermost = self._batch is None
+            if outermost:
+                self._batch = []
+            start = len(self._batch)
+            try:
+                yield self
+            except BaseException:
+                # Roll back in reverse order, each undo step only touches the changed items
+                for record, undo, change in reversed(self._batch[start:]):
+                    undo()
+                del self._batch[start:]
+                if outermost:
+                    self._batch = None
+                raise
+            if outermost:
+                changes = self._batch
+                self._batch = None
+                if changes:
+                    self._persist([record for record, undo, change in changes])
+                    self._history.record([change for record, undo, change in changes])
+                    self._publish([change for record, undo, change in changes])
+
+    # Record a single mutation together with the function that undoes it and its change event
+    # change is the (kind, name, index, item, new_name) tuple published to the change feed
+    def _commit(self, record, undo, change):
+        self._commit_all([(record, undo, change)])
+
+    # Record the (record, undo, change) triples of one call, they are saved together
+    # Change events are published once the mutations are committed, a batch that is rolled back
+    # publishes nothing
+    def _commit_all(self, changes):
+        if self._batch is not None:
+            self._batch.extend(changes)
+        elif changes:
+            self._persist([record for record, undo, change in changes])
+            self._history.record([change for record, undo, change in changes])
+            self._publish([change for record, undo, change in changes])
+
+    # Publish committed changes to the change feed, after applying them to the due date index
+    def _publish(self, changes):
+        self._due_index.apply(changes)
+        self._feed.publish(changes)
+
+    # Queue mutations to be written once this thread releases its locks, or by the autosave thread
+    def _persist(self, records):
+        with self._pending_lock:
+            self._pending.extend(records)
+            self._queued += len(records)
+            self._local.target = self._queued
+            pending = len(self._pending)
+        if self.autosave is not None:
+            self.autosave.notify(pending)
+
+    # Count the manager locks held by this thread, and write its changes when it releases the last one
+    @contextmanager
+    def _entered(self):
+        local = self._local
+        local.depth = getattr(local, 'depth', 0) + 1
+        try:
+            yield
+        finally:
+            local.depth -= 1
+        if local.depth == 0:
+            self._settle()
+
+    # Write the changes this thread queued, unless another thread's write already included them
+    # Threads that queue changes while a write is running are all covered by the next write
+    # save_to_file, flush and load_from_file calls made while holding the locks run afterwards
+    def _settle(self):
+        local = self._local
+        if getattr(local, 'save', False):
+            local.save = False
+            self.save_to_file()
+        target = getattr(local, 'target', 0)
+        local.target = 0
+        if target and self.autosave is None:
+            with self._persist_lock:
+                if self._written < target:
+                    self._write_pending()
+        if getattr(local, 'flush', False):
+            local.flush = False
+            self.flush()
+        if getattr(local, 'load', False):
+            local.load = False
+            self.load_from_file()
+
+    # Write every queued change, the caller holds the persist lock
+    # In-memory stores are copied under the locks and written after releasing them, so other
+    # threads keep changing lists while the file is written. Lazy and shared stores load from or
+    # replace the live lists and are written while holding every lock.
+    def _write_pending(self, save=False):
+        from .storage import LazyTodoLists
+        with self._locks.exclusive():
+            with self._pending_lock:
+                records = self._pending
+                self._pending = []
+                queued = self._queued
+            if self.shared or isinstance(self.todo_lists, LazyTodoLists):
+                self._write(self.todo_lists, records, queued, save)
+                return
+            # Backends appending the records to a journal or a database don't need the lists
+            snapshot = self._snapshot() if save or self.backend.writes_lists() else None
+        self._write(snapshot, records, queued, save)
+
+    def _write(self, todo_lists, records, queued, save):
+        merged = False
+        try:
+            if save and not self.shared:
+                self.backend.save(todo_lists)
+            else:
+                merged = self.backend.persist(todo_lists, records)
+        except BaseException:
+            with self._pending_lock:
+                self._pending[:0] = records
+            raise
+        self._written = queued
+        if self._stats is not None:
+            self._stats.record_save()
+        # A shared store that was changed by another process was merged into the lists
+        if merged:
+            self._history.clear()
+            self._feed.publish([("reload", None)])
+
+    # Copy of the todo lists for writing without holding the locks
+    # Lists that did not change since the previous write reuse their previous copy
+    def _snapshot(self):
+        snapshots = {}
+        for name, items in self.todo_lists.items():
+            cached = self._snapshots.get(name)
+            if not isinstance(items, SortedItemList):
+                snapshots[name] = (items, None, list(items))
+            elif cached is not None and cached[0] is items and cached[1] == items.version:
+                snapshots[name] = cached
+            else:
+                snapshots[name] = (items, items.version, ItemSnapshot(items))
+        self._snapshots = snapshots
+        return {name: snapshot for name, (items, version, snapshot) in snapshots.items()}
+
+    # Write every pending change and return once it is durable
+    # Changes another thread wrote without syncing them are made durable too, so the backend is
+    # synced even when nothing is pending
+    # Inside a batch or another locked call it runs once this thread releases the manager locks
+    @instrumented
+    def flush(self):
+        if getattr(self._local, 'depth', 0):
+            self._local.flush = True
+            return
+        with self._persist_lock:
+            if self._pending:
+                self._write_pending()
+            self.backend.sync()
+
+    # Save every todo list through the storage backend
+    # For the json file in journal mode this is the compaction step and starts an empty journal
+    # Inside a batch or another locked call it runs once this thread releases the manager locks
+    @instrumented
     def save_to_file(self):
-        with open(self.filename, 'w') as f:
-            json.dump(self.todo_lists, f, cls = CustomEncoder)
+        if getattr(self._local, 'depth', 0):
+            self._local.save = True
+            return
+        with self._persist_lock:
+            self._write_pending(save=True)
+
+    # Stop the autosave thread and flush the pending changes when the program exits
+    # Only the changes since the last write are written, the way the autosave thread writes them
+    def _save_at_exit(self):
+        if self.autosave is not None:
+            self.autosave.stop()
+        self.flush()
 
-    # Restore the list from the json file
+    # Call callback(event) with a ChangeEvent for every change committed from now on
+    # Events of a batch are published when the outermost batch exits, and none if it rolls back.
+    # Callbacks run in the thread that made the change while it still holds the manager locks, so
+    # they may read the manager but must not wait for another thread that uses it.
+    # Returns callback, so it can be used as a decorator
+    def subscribe(self, callback):
+        return self._feed.subscribe(callback)
+
+    # Stop calling callback, returns False if it was not subscribed
+    def unsubscribe(self, callback):
+        return self._feed.unsubscribe(callback)
+
+    # Change events committed after version, oldest first
+    # Returns None when the ring buffer of change_buffer events no longer holds all of them, the
+    # consumer then reads the lists again. A copy of the lists and the version it matches are taken
+    # together inside `with manager.batch():`
+    def changes_since(self, version):
+        return self._feed.changes_since(version)
+
+    # Version of the latest change event, 0 before the first one
+    @property
+    def version(self):
+        return self._feed.version
+
+    # Counters of an instrumented manager, reset=True starts counting again afterwards
+    # Returns a dictionary with 'operations', mapping every method called so far to its 'calls',
+    # total 'seconds', 'mean_seconds' and 'max_seconds', and the 'sorts' of whole lists, 'saves' to
+    # the storage backend and 'bytes_written' since the manager was created or last reset
+    def stats(self, reset=False):
+        if self._stats is None:
+            print("Statistics are only collected by a manager created with instrument=True.")
+            return "Statistics are only collected by a manager created with instrument=True."
+        stats = self._stats.snapshot(self.backend)
+        if reset:
+            self._stats.reset(self.backend)
+        return stats
+
+    # Read the changes other processes made to a shared store
+    # Returns True when the lists were read again, mutators and queries do this on their own
+    # Nothing is read while a batch is open or changes are waiting to be saved, those are merged
+    # with the file when they are written
+    @instrumented
+    def refresh(self):
+        with self._locks.exclusive():
+            if not self.shared or self._batch is not None or self._pending:
+                return False
+            if not self.backend.refresh(self.todo_lists):
+                return False
+            self._history.clear()
+            self._feed.publish([("reload", None)])
+            return True
+
+    # Restore the lists from the storage backend
+    # Inside a batch, another locked call or a change feed callback it runs once this thread
+    # releases the manager locks, after its changes are written, since the persist lock has to be
+    # taken before them
+    @instrumented
     def load_from_file(self):
-        if not os.path.isfile(self.filename):
-            raise FileNotFoundError(f"The file {self.filename} does not exist.")
-        try:
-            with open(self.filename, 'r') as f:
-                data = json.load(f)
-        except json.JSONDecodeError:
-            raise ValueError("The file could not be decoded as JSON.")
-        # Ensure that the data is a dictionary
-        if not isinstance(data, dict):
-            raise ValueError("The file does not contain a valid todo list format.")
-        for todo_list_name, tasks in data.items():
-            # Validate that tasks is a list of dictionaries
-            if not isinstance(tasks, list) or not all(isinstance(task, dict) for task in tasks):
-                raise ValueError(f"Tasks for {todo_list_name} are not in a valid format.")
-            # if todo_list_name not in self.todo_lists:
-            self.create_todo_list(todo_list_name)
-            for task in tasks:
-                item_name = task.get('item')
-                priority = task.get('priority')
-                due_date = task.get('due_date')  # This should be a string in the format 'YYYY-MM-DD'
-                if priority == "Infinity":
-                    priority = float('inf')
-                elif not isinstance(priority, (int, float)):
-                    raise ValueError(f"Invalid priority for {item_name} in {todo_list_name}.")
-                # Add the task to the todo list
-                self.add_item_to_todo_list(todo_list_name, item_name, priority=priority, due_date=due_date)
+        if getattr(self._local, 'depth', 0):
+            self._local.load = True
+            return
+        with self._entered(), self._persist_lock, self._locks.exclusive():
+            self.todo_lists = self.backend.load(self.todo_lists)
+            self._snapshots = {}
+            self._history.clear()
+            self._feed.publish([("reload", None)])
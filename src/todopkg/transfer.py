@@ -0,0 +1,156 @@
+import codecs
+import csv
+import json
+import os
+from datetime import date
+from itertools import count, islice
+from json.encoder import encode_basestring
+from .items import NO_DUE_DATE, NO_PRIORITY
+
+# Task files for moving items in and out of todopkg, see TodoListManager.import_tasks
+# Every task is one row with the list name, the item, its priority and its due date. CSV files
+# have a header row naming the 'list', 'item', 'priority' and 'due_date' columns, empty cells are
+# missing values. NDJSON files have one json object per line with the same keys, null or a missing
+# key is a missing value. Files are read and written row by row, so only the rows of one chunk
+# are in memory at a time.
+FIELDS = ['list', 'item', 'priority', 'due_date']
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+# Format of a task file, 'csv' or 'ndjson'
+# The format argument wins over the file extension. Returns the error message when neither names
+# a known format.
+def task_format(path, format=None):
+    if format is None:
+        format = FORMATS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            return f"Can't tell the format of {path}, pass format='csv' or format='ndjson'."
+    if format not in ('csv', 'ndjson'):
+        return f"Unknown format {format}, use 'csv' or 'ndjson'."
+    return format
+
+# Rows of an open task file as (row number, row) pairs
+# row is a (list name, item, priority, due date) tuple with the values as given in the file, or
+# the error message of a row that can't be read. Returns the error message instead when a CSV
+# file has no usable header. A file opened in binary mode is decoded as UTF-8 line by line, so a
+# line that is not valid UTF-8 only rejects its row.
+def read_tasks(f, format):
+    if format == 'csv':
+        return read_csv(f)
+    return read_ndjson(f)
+
+# Lines of a task file as text, the numbers of the lines that are not valid UTF-8 are added to
+# invalid and the lines are decoded with replacement characters
+def text_lines(f, invalid):
+    for number, line in enumerate(f, 1):
+        if isinstance(line, bytes):
+            if number == 1 and line.startswith(codecs.BOM_UTF8):
+                line = line[len(codecs.BOM_UTF8):]
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError:
+                invalid.add(number)
+                line = line.decode('utf-8', 'replace')
+        yield line
+
+def read_csv(f):
+    invalid = set()
+    reader = csv.reader(text_lines(f, invalid))
+    header = [column.strip().lower() for column in next(reader, [])]
+    if 'list' not in header or 'item' not in header:
+        return "CSV files need a header row with 'list' and 'item' columns."
+    columns = [header.index(field) if field in header else None for field in FIELDS]
+    return _csv_rows(reader, columns, invalid)
+
+def _csv_rows(reader, columns, invalid):
+    while True:
+        start = reader.line_num
+        try:
+            cells = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield reader.line_num, f"Row is not valid CSV: {e}."
+            continue
+        # A quoted cell can span several lines, the row is rejected if any of them is
+        if invalid and any(number in invalid for number in range(start + 1, reader.line_num + 1)):
+            yield reader.line_num, "Row is not valid UTF-8."
+            continue
+        if not cells:
+            continue  # blank line
+        name, item, priority, due_date = [cells[column] if column is not None and column < len(cells) else ''
+                                          for column in columns]
+        if priority:
+            try:
+                priority = int(priority)
+            except ValueError:
+                pass  # rejected by the priority check like any other invalid priority
+        yield reader.line_num, (name, item, priority if priority != '' else None, due_date or None)
+
+def read_ndjson(f):
+    invalid = set()
+    for number, line in enumerate(text_lines(f, invalid), 1):
+        if number in invalid:
+            yield number, "Row is not valid UTF-8."
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, "Row is not valid JSON."
+            continue
+        if not isinstance(row, dict):
+            yield number, "Row must be a JSON object."
+            continue
+        yield number, (row.get('list'), row.get('item'), row.get('priority'), row.get('due_date'))
+
+# Split (row number, row) pairs into lists of at most size pairs
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+# Write (list name, item) pairs to an open task file, returns the number of rows written
+def write_tasks(f, format, tasks):
+    counter = count()
+    fields = task_fields(tasks, counter)
+    if format == 'csv':
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(FIELDS)
+        writer.writerows((name, item, '' if priority is None else priority, due_date or '')
+                         for name, item, priority, due_date in fields)
+    else:
+        f.writelines(ndjson_lines(fields))
+    return next(counter)
+
+# NDJSON lines of (list name, item, priority, due date) rows
+# Lines are formatted directly, encoding a dict per row is several times slower
+def ndjson_lines(fields):
+    names = {}  # list name -> name as a json string
+    for name, item, priority, due_date in fields:
+        quoted_name = names.get(name)
+        if quoted_name is None:
+            quoted_name = names[name] = encode_basestring(name)
+        priority = 'null' if priority is None else priority
+        due_date = 'null' if due_date is None else f'"{due_date}"'
+        item = encode_basestring(item) if isinstance(item, str) else json.dumps(item)
+        yield f'{{"list": {quoted_name}, "item": {item}, "priority": {priority}, "due_date": {due_date}}}\n'
+
+# (list name, item, priority, due date) rows of (list name, item) pairs, None for missing values
+# Due dates are 'YYYY-MM-DD' strings, each date is formatted once. counter counts the rows.
+def task_fields(tasks, counter):
+    dates = {}
+    for name, item_data in tasks:
+        next(counter)
+        priority = item_data.priority_value
+        ordinal = item_data.due_ordinal
+        if ordinal == NO_DUE_DATE:
+            due_date = None
+        else:
+            due_date = dates.get(ordinal)
+            if due_date is None:
+                due_date = dates[ordinal] = date.fromordinal(ordinal).isoformat()
+        yield name, item_data.item, None if priority == NO_PRIORITY else priority, due_date
@@ -0,0 +1,200 @@
+import mmap
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from itertools import accumulate
+from .binary import COLUMN_CODES, HEADER, SnapshotLayout, make_item
+from .items import format_item
+from .locking import file_stamp
+
+# Read-only view of a store saved as a binary snapshot (a .tdb file, see binary.py)
+# The file is mapped with mmap and nothing but the list names is decoded when the view is opened.
+# view[name] is a lazy sequence whose items are decoded from the mapped columns when they are
+# accessed, so every process reading the same store shares the page cache instead of holding its
+# own copy of the lists. The view keeps showing the snapshot it opened, even after a manager
+# saves the store again, until refresh is called.
+#
+# The view answers show_all_todo_list, show_all_items_in_todo_list and print_all_todo_lists
+# like a TodoListManager, so read-only consumers can use it in place of one.
+class TodoStoreView(Mapping):
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._mapped = None
+        self._generation = 0  # number of snapshots mapped so far, see StoredItems
+        self._open()
+
+    # Map the current file, replacing the snapshot shown so far
+    def _open(self):
+        with open(self.filename, 'rb') as f:
+            stamp = file_stamp(self.filename)
+            if stamp[1] < HEADER.size:
+                raise ValueError("The file is not a todopkg binary snapshot.")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        columns = {}
+        try:
+            layout = SnapshotLayout(view)
+            for section in ('sizes', 'offsets', 'priorities', 'due_ordinals'):
+                columns[section] = column_view(view, layout, section)
+            text = view[layout.text_start:layout.text_start + layout.text_length]
+        except BaseException:
+            # The mapping can only be closed once no memoryview uses it
+            for column in columns.values():
+                if isinstance(column, memoryview):
+                    column.release()
+            view.release()
+            mapped.close()
+            raise
+        self.close()
+        self._mapped, self._view, self._text = mapped, view, text
+        self._offsets = columns['offsets']
+        self._priorities = columns['priorities']
+        self._due_ordinals = columns['due_ordinals']
+        self._stamp = stamp
+        self._generation += 1
+        self._list_count = layout.list_count
+        sizes = list(columns['sizes'])
+        names = [self._string(n) for n in range(layout.list_count)]
+        self._lists = {name: (start, size) for name, start, size in zip(names, accumulate(sizes, initial=0), sizes)}
+
+    # Map the file again if it was replaced or changed since the view was opened
+    # Returns True when the view now shows the new contents. Items of the old snapshot that were
+    # already decoded stay valid, lazy sequences taken before raise ValueError and must be taken again
+    def refresh(self):
+        if file_stamp(self.filename) == self._stamp:
+            return False
+        self._open()
+        return True
+
+    # Unmap the file, the view can't be used afterwards
+    def close(self):
+        if self._mapped is None:
+            return
+        for column in (self._text, self._offsets, self._priorities, self._due_ordinals, self._view):
+            if isinstance(column, memoryview):
+                column.release()
+        self._mapped.close()
+        self._mapped = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getitem__(self, name):
+        start, size = self._lists[name]
+        return StoredItems(self, start, size, self._generation)
+
+    def __contains__(self, name):
+        return name in self._lists
+
+    def __iter__(self):
+        return iter(self._lists)
+
+    def __len__(self):
+        return len(self._lists)
+
+    def __repr__(self):
+        return f"TodoStoreView({self.filename!r}, lists={list(self._lists)!r})"
+
+    # Same results as the TodoListManager methods of the same name
+    def show_all_todo_list(self):
+        return self
+
+    def show_all_items_in_todo_list(self, name):
+        if name not in self._lists:
+            print(f"No TodoList named {name} found.")
+            return f"No TodoList named {name} found."
+        return [format_item(item_data) for item_data in self[name]]
+
+    def print_all_todo_lists(self, list_name = None, limit = None, offset = 0, sample = None, tablefmt = "grid", file = None):
+        from .render import print_lists
+        for value, message in ((limit, "Limit must be a non-negative integer."),
+                               (offset, "Offset must be a non-negative integer."),
+                               (sample, "Sample must be a non-negative integer.")):
+            if value is not None and (not isinstance(value, int) or value < 0):
+                print(message, file=file)
+                return message
+        names = list(self._lists)
+        if list_name:
+            if list_name not in self._lists:
+                print(f"No TodoList named '{list_name}' found.", file=file)
+                return False
+            names = [list_name]
+        end = None if limit is None else offset + limit
+        lists_to_print = [(name, len(items), items[offset:end]) for name, items in ((name, self[name]) for name in names)]
+        return print_lists(file if file is not None else sys.stdout, lists_to_print, offset, sample, tablefmt)
+
+    # Decode the string at position index of the string table
+    def _string(self, index):
+        if self._mapped is None:
+            raise ValueError("The store view is closed.")
+        return str(self._text[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    # Decode the item at position index of the item columns
+    def _item(self, index):
+        return make_item(self._string(self._list_count + index), self._priorities[index], self._due_ordinals[index])
+
+# Items of one list in a TodoStoreView, decoded when they are accessed
+# Slices are lazy sequences as well. generation is the snapshot the positions belong to, once the
+# view is refreshed they would decode other items, so the items can no longer be read.
+class StoredItems(Sequence):
+    __slots__ = ('_view', '_start', '_size', '_generation')
+
+    def __init__(self, view, start, size, generation):
+        self._view = view
+        self._start = start
+        self._size = size
+        self._generation = generation
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step != 1:
+                return [self._item(self._start + position) for position in range(start, stop, step)]
+            return StoredItems(self._view, self._start + start, max(stop - start, 0), self._generation)
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("list index out of range")
+        return self._item(self._start + index)
+
+    def __iter__(self):
+        for index in range(self._start, self._start + self._size):
+            yield self._item(index)
+
+    # Decode the item at position index of the view, if the view still shows the same snapshot
+    def _item(self, index):
+        if self._view._generation != self._generation:
+            raise ValueError("The store view was refreshed, take the items from the view again.")
+        return self._view._item(index)
+
+    def __eq__(self, other):
+        if isinstance(other, (StoredItems, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"StoredItems({list(self)!r})"
+
+# Values of a column read in place from the mapped file
+# Snapshots are little-endian, big-endian machines get a byte-swapped copy of the column instead
+def column_view(view, layout, section):
+    position, code, count = layout.sections[section]
+    raw = view[position:position + count * COLUMN_CODES[code]]
+    if sys.byteorder == 'little':
+        values = raw.cast(code)
+        raw.release()
+        return values
+    values = array(code)
+    values.frombytes(raw)
+    values.byteswap()
+    raw.release()
+    return values
@@ -0,0 +1,110 @@
+import json
+import os
+from datetime import date
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+from .items import NO_DUE_DATE, NO_PRIORITY, ItemSnapshot, SortedItemList, TodoItem
+
+# Class to encode the due date and priority when saving the lists to the json file
+class CustomEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, TodoItem):
+            return obj.to_dict()
+        if isinstance(obj, date):
+            return obj.isoformat()
+        if isinstance(obj, float) and obj == float('inf'):
+            return "Infinity"
+        return json.JSONEncoder.default(self, obj)
+
+# Writes todo lists to a json file one list at a time
+# The document is the same one json.dump(todo_lists, f, cls=CustomEncoder) writes, but items are
+# encoded straight from their TodoItem fields instead of through a JSONEncoder.default callback.
+# The file is written to '<filename>.<pid>.tmp', fsynced and renamed over the target, so a crash never
+# leaves a partially written store behind. Lists that did not change since the previous write
+# reuse their encoded bytes.
+class JsonStoreWriter:
+
+    def __init__(self):
+        self._cache = {}  # list name -> (items, version, encoded bytes)
+
+    # Write todo_lists to filename and return the (offset, length) of every list in the file
+    # raw_lists maps names of lists that were never decoded to their position in the current
+    # file, their bytes are copied as they are
+    def write(self, filename, todo_lists, raw_lists=None):
+        raw_lists = raw_lists or {}
+        positions = {}
+        cache = {}
+        temporary = f'{filename}.{os.getpid()}.tmp'
+        source = open(filename, 'rb') if raw_lists else None
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(b'{')
+                offset = 1
+                for n, name in enumerate(todo_lists):
+                    key = (b'' if n == 0 else b', ') + encode_key(name) + b': '
+                    if name in raw_lists:
+                        start, length = raw_lists[name]
+                        source.seek(start)
+                        value = source.read(length)
+                    else:
+                        value = self._encode(name, todo_lists[name], cache)
+                    f.write(key)
+                    f.write(value)
+                    offset += len(key)
+                    positions[name] = (offset, len(value))
+                    offset += len(value)
+                f.write(b'}')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, filename)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        finally:
+            if source is not None:
+                source.close()
+        # Only lists that are still in the store stay cached
+        self._cache = cache
+        return positions
+
+    # Encoded bytes of a list, reused when the same list has not changed since the last write
+    def _encode(self, name, items, cache):
+        cached = self._cache.get(name)
+        if isinstance(items, (SortedItemList, ItemSnapshot)):
+            if cached is not None and cached[0] is items and cached[1] == items.version:
+                cache[name] = cached
+                return cached[2]
+            encoded = encode_items(items)
+            cache[name] = (items, items.version, encoded)
+            return encoded
+        return encode_items(items)
+
+# Encode a list name the way json.dump encodes dictionary keys
+def encode_key(name):
+    if isinstance(name, str):
+        return encode_basestring_ascii(name).encode('ascii')
+    return encode_basestring_ascii(json.dumps(name)).encode('ascii')
+
+# Encode the items of a list as a json array
+def encode_items(items):
+    parts = []
+    for item_data in items:
+        if not isinstance(item_data, TodoItem):
+            # Lists assigned by callers may hold plain dictionaries
+            return json.dumps(list(items), cls = CustomEncoder).encode('ascii')
+        item = item_data.item
+        priority = item_data.priority_value
+        parts.append(
+            '{"item": ' + (encode_basestring_ascii(item) if type(item) is str else json.dumps(item))
+            + ', "priority": ' + ('Infinity' if priority == NO_PRIORITY else
+                                  str(priority) if type(priority) is int else json.dumps(priority))
+            + ', "due_date": ' + ('null' if item_data.due_ordinal == NO_DUE_DATE else encode_ordinal(item_data.due_ordinal))
+            + '}'
+        )
+    return ('[' + ', '.join(parts) + ']').encode('ascii')
+
+# Quoted ISO date for a date ordinal, real data reuses a small number of dates
+@lru_cache(maxsize=4096)
+def encode_ordinal(ordinal):
+    return '"' + date.fromordinal(ordinal).isoformat() + '"'
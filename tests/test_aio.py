@@ -0,0 +1,94 @@
+from todopkg import AsyncTodoListManager, TodoListManager
+import pytest
+import asyncio
+
+# Fixture for an async manager that counts writes
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.json")
+    manager = AsyncTodoListManager(str(filename))
+    manager.writes = 0
+    persist = manager.manager.backend.persist
+    def counting_persist(todo_lists, records):
+        manager.writes += 1
+        persist(todo_lists, records)
+    manager.manager.backend.persist = counting_persist
+    return manager
+
+def stored(manager):
+    return TodoListManager(manager.filename).todo_lists
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for AsyncTodoListManager
+def test_async_changes_are_written(manager):
+    async def main():
+        assert await manager.create_todo_list("Work")
+        assert await manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10") == "Item added successfully."
+        assert await manager.add_item_to_todo_list("Work", "Report") == "Item already exists in the TodoList."
+        assert await manager.show_all_items_in_todo_list("Work") == ["Item: Report, Priority: 1, Due date: 2023-11-10"]
+    asyncio.run(main())
+    assert stored(manager) == manager.todo_lists
+
+def test_async_concurrent_changes_share_writes(manager):
+    async def main():
+        await manager.create_todo_list("Work")
+        writes = manager.writes
+        results = await asyncio.gather(*(manager.add_item_to_todo_list("Work", f"Task {n}", n % 5) for n in range(200)))
+        assert results == ["Item added successfully."] * 200
+        return manager.writes - writes
+    writes = asyncio.run(main())
+    assert 1 <= writes < 200
+    assert len(stored(manager)["Work"]) == 200
+
+def test_async_event_loop_keeps_running_during_writes(manager):
+    persist = manager.manager.backend.persist
+    def slow_persist(todo_lists, records):
+        import time
+        time.sleep(0.2)
+        persist(todo_lists, records)
+    manager.manager.backend.persist = slow_persist
+    async def main():
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+        task = asyncio.ensure_future(ticker())
+        await manager.create_todo_list("Work")
+        task.cancel()
+        return ticks
+    assert asyncio.run(main()) >= 5
+
+def test_async_batch(manager):
+    async def main():
+        await manager.create_todo_list("Work")
+        writes = manager.writes
+        async with manager.batch():
+            await manager.add_item_to_todo_list("Work", "Report")
+            other = asyncio.ensure_future(manager.add_item_to_todo_list("Work", "Email"))
+            await asyncio.sleep(0.05)
+            assert not other.done()
+            await manager.remove_item_from_todo_list("Work", 0)
+        assert manager.writes == writes + 1
+        await other
+        with pytest.raises(RuntimeError):
+            async with manager.batch():
+                await manager.delete_todo_list("Work")
+                raise RuntimeError("rolled back")
+        return [item_data.item for item_data in manager.todo_lists["Work"]]
+    assert asyncio.run(main()) == ["Email"]
+    assert stored(manager) == manager.todo_lists
+
+def test_async_open_and_load(manager):
+    async def main():
+        await manager.create_todo_list("Work")
+        await manager.add_items("Work", ["Report", ("Email", 2)])
+        reopened = await AsyncTodoListManager.open(manager.filename)
+        assert reopened.todo_lists == manager.todo_lists
+        assert [name for name, item_data in await reopened.query(max_priority=2)] == ["Work"]
+        await reopened.load_from_file()
+        return reopened
+    reopened = asyncio.run(main())
+    assert reopened.todo_lists == manager.todo_lists
+#--------------------------------------------------------------------------------------------
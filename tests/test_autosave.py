@@ -0,0 +1,85 @@
+from todopkg import TodoListManager
+import pytest
+import os
+import time
+
+# Fixture for a manager whose autosave thread only flushes when asked to
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.json")
+    manager = TodoListManager(str(filename), autosave=True, autosave_interval=3600, autosave_max_pending=1000)
+    yield manager
+    manager.autosave.stop()
+
+# Wait until condition holds and no flush is running
+def wait_for(manager, condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        with manager._persist_lock:
+            if condition():
+                return True
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for autosave mode
+def test_autosave_mutations_do_not_write(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    assert not os.path.exists(manager.filename)
+    assert len(manager._pending) == 2
+
+def test_flush_writes_pending_changes(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    manager.flush()
+    assert manager._pending == []
+    assert TodoListManager(manager.filename).todo_lists == manager.todo_lists
+
+def test_autosave_after_max_pending(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.json")), autosave=True, autosave_interval=3600,
+                              autosave_max_pending=5)
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [f"Task {n}" for n in range(4)])
+    assert wait_for(manager, lambda: os.path.exists(manager.filename) and not manager._pending)
+    assert len(TodoListManager(manager.filename).todo_lists["Work"]) == 4
+    manager.autosave.stop()
+
+def test_autosave_after_interval(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.json")), autosave=True, autosave_interval=0.05)
+    manager.create_todo_list("Work")
+    assert wait_for(manager, lambda: os.path.exists(manager.filename) and not manager._pending)
+    assert "Work" in TodoListManager(manager.filename).todo_lists
+    manager.autosave.stop()
+
+def test_autosave_exit_hook_flushes(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    manager._save_at_exit()
+    assert not manager.autosave.is_alive()
+    assert TodoListManager(manager.filename).todo_lists == manager.todo_lists
+    written = manager.backend.bytes_written
+    manager._save_at_exit()
+    assert manager.backend.bytes_written == written
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Two test functions for autosave with the other storage modes
+def test_autosave_journal(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.json")), journal=True, autosave=True, autosave_interval=3600)
+    manager.create_todo_list("Work")
+    manager.flush()
+    manager.add_item_to_todo_list("Work", "Report")
+    manager.flush()
+    assert TodoListManager(manager.filename, journal=True).todo_lists == manager.todo_lists
+    manager.autosave.stop()
+
+def test_autosave_sqlite(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.db")), autosave=True, autosave_interval=0.05)
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    assert wait_for(manager, lambda: not manager._pending)
+    assert TodoListManager(manager.filename).todo_lists == manager.todo_lists
+    manager.autosave.stop()
+#--------------------------------------------------------------------------------------------
@@ -0,0 +1,160 @@
+from todopkg import TodoListManager
+from datetime import date
+import pytest
+import json
+
+# Fixture for manager setup that counts full-file saves
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.json")
+    manager = TodoListManager(str(filename))
+    manager.saves = 0
+    save = manager.backend.save
+    def counting_save(todo_lists):
+        manager.saves += 1
+        save(todo_lists)
+    manager.backend.save = counting_save
+    return manager
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for batch function
+def test_batch_saves_once(manager):
+    with manager.batch():
+        manager.create_todo_list("Work")
+        for n in range(20):
+            manager.add_item_to_todo_list("Work", f"Task {n}", n % 3)
+        manager.remove_item_from_todo_list("Work", 0)
+    assert manager.saves == 1
+    with open(manager.filename, 'r') as f:
+        assert len(json.load(f)["Work"]) == 19
+
+def test_batch_rolls_back_on_error(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+    manager.add_item_to_todo_list("Work", "Email", 1, "2023-11-10")
+    manager.create_todo_list("Home")
+    before = {name: list(items) for name, items in manager.todo_lists.items()}
+    saves = manager.saves
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.remove_item_from_todo_list("Work", 0)
+            manager.add_item_to_todo_list("Work", "Slides", 0)
+            manager.change_todo_list_name("Work", "Office")
+            manager.delete_todo_list("Home")
+            manager.create_todo_list("Garden")
+            raise RuntimeError("import failed")
+    assert manager.todo_lists == before
+    assert manager.saves == saves
+    assert manager.add_item_to_todo_list("Work", "Slides", 0) == "Item added successfully."
+
+def test_batch_rolls_back_rename_then_delete(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [f"Task {n}" for n in range(10)])
+    manager.create_todo_list("Home")
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.remove_items("Work", range(10))
+            manager.change_todo_list_name("Home", "Garden")
+            manager.delete_todo_list("Garden")
+            raise RuntimeError("import failed")
+    assert list(manager.todo_lists) == ["Work", "Home"]
+    assert len(manager.todo_lists["Work"]) == 10
+    assert manager.add_item_to_todo_list("Home", "Weeds") == "Item added successfully."
+
+def test_load_inside_batch_runs_after_it(manager):
+    manager.create_todo_list("Work")
+    events = []
+    manager.subscribe(events.append)
+    with manager.batch():
+        manager.add_item_to_todo_list("Work", "Report")
+        manager.load_from_file()
+        assert [event.kind for event in events] == []
+        manager.add_item_to_todo_list("Work", "Email")
+    assert [event.kind for event in events] == ["add", "add", "reload"]
+    assert [item['item'] for item in manager.todo_lists["Work"]] == ["Report", "Email"]
+    assert manager.saves == 2
+
+def test_nested_batch_rolls_back_inner_block(manager):
+    with manager.batch():
+        manager.create_todo_list("Work")
+        try:
+            with manager.batch():
+                manager.add_item_to_todo_list("Work", "Report")
+                raise KeyError("Report")
+        except KeyError:
+            pass
+        manager.add_item_to_todo_list("Work", "Email")
+    assert [item['item'] for item in manager.todo_lists["Work"]] == ["Email"]
+    assert manager.saves == 1
+
+def test_batch_journal_mode(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.json")), journal=True)
+    manager.create_todo_list("Work")
+    with manager.batch():
+        manager.add_item_to_todo_list("Work", "Report")
+        manager.add_item_to_todo_list("Work", "Email")
+    assert TodoListManager(manager.filename, journal=True).todo_lists == manager.todo_lists
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for add_items function
+def test_add_items(manager):
+    manager.create_todo_list("Work")
+    saves = manager.saves
+    results = manager.add_items("Work", [
+        "Email",
+        ("Report", 1, "2023-11-10"),
+        {'item': "Slides", 'priority': 1, 'due_date': "2023-11-09"},
+    ])
+    assert results == ["Item added successfully."] * 3
+    assert [item['item'] for item in manager.todo_lists["Work"]] == ["Slides", "Report", "Email"]
+    assert manager.todo_lists["Work"][0]['due_date'] == date(2023, 11, 9)
+    assert manager.saves == saves + 1
+
+def test_add_items_reports_rejected_entries(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Email")
+    results = manager.add_items("Work", ["Email", ("Report", -1), ("Slides", 1, "2023-02-30"), "Plan", "Plan"])
+    assert results == [
+        "Item already exists in the TodoList.",
+        "Priority must be a non-negative integer.",
+        "Due date must be in YYYY-MM-DD format.",
+        "Item added successfully.",
+        "Item already exists in the TodoList.",
+    ]
+    assert len(manager.todo_lists["Work"]) == 2
+
+def test_add_items_to_nonexistent_list(manager):
+    assert manager.add_items("Work", ["Email"]) == "No TodoList named Work found."
+
+def test_add_items_matches_single_adds(manager):
+    manager.create_todo_list("Bulk")
+    manager.create_todo_list("Single")
+    entries = [(f"Task {n}", n % 4, f"2023-11-{n % 28 + 1:02d}") for n in range(50)]
+    manager.add_items("Bulk", entries)
+    for entry in entries:
+        manager.add_item_to_todo_list("Single", *entry)
+    assert manager.todo_lists["Bulk"] == manager.todo_lists["Single"]
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for remove_items function
+def test_remove_items(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [(f"Task {n}", n) for n in range(5)])
+    saves = manager.saves
+    result = manager.remove_items("Work", [0, 3, 1])
+    assert result == "3 items removed from TodoList Work."
+    assert [item['item'] for item in manager.todo_lists["Work"]] == ["Task 2", "Task 4"]
+    assert manager.saves == saves + 1
+
+def test_remove_items_invalid_index(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", ["Email", "Report"])
+    assert manager.remove_items("Work", [0, 2]) == "Index 2 is out of range for TodoList Work."
+    assert manager.remove_items("Work", [0, "one"]) == "Invalid index: one. Index must be an integer."
+    assert len(manager.todo_lists["Work"]) == 2
+
+def test_remove_items_from_nonexistent_list(manager):
+    assert manager.remove_items("Work", [0]) == "No TodoList named Work found."
+#--------------------------------------------------------------------------------------------
@@ -0,0 +1,121 @@
+from todopkg import TodoListManager
+from todopkg.binary import HEADER, BinarySnapshotWriter, read_snapshot
+from todopkg.items import SortedItemList, TodoItem
+from todopkg.storage import BinaryFileBackend, convert_store, open_backend
+from datetime import date
+import pytest
+
+# Fixture for a manager stored in a binary snapshot
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.tdb")
+    return TodoListManager(str(filename))
+
+def sample_lists():
+    return {
+        "Work": SortedItemList([TodoItem("Report", 1, date(2023, 11, 10)), TodoItem("Email"),
+                                TodoItem("Slides", 1, date(2023, 11, 9)), TodoItem("Plan", 0)]),
+        "Überstunden ✓": SortedItemList([TodoItem("日本語", 3), TodoItem("")]),
+        "Empty": SortedItemList(),
+    }
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for reading and writing snapshots
+def test_snapshot_round_trip(tmpdir):
+    filename = str(tmpdir.join("todo.tdb"))
+    lists = sample_lists()
+    BinarySnapshotWriter().write(filename, lists)
+    restored = read_snapshot(filename, {})
+    assert list(restored) == list(lists)
+    assert restored == lists
+    assert isinstance(restored["Work"], SortedItemList)
+    assert restored["Work"].has_item("Plan")
+    assert restored["Work"][-1]['priority'] == float('inf')
+
+def test_snapshot_merges_existing_lists(tmpdir):
+    filename = str(tmpdir.join("todo.tdb"))
+    BinarySnapshotWriter().write(filename, sample_lists())
+    existing = {"Work": SortedItemList([TodoItem("Email", 2), TodoItem("Call", 0)])}
+    read_snapshot(filename, existing)
+    assert [item_data.item for item_data in existing["Work"]] == ["Call", "Plan", "Slides", "Report", "Email"]
+
+def test_snapshot_rejects_non_text_names(tmpdir):
+    with pytest.raises(ValueError, match="only stores list and item names that are text"):
+        BinarySnapshotWriter().write(str(tmpdir.join("todo.tdb")), {"Work": [{'item': 42, 'priority': 1, 'due_date': None}]})
+    assert not tmpdir.join("todo.tdb").exists()
+
+def test_writer_reuses_unchanged_lists(tmpdir):
+    filename = str(tmpdir.join("todo.tdb"))
+    writer = BinarySnapshotWriter()
+    lists = sample_lists()
+    writer.write(filename, lists)
+    columns = writer._cache["Work"][2]
+    lists["Empty"].add(TodoItem("New"))
+    writer.write(filename, lists)
+    assert writer._cache["Work"][2] is columns
+    assert read_snapshot(filename, {}) == lists
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for invalid snapshots
+@pytest.mark.parametrize("content", [b"", b"{}", b"NOTSNAPS" + bytes(HEADER.size)])
+def test_not_a_snapshot(tmpdir, content):
+    filename = tmpdir.join("todo.tdb")
+    filename.write_binary(content)
+    with pytest.raises(ValueError, match="not a todopkg binary snapshot"):
+        read_snapshot(str(filename), {})
+
+def test_truncated_snapshot(tmpdir):
+    filename = tmpdir.join("todo.tdb")
+    BinarySnapshotWriter().write(str(filename), sample_lists())
+    filename.write_binary(filename.read_binary()[:-3])
+    with pytest.raises(ValueError, match="truncated or corrupted"):
+        read_snapshot(str(filename), {})
+
+def test_newer_snapshot_version(tmpdir):
+    filename = tmpdir.join("todo.tdb")
+    BinarySnapshotWriter().write(str(filename), sample_lists())
+    data = bytearray(filename.read_binary())
+    data[8] = 2
+    filename.write_binary(bytes(data))
+    with pytest.raises(ValueError, match="version 2 is not supported"):
+        read_snapshot(str(filename), {})
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for BinaryFileBackend class
+def test_open_backend_binary(tmpdir):
+    assert isinstance(open_backend(str(tmpdir.join("todo.tdb"))), BinaryFileBackend)
+    assert isinstance(open_backend(str(tmpdir.join("todo.data")), 'binary'), BinaryFileBackend)
+    with pytest.raises(ValueError, match="Lazy loading"):
+        open_backend(str(tmpdir.join("todo.tdb")), lazy=True)
+
+def test_manager_round_trip(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+    manager.add_item_to_todo_list("Work", "Email")
+    manager.create_todo_list("Home")
+    manager.change_todo_list_name("Home", "House")
+    manager.remove_item_from_todo_list("Work", 1)
+    restarted = TodoListManager(manager.filename)
+    assert list(restarted.todo_lists) == ["Work", "House"]
+    assert restarted.todo_lists == manager.todo_lists
+
+def test_manager_journal(tmpdir):
+    filename = str(tmpdir.join("todo.tdb"))
+    manager = TodoListManager(filename, journal=True)
+    manager.create_todo_list("Work")
+    manager.save_to_file()
+    manager.add_item_to_todo_list("Work", "Report", 1)
+    assert read_snapshot(filename, {}) == {"Work": []}
+    assert TodoListManager(filename, journal=True).todo_lists == manager.todo_lists
+
+def test_convert_store(tmpdir):
+    source = TodoListManager(str(tmpdir.join("todo.json")))
+    for name, items in sample_lists().items():
+        source.create_todo_list(name)
+        source.add_items(name, [(item_data.item, item_data['priority'] if item_data.priority_value >= 0 else None,
+                                 item_data.due_date.isoformat() if item_data.due_date else None)
+                                for item_data in items])
+    assert convert_store(source.filename, str(tmpdir.join("todo.tdb"))) == 3
+    assert TodoListManager(str(tmpdir.join("todo.tdb"))).todo_lists == source.todo_lists
+    assert convert_store(str(tmpdir.join("todo.tdb")), str(tmpdir.join("copy.json"))) == 3
+    assert tmpdir.join("copy.json").read() == tmpdir.join("todo.json").read()
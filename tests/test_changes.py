@@ -0,0 +1,131 @@
+from todopkg import TodoListManager
+from todopkg.changes import ChangeFeed
+import pytest
+
+# Fixture for a manager stored in a temporary json file
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("test_todo.json")
+    return TodoListManager(str(filename))
+
+# Apply change events to a copy of the lists, the way a consumer of the feed would
+def replay(todo_lists, events):
+    for event in events:
+        if event.kind == 'create':
+            todo_lists[event.name] = []
+        elif event.kind == 'delete':
+            del todo_lists[event.name]
+        elif event.kind == 'rename':
+            todo_lists = {event.new_name if name == event.name else name: items for name, items in todo_lists.items()}
+        elif event.kind == 'add':
+            todo_lists[event.name].insert(event.index, event.item)
+        elif event.kind == 'remove':
+            assert todo_lists[event.name].pop(event.index) == event.item
+    return todo_lists
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for the events published by the mutators
+def test_mutator_events(manager):
+    events = []
+    manager.subscribe(events.append)
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Email")
+    manager.add_item_to_todo_list("Work", "Report", 1)
+    manager.remove_item_from_todo_list("Work", 1)
+    manager.change_todo_list_name("Work", "Office")
+    manager.delete_todo_list("Office")
+    assert [(event.version, event.kind, event.name, event.index) for event in events] == [
+        (1, 'create', "Work", None), (2, 'add', "Work", 0), (3, 'add', "Work", 0),
+        (4, 'remove', "Work", 1), (5, 'rename', "Work", None), (6, 'delete', "Office", 0)]
+    assert events[2].item.item == "Report" and events[3].item.item == "Email"
+    assert events[4].new_name == "Office"
+    assert manager.version == 6
+
+def test_failed_mutators_publish_nothing(manager):
+    manager.create_todo_list("Work")
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Email", -1)
+    manager.remove_item_from_todo_list("Work", 0)
+    manager.delete_todo_list("Home")
+    assert manager.version == 1
+
+def test_replaying_events_rebuilds_the_lists(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", ["Email", ("Report", 1), ("Plan", 0, "2023-11-10")])
+    copy = {name: list(items) for name, items in manager.todo_lists.items()}
+    seen = manager.version
+    manager.add_items("Work", [("Slides", 1)] + [(f"Task {n}", n % 3) for n in range(20)])
+    manager.remove_items("Work", [0, 3, 7, 22])
+    manager.add_item_to_todo_list("Work", "Call", 2)
+    manager.create_todo_list("Home")
+    manager.add_items("Home", ["Dishes", ("Laundry", 0)])
+    manager.change_todo_list_name("Home", "House")
+    copy = replay(copy, manager.changes_since(seen))
+    assert copy == {name: list(items) for name, items in manager.todo_lists.items()}
+    assert list(copy) == list(manager.todo_lists)
+
+def test_reload_event(manager):
+    manager.create_todo_list("Work")
+    events = []
+    manager.subscribe(events.append)
+    manager.load_from_file()
+    assert [(event.kind, event.name) for event in events] == [('reload', None)]
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for batches and subscribers
+def test_batch_publishes_on_exit(manager):
+    events = []
+    manager.subscribe(events.append)
+    with manager.batch():
+        manager.create_todo_list("Work")
+        manager.add_item_to_todo_list("Work", "Email")
+        assert events == [] and manager.version == 0
+    assert [event.kind for event in events] == ['create', 'add']
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.add_item_to_todo_list("Work", "Report")
+            raise RuntimeError("abort")
+    assert len(events) == 2 and manager.changes_since(2) == []
+
+def test_unsubscribe(manager):
+    events = []
+    callback = manager.subscribe(events.append)
+    manager.create_todo_list("Work")
+    assert manager.unsubscribe(callback) is True
+    assert manager.unsubscribe(callback) is False
+    manager.create_todo_list("Home")
+    assert len(events) == 1
+
+def test_failing_subscriber(manager, capsys):
+    events = []
+    def fail(event):
+        raise ValueError("broken")
+    manager.subscribe(fail)
+    manager.subscribe(events.append)
+    assert manager.create_todo_list("Work") is True
+    assert "Warning: A change subscriber failed. Error: broken" in capsys.readouterr().out
+    assert len(events) == 1 and "Work" in manager.todo_lists
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for ChangeFeed class
+def test_changes_since_ring_buffer():
+    feed = ChangeFeed(capacity=3)
+    feed.publish([('create', f"List {n}") for n in range(5)])
+    assert feed.version == 5
+    assert [event.name for event in feed.changes_since(2)] == ["List 2", "List 3", "List 4"]
+    assert feed.changes_since(1) is None
+    assert feed.changes_since(5) == []
+    assert feed.changes_since(6) is None and feed.changes_since(-1) is None
+
+def test_large_publish_without_subscribers():
+    feed = ChangeFeed(capacity=2)
+    feed.publish([('create', f"List {n}") for n in range(1000)])
+    assert [(event.version, event.name) for event in feed.changes_since(998)] == [(999, "List 998"), (1000, "List 999")]
+
+def test_subscriber_sees_every_event_of_a_large_publish():
+    feed = ChangeFeed(capacity=2)
+    events = []
+    feed.subscribe(events.append)
+    feed.publish([('create', f"List {n}") for n in range(10)])
+    assert [event.version for event in events] == list(range(1, 11))
+    assert len(feed.changes_since(8)) == 2
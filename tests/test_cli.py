@@ -0,0 +1,124 @@
+from todopkg import TodoListManager
+from todopkg.cli import main
+import pytest
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Fixture for the path of an empty store
+@pytest.fixture
+def store(tmpdir):
+    return str(tmpdir.join("todo.json"))
+
+# Fixture for a daemon serving the store in another process
+@pytest.fixture
+def daemon(store):
+    process = subprocess.Popen([sys.executable, "-m", "todopkg", "--file", store, "daemon"],
+                               env=dict(os.environ, PYTHONPATH=SRC), stdout=subprocess.PIPE, text=True)
+    assert process.stdout.readline().startswith("Serving")
+    yield process
+    if process.poll() is None:
+        process.terminate()
+    process.wait(timeout=5)
+
+def cli(store, *args):
+    return main(["--file", store, *args])
+
+#--------------------------------------------------------------------------------------------
+# Six test functions for commands run without a daemon
+def test_create_add_and_show(store, capsys):
+    assert cli(store, "create", "Work") == 0
+    assert cli(store, "add", "Work", "Report", "-p", "1", "-d", "2023-12-01") == 0
+    assert cli(store, "add", "Work", "Email") == 0
+    capsys.readouterr()
+    assert cli(store, "show") == 0
+    assert capsys.readouterr().out == "Work (2 items)\n"
+    assert cli(store, "show", "Work") == 0
+    assert capsys.readouterr().out == ("0: Item: Report, Priority: 1, Due date: 2023-12-01\n"
+                                       "1: Item: Email, Priority: No priority specified, Due date: No due date\n")
+
+def test_failed_commands_exit_with_one(store):
+    assert cli(store, "create", "Work") == 0
+    assert cli(store, "create", "Work") == 1
+    assert cli(store, "add", "Home", "Laundry") == 1
+    assert cli(store, "add", "Work", "Report", "-d", "12/01/2023") == 1
+    assert cli(store, "rm", "Work", "0") == 1
+    assert cli(store, "rename", "Home", "House") == 1
+
+def test_usage_errors_exit_with_two(store):
+    with pytest.raises(SystemExit) as error:
+        cli(store, "add", "Work", "Report", "-p", "high")
+    assert error.value.code == 2
+
+def test_rm_rename_and_delete(store):
+    cli(store, "create", "Work")
+    cli(store, "add", "Work", "Report")
+    assert cli(store, "rm", "Work", "0") == 0
+    assert cli(store, "rename", "Work", "Job") == 0
+    assert TodoListManager(store).todo_lists == {"Job": []}
+    assert cli(store, "delete", "Job") == 0
+    assert TodoListManager(store).todo_lists == {}
+
+def test_query_and_print(store, capsys):
+    cli(store, "create", "Work")
+    cli(store, "create", "Home")
+    cli(store, "add", "Work", "Report", "-p", "2", "-d", "2023-12-01")
+    cli(store, "add", "Home", "Laundry", "-p", "1", "-d", "2023-11-20")
+    cli(store, "add", "Home", "Dishes")
+    capsys.readouterr()
+    assert cli(store, "query", "--due-before", "2023-12-31", "--order", "due_date") == 0
+    assert capsys.readouterr().out == ("Home: Item: Laundry, Priority: 1, Due date: 2023-11-20\n"
+                                       "Work: Item: Report, Priority: 2, Due date: 2023-12-01\n")
+    assert cli(store, "print", "Home", "--limit", "1") == 0
+    assert "Showing items 1-1 of 2." in capsys.readouterr().out
+
+def test_sharded_backend(tmpdir):
+    store = str(tmpdir.join("todo.data"))
+    assert main(["--file", store, "--backend", "sharded", "create", "Work"]) == 0
+    assert os.path.isdir(store)
+    assert TodoListManager(store, backend="sharded").todo_lists == {"Work": []}
+
+#--------------------------------------------------------------------------------------------
+# Six test functions for the daemon
+def test_daemon_serves_commands(store, daemon, capsys):
+    assert os.path.exists(store + ".sock")
+    assert cli(store, "create", "Work") == 0
+    assert cli(store, "add", "Work", "Report", "-p", "1") == 0
+    assert cli(store, "create", "Work") == 1
+    assert capsys.readouterr().out == "Error: TodoList named Work already exists.\n"
+    # Changes are saved before the daemon replies
+    assert TodoListManager(store).todo_lists["Work"][0]["item"] == "Report"
+
+def test_daemon_stop(store, daemon, capsys):
+    assert cli(store, "stop") == 0
+    assert capsys.readouterr().out == "Daemon stopped.\n"
+    assert daemon.wait(timeout=5) == 0
+    assert not os.path.exists(store + ".sock")
+    assert cli(store, "stop") == 1
+
+def test_daemon_refuses_other_store(store, daemon, tmpdir, capsys):
+    other = str(tmpdir.join("other.json"))
+    assert main(["--file", other, "--socket", store + ".sock", "create", "Work"]) == 1
+    assert "not" in capsys.readouterr().out
+    assert not os.path.exists(other)
+
+def test_daemon_refuses_other_storage_options(store, daemon, capsys):
+    assert cli(store, "--backend", "sqlite", "create", "Work") == 1
+    assert cli(store, "--journal", "create", "Work") == 1
+    assert capsys.readouterr().out == (
+        f"Error: The daemon serves {store} with the json backend without a journal, stop it to use other storage options.\n" * 2)
+    assert not os.path.exists(store)
+    assert cli(store, "--backend", "json", "create", "Work") == 0
+
+def test_stale_socket_runs_locally(store):
+    open(store + ".sock", "w").close()
+    assert cli(store, "create", "Work") == 0
+    assert TodoListManager(store).todo_lists == {"Work": []}
+
+def test_second_daemon_is_refused(store, daemon):
+    result = subprocess.run([sys.executable, "-m", "todopkg", "--file", store, "daemon"],
+                            env=dict(os.environ, PYTHONPATH=SRC), capture_output=True, text=True, timeout=10)
+    assert result.returncode == 1
+    assert "already listening" in result.stdout
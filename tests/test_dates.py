@@ -0,0 +1,45 @@
+from todopkg import TodoListManager
+from todopkg.dates import parse_date, parse_dates
+from datetime import date, datetime
+import pytest
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for parse_date function
+def test_parse_canonical_dates():
+    assert parse_date("2023-11-10") == date(2023, 11, 10)
+    assert parse_date("2024-02-29") == date(2024, 2, 29)
+    assert parse_date("0001-01-01") == date.min
+
+# parse_date accepts exactly what strptime("%Y-%m-%d") accepts
+@pytest.mark.parametrize("text", ["2023-1-5", "2023-01-5", "2023-02-30", "2023-13-01", "0000-01-01",
+                                  "20231110", "2023-W45-1", "2023-11-10T00:00", "2023-11-1x",
+                                  "２０２３-11-10", "", " 2023-11-10", "11/10/2023"])
+def test_parse_date_matches_strptime(text):
+    try:
+        expected = datetime.strptime(text, "%Y-%m-%d").date()
+    except ValueError:
+        with pytest.raises(ValueError):
+            parse_date(text)
+    else:
+        assert parse_date(text) == expected
+
+def test_parse_date_cache():
+    parse_date.cache_clear()
+    assert parse_date("2023-11-10") is parse_date("2023-11-10")
+    assert parse_date.cache_info().hits == 1
+    with pytest.raises(TypeError):
+        parse_date(date(2023, 11, 10))
+
+#--------------------------------------------------------------------------------------------
+# Two test functions for parse_dates function
+def test_parse_dates():
+    assert parse_dates(["2023-11-10", None, "", "2023-11-10", "11/10/2023", 20231110, ["2023-11-10"]]) == [
+        date(2023, 11, 10), None, None, date(2023, 11, 10), "Due date must be in YYYY-MM-DD format.",
+        "Due date must be in YYYY-MM-DD format.", "Due date must be in YYYY-MM-DD format."]
+
+def test_manager_rejects_invalid_dates(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("test_todo.json")))
+    manager.create_todo_list("Work")
+    assert manager.add_item_to_todo_list("Work", "Report", 1, "2023-02-30") == "Due date must be in YYYY-MM-DD format."
+    assert manager.add_item_to_todo_list("Work", "Email", 1, "2023-1-5") == "Item added successfully."
+    assert manager.todo_lists["Work"][0]['due_date'] == date(2023, 1, 5)
@@ -0,0 +1,155 @@
+from todopkg import AsyncTodoListManager, TodoListManager
+import asyncio
+import pytest
+
+# Fixture for a manager stored in a temporary json file
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("test_todo.json")
+    return TodoListManager(str(filename))
+
+# Lists as plain values, for comparing states
+def state(manager):
+    return {name: [(item_data.item, item_data.priority, item_data.due_date) for item_data in items]
+            for name, items in manager.todo_lists.items()}
+
+# Run every mutator once and return the state before each of them and after the last one
+def run_mutators(manager):
+    mutators = [lambda: manager.create_todo_list("Work"),
+                lambda: manager.add_items("Work", [("Report", 1), ("Email", 1), ("Plan", 0, "2023-11-10")]),
+                lambda: manager.add_item_to_todo_list("Work", "Call", 2),
+                lambda: manager.remove_items("Work", [1, 2]),
+                lambda: manager.remove_item_from_todo_list("Work", 0),
+                lambda: manager.change_todo_list_name("Work", "Office"),
+                lambda: manager.create_todo_list("Home"),
+                lambda: manager.delete_todo_list("Office")]
+    states = [state(manager)]
+    for mutator in mutators:
+        mutator()
+        states.append(state(manager))
+    return states
+
+#--------------------------------------------------------------------------------------------
+# Six test functions for undo and redo of the mutators
+@pytest.mark.parametrize("journal", [False, True])
+def test_undo_and_redo_every_mutator(tmpdir, journal):
+    manager = TodoListManager(str(tmpdir.join("test_todo.json")), journal=journal)
+    states = run_mutators(manager)
+    for expected in reversed(states[:-1]):
+        assert manager.undo() is True
+        assert state(manager) == expected
+    assert manager.undo() == "Nothing to undo."
+    for expected in states[1:4]:
+        assert manager.redo() is True
+        assert state(manager) == expected
+    assert state(TodoListManager(manager.filename, journal=journal)) == states[3]
+
+def test_batch_is_one_step(manager):
+    manager.create_todo_list("Work")
+    with manager.batch():
+        manager.add_item_to_todo_list("Work", "Report", 1)
+        manager.change_todo_list_name("Work", "Office")
+        assert manager.undo() == "Undo and redo are not available inside a batch."
+    manager.undo()
+    assert state(manager) == {"Work": []}
+    manager.undo()
+    assert state(manager) == {}
+
+def test_new_change_clears_redo(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    manager.undo()
+    manager.add_item_to_todo_list("Work", "Email")
+    assert manager.redo() == "Nothing to redo."
+    assert state(manager) == {"Work": [("Email", float('inf'), None)]}
+
+def test_undo_delete_shares_items(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", ["Report", "Email"])
+    items = manager.todo_lists["Work"]
+    manager.delete_todo_list("Work")
+    manager.undo()
+    restored = manager.todo_lists["Work"]
+    assert restored is not items and all(a is b for a, b in zip(restored, items))
+    restored.add({"item": "Plan", "priority": 1, "due_date": None})
+    assert len(items) == 2
+
+# Restored items and lists are where reading the store again puts them
+@pytest.mark.parametrize("options", [{}, {'journal': True}, {'backend': 'sqlite'}])
+def test_undo_positions_match_reload(tmpdir, options):
+    manager = TodoListManager(str(tmpdir.join("test_todo.db" if options.get('backend') else "test_todo.json")), **options)
+    for name in ["A", "B", "C"]:
+        manager.create_todo_list(name)
+    manager.add_items("B", ["First", "Second", "Third"])
+    manager.remove_item_from_todo_list("B", 0)
+    manager.undo()
+    assert [item_data.item for item_data in manager.todo_lists["B"]] == ["Second", "Third", "First"]
+    manager.change_todo_list_name("B", "Renamed")
+    assert list(manager.todo_lists) == ["A", "Renamed", "C"]
+    manager.delete_todo_list("Renamed")
+    manager.undo()
+    assert list(manager.todo_lists) == ["A", "Renamed", "C"]
+    manager.undo()
+    assert list(manager.todo_lists) == ["A", "B", "C"]
+    reopened = TodoListManager(manager.filename, **options)
+    assert list(reopened.todo_lists) == ["A", "B", "C"]
+    assert state(reopened) == state(manager)
+
+def test_batch_rollback_keeps_list_positions(manager):
+    for name in ["A", "B", "C"]:
+        manager.create_todo_list(name)
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.change_todo_list_name("A", "Renamed")
+            manager.delete_todo_list("B")
+            raise RuntimeError("rolled back")
+    assert list(manager.todo_lists) == ["A", "B", "C"]
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for the history depth, reloads, change events and the async manager
+def test_history_depth(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("test_todo.json")), history_depth=2)
+    for name in ["A", "B", "C"]:
+        manager.create_todo_list(name)
+    assert manager.undo() is True and manager.undo() is True
+    assert manager.undo() == "Nothing to undo."
+    assert list(manager.todo_lists) == ["A"]
+    disabled = TodoListManager(str(tmpdir.join("other.json")), history_depth=0)
+    disabled.create_todo_list("A")
+    assert disabled.undo() == "Nothing to undo."
+
+def test_reload_clears_history(manager):
+    manager.create_todo_list("Work")
+    manager.load_from_file()
+    assert manager.undo() == "Nothing to undo."
+    assert "Work" in manager.todo_lists
+
+def test_undo_events_replay(manager):
+    events = []
+    manager.subscribe(events.append)
+    run_mutators(manager)
+    copy = {}
+    for _ in range(5):
+        manager.undo()
+    for event in events:
+        if event.kind == 'create':
+            copy[event.name] = []
+        elif event.kind == 'delete':
+            del copy[event.name]
+        elif event.kind == 'rename':
+            copy[event.new_name] = copy.pop(event.name)
+        elif event.kind == 'add':
+            copy[event.name].insert(event.index, event.item)
+        else:
+            assert copy[event.name].pop(event.index) == event.item
+    assert copy == {name: list(items) for name, items in manager.todo_lists.items()}
+
+def test_aio_undo(tmpdir):
+    async def main():
+        manager = await AsyncTodoListManager.open(str(tmpdir.join("test_todo.json")))
+        await manager.create_todo_list("Work")
+        await manager.add_item_to_todo_list("Work", "Report")
+        await manager.undo()
+        return await manager.redo()
+    assert asyncio.run(main()) is True
+    assert state(TodoListManager(str(tmpdir.join("test_todo.json")))) == {"Work": [("Report", float('inf'), None)]}
@@ -0,0 +1,86 @@
+from todopkg import TodoListManager, shutdown
+import pytest
+import gc
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+# Package modules every manager needs, the others are imported by the features that use them
+CORE_MODULES = {"todopkg", "todopkg.changes", "todopkg.dates", "todopkg.history", "todopkg.items",
+                "todopkg.journal", "todopkg.locking", "todopkg.query", "todopkg.shutdown", "todopkg.todopkg"}
+
+# Modules loaded by a fresh interpreter after running statement
+def loaded_modules(statement):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run([sys.executable, "-c", statement + "; import sys; print(' '.join(sys.modules))"],
+                            env=env, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for the modules loaded by importing the package
+def test_import_loads_core_modules():
+    assert {module for module in loaded_modules("import todopkg") if module.startswith("todopkg")} == CORE_MODULES
+
+def test_main_import_loads_core_modules():
+    # python -m todopkg imports the same modules and the command line parser before running
+    modules = loaded_modules("import todopkg.__main__")
+    assert {module for module in modules if module.startswith("todopkg")} == CORE_MODULES | {"todopkg.__main__", "todopkg.cli"}
+
+@pytest.mark.parametrize("module", ["asyncio", "sqlite3", "json", "tabulate", "todopkg.storage", "todopkg.render", "mmap",
+                                    "todopkg.autosave", "todopkg.stats"])
+def test_import_skips_optional_modules(module):
+    assert module not in loaded_modules("import todopkg")
+
+#--------------------------------------------------------------------------------------------
+# Two test functions for lazily provided names
+def test_lazy_names_are_importable():
+    from todopkg import AsyncTodoListManager, CustomEncoder, TodoStoreView
+    from todopkg.aio import AsyncTodoListManager as aio_manager
+    from todopkg.view import TodoStoreView as store_view
+    from todopkg.writer import CustomEncoder as writer_encoder
+    assert AsyncTodoListManager is aio_manager
+    assert CustomEncoder is writer_encoder
+    assert TodoStoreView is store_view
+
+def test_unknown_name_raises():
+    import todopkg
+    with pytest.raises(AttributeError):
+        todopkg.missing
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for the shutdown registry
+def test_save_all_saves_registered_managers(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.json")), autosave=True, autosave_interval=3600)
+    manager.create_todo_list("Work")
+    assert not os.path.exists(manager.filename)
+    others = set(shutdown._managers) - {manager}
+    for other in others:
+        shutdown.unregister(other)
+    try:
+        shutdown.save_all()
+    finally:
+        for other in others:
+            shutdown.register(other)
+    shutdown.unregister(manager)
+    assert TodoListManager(manager.filename).todo_lists == {"Work": []}
+
+def test_unused_manager_is_collected(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.json")), autosave=True, autosave_interval=0.01)
+    manager.create_todo_list("Work")
+    manager.flush()
+    thread = manager.autosave
+    del manager
+    # The thread lets go of the manager on its next wakeup, after which it can be collected
+    for _ in range(100):
+        gc.collect()
+        thread.join(timeout=0.05)
+        if not thread.is_alive():
+            break
+    assert not thread.is_alive()
+    assert TodoListManager(str(tmpdir.join("todo.json"))).todo_lists == {"Work": []}
+
+def test_one_exit_hook_for_all_managers(tmpdir):
+    managers = [TodoListManager(str(tmpdir.join(f"todo{i}.json"))) for i in range(3)]
+    assert shutdown._hooked
+    assert all(manager in shutdown._managers for manager in managers)
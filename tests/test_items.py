@@ -0,0 +1,120 @@
+from todopkg.items import NO_DUE_DATE, NO_PRIORITY, SortedItemList, TodoItem, item_sort_key, sorted_items
+from datetime import date
+import copy
+import pytest
+
+def make_item(item, priority=float('inf'), due_date=None):
+    return {'item': item, 'priority': priority, 'due_date': due_date}
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for SortedItemList.add
+def test_add_keeps_sorted_order():
+    items = SortedItemList()
+    items.add(make_item("Bread"))
+    items.add(make_item("Milk", 2))
+    items.add(make_item("Eggs", 1, date(2023, 11, 10)))
+    items.add(make_item("Butter", 1, date(2023, 11, 9)))
+    assert [item_data['item'] for item_data in items] == ["Butter", "Eggs", "Milk", "Bread"]
+
+def test_add_returns_position():
+    items = SortedItemList([make_item("Milk", 2), make_item("Eggs", 4)])
+    assert items.add(make_item("Bread", 3)) == 1
+    assert items.add(make_item("Butter", 0)) == 0
+
+def test_add_equal_keys_keep_insertion_order():
+    items = SortedItemList()
+    for name in ["First", "Second", "Third"]:
+        items.add(make_item(name, 1))
+    assert [item_data['item'] for item_data in items] == ["First", "Second", "Third"]
+
+def test_append_is_sorted_insert():
+    items = SortedItemList([make_item("Milk", 2)])
+    items.append(make_item("Eggs", 1))
+    items.extend(make_item(f"Task {n}", n) for n in range(10))
+    keys = [item_data['priority'] for item_data in items]
+    assert keys == sorted(keys)
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for the item name index and removal
+def test_has_item():
+    items = SortedItemList([make_item("Milk")])
+    assert items.has_item("Milk")
+    assert not items.has_item("Eggs")
+
+def test_pop_updates_index():
+    items = SortedItemList([make_item("Milk", 2), make_item("Eggs", 1)])
+    assert items.pop(0)['item'] == "Eggs"
+    del items[-1]
+    assert not items.has_item("Eggs")
+    assert not items.has_item("Milk")
+    assert items.add(make_item("Eggs", 1)) == 0
+
+def test_unsorted_operations_rejected():
+    items = SortedItemList([make_item("Milk")])
+    with pytest.raises(TypeError):
+        items.insert(0, make_item("Eggs"))
+    with pytest.raises(TypeError):
+        items[0] = make_item("Eggs")
+
+def test_copy_rebuilds_index():
+    items = SortedItemList([make_item("Milk", 2), make_item("Eggs", 1)])
+    copied = copy.deepcopy(items)
+    assert copied == items
+    copied.add(make_item("Bread", 0))
+    assert len(copied) == 3 and len(items) == 2
+    assert copied.has_item("Bread") and not items.has_item("Bread")
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Two test functions for sorted_items function
+def test_sorted_items_converts_plain_list():
+    todo_lists = {"Work": [make_item("Report", 2), make_item("Email", 1)]}
+    items = sorted_items(todo_lists, "Work")
+    assert isinstance(todo_lists["Work"], SortedItemList)
+    assert items[0]['item'] == "Email"
+
+def test_sorted_items_returns_existing_list():
+    items = SortedItemList()
+    assert sorted_items({"Work": items}, "Work") is items
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for TodoItem class
+def test_todo_item_dict_access():
+    item_data = TodoItem("Report", 2, date(2023, 11, 10))
+    assert item_data['item'] == "Report"
+    assert item_data['priority'] == 2
+    assert item_data['due_date'] == date(2023, 11, 10)
+    assert item_data.get('missing') is None
+    assert dict(item_data) == {'item': "Report", 'priority': 2, 'due_date': date(2023, 11, 10)}
+
+def test_todo_item_missing_fields():
+    item_data = TodoItem("Email")
+    assert item_data['priority'] == float('inf')
+    assert item_data['due_date'] is None
+    assert item_data.priority_value == NO_PRIORITY
+    assert item_data.due_ordinal == NO_DUE_DATE
+
+def test_todo_item_equals_dict():
+    item_data = TodoItem("Email", float('inf'))
+    assert item_data == {'item': "Email", 'priority': float('inf'), 'due_date': None}
+    assert item_data == TodoItem("Email")
+    assert item_data != TodoItem("Email", 1)
+
+def test_todo_item_order_matches_sort_key():
+    items = [
+        make_item("A"), make_item("B", 0), make_item("C", 2, date(2023, 1, 2)),
+        make_item("D", 2, date(2023, 1, 1)), make_item("E", 2), make_item("F", due_date=date(2023, 1, 1)),
+    ]
+    expected = [item_data['item'] for item_data in sorted(items, key=item_sort_key)]
+    records = [TodoItem.from_mapping(item_data) for item_data in items]
+    assert [item_data.item for item_data in sorted(records)] == expected
+    assert [item_data.item for item_data in sorted(records, key=item_sort_key)] == expected
+
+def test_todo_item_is_compact():
+    item_data = TodoItem("Email")
+    assert not hasattr(item_data, '__dict__')
+    with pytest.raises(KeyError):
+        item_data['missing']
+#--------------------------------------------------------------------------------------------
@@ -0,0 +1,142 @@
+from todopkg import TodoListManager
+from datetime import date
+import pytest
+import os
+import json
+import time
+
+# Fixture for a manager running in journal mode
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.json")
+    manager = TodoListManager(str(filename), journal=True)
+    return manager
+
+def read_journal(manager):
+    with open(manager.journal.filename, 'r') as f:
+        return [json.loads(line) for line in f]
+
+#--------------------------------------------------------------------------------------------
+# Six test functions for journaled mutations
+def test_journal_appends_records(manager):
+    manager.create_todo_list("Work")  # the first write creates the snapshot and the journal
+    manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+    manager.change_todo_list_name("Work", "Office")
+    manager.remove_item_from_todo_list("Office", 0)
+    manager.delete_todo_list("Office")
+    records = read_journal(manager)
+    assert records[0][0] == "base"
+    assert records[1:] == [
+        ["add", "Work", "Report", 1, "2023-11-10"],
+        ["rename", "Work", "Office"],
+        ["remove", "Office", 0, "Report"],
+        ["delete", "Office"],
+    ]
+
+def test_journal_does_not_rewrite_snapshot(manager):
+    manager.create_todo_list("Work")
+    with open(manager.filename, 'r') as f:
+        snapshot = f.read()
+    manager.add_item_to_todo_list("Work", "Report")
+    with open(manager.filename, 'r') as f:
+        assert f.read() == snapshot
+
+def test_journal_writes_do_not_copy_lists(manager):
+    manager.create_todo_list("Work")
+    written = []
+    persist = manager.backend.persist
+    def recording_persist(todo_lists, records):
+        written.append(todo_lists)
+        return persist(todo_lists, records)
+    manager.backend.persist = recording_persist
+    manager.add_item_to_todo_list("Work", "Report")
+    manager.add_items("Work", ["Email", "Slides"])
+    assert written == [None, None]
+
+def test_flush_syncs_written_changes(manager, monkeypatch):
+    syncs = []
+    monkeypatch.setattr(manager.journal, "sync", lambda: syncs.append(True))
+    manager.create_todo_list("Work")
+    assert syncs == []  # written by the call but not synced
+    manager.flush()
+    assert syncs == [True]
+    with manager.batch():
+        manager.add_item_to_todo_list("Work", "Report")
+        manager.flush()
+        assert syncs == [True]
+    assert syncs == [True, True]
+
+def test_journal_replayed_on_restart(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Email", 2)
+    manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+    manager.add_item_to_todo_list("Work", "Slides", 1)
+    manager.remove_item_from_todo_list("Work", 1)
+    manager.create_todo_list("Home")
+    restarted = TodoListManager(manager.filename, journal=True)
+    assert restarted.todo_lists == manager.todo_lists
+    assert restarted.todo_lists["Work"][0]['due_date'] == date(2023, 11, 10)
+
+def test_journal_compaction(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    manager = TodoListManager(filename, journal=True, journal_max_bytes=200)
+    manager.create_todo_list("Work")
+    for n in range(10):
+        manager.add_item_to_todo_list("Work", f"Task {n}", n)
+    assert os.path.getsize(manager.journal.filename) < 200
+    with open(filename, 'r') as f:
+        assert len(json.load(f)["Work"]) > 0
+    assert TodoListManager(filename, journal=True).todo_lists == manager.todo_lists
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for journal replay edge cases and compaction across processes
+def test_stale_journal_is_ignored(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    manager.remove_item_from_todo_list("Work", 0)
+    stale = read_journal(manager)
+    manager.add_item_to_todo_list("Work", "Report")
+    manager.save_to_file()
+    # Simulate a crash after the snapshot was written but before the journal was reset
+    manager.journal.close()
+    with open(manager.journal.filename, 'w') as f:
+        f.writelines(json.dumps(record) + '\n' for record in stale)
+    restarted = TodoListManager(manager.filename, journal=True)
+    assert [item['item'] for item in restarted.todo_lists["Work"]] == ["Report"]
+
+def test_torn_journal_line_is_ignored(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    with open(manager.journal.filename, 'a') as f:
+        f.write('["add","Work","Ema')
+    restarted = TodoListManager(manager.filename, journal=True)
+    assert [item['item'] for item in restarted.todo_lists["Work"]] == ["Report"]
+
+def test_save_to_file_resets_journal(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    manager.save_to_file()
+    assert [record[0] for record in read_journal(manager)] == ["base"]
+
+def test_exit_appends_without_compacting(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    restarted = TodoListManager(manager.filename, journal=True)
+    snapshot = os.stat(manager.filename).st_mtime_ns
+    restarted.add_item_to_todo_list("Work", "Email")
+    restarted._save_at_exit()
+    assert os.stat(manager.filename).st_mtime_ns == snapshot
+    assert read_journal(manager)[-1] == ["add", "Work", "Email", None, None]
+    assert TodoListManager(manager.filename, journal=True).todo_lists == restarted.todo_lists
+
+def test_journal_age_counts_from_snapshot(manager, monkeypatch):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 3600)  # the next process starts an hour later
+    restarted = TodoListManager(manager.filename, journal=True, journal_max_age=600)
+    restarted.add_item_to_todo_list("Work", "Email")
+    assert [record[0] for record in read_journal(manager)] == ["base"]
+    assert TodoListManager(manager.filename, journal=True).todo_lists == restarted.todo_lists
+#--------------------------------------------------------------------------------------------
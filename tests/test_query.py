@@ -0,0 +1,92 @@
+from todopkg import TodoListManager
+from todopkg.query import DueDateIndex, run_query
+from datetime import date
+import pytest
+import random
+
+# Fixture for a manager with a few lists to query
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.json")
+    manager = TodoListManager(str(filename))
+    with manager.batch():
+        manager.create_todo_list("Work")
+        manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+        manager.add_item_to_todo_list("Work", "Email", 2, "2023-11-05")
+        manager.add_item_to_todo_list("Work", "Meeting", 1)
+        manager.add_item_to_todo_list("Work", "Slides")
+        manager.create_todo_list("Home")
+        manager.add_item_to_todo_list("Home", "Laundry", 0, "2023-11-12")
+        manager.add_item_to_todo_list("Home", "Dishes", 3, "2023-11-01")
+        manager.add_item_to_todo_list("Home", "Garden", None, "2023-11-03")
+    return manager
+
+def names(results):
+    return [(name, item_data.item) for name, item_data in results]
+
+#--------------------------------------------------------------------------------------------
+# Six test functions for query function
+def test_query_orders_by_priority(manager):
+    assert names(manager.query()) == [
+        ("Home", "Laundry"), ("Work", "Report"), ("Work", "Meeting"), ("Work", "Email"),
+        ("Home", "Dishes"), ("Home", "Garden"), ("Work", "Slides"),
+    ]
+    assert names(manager.query(limit=2)) == [("Home", "Laundry"), ("Work", "Report")]
+
+def test_query_filters(manager):
+    assert names(manager.query(due_after="2023-11-03", due_before=date(2023, 11, 10))) == [
+        ("Work", "Report"), ("Work", "Email"), ("Home", "Garden"),
+    ]
+    assert names(manager.query(max_priority=1, lists=["Work"])) == [("Work", "Report"), ("Work", "Meeting")]
+    assert names(manager.query(due_before="2023-11-30", max_priority=2, limit=0)) == []
+
+def test_query_orders_by_due_date(manager):
+    assert names(manager.query(order='due_date')) == [
+        ("Home", "Dishes"), ("Home", "Garden"), ("Work", "Email"), ("Work", "Report"),
+        ("Home", "Laundry"), ("Work", "Meeting"), ("Work", "Slides"),
+    ]
+    assert names(manager.query(order='due_date', due_after="2023-11-04", limit=2)) == [
+        ("Work", "Email"), ("Work", "Report"),
+    ]
+    # The index follows changes made after the previous query
+    manager.add_item_to_todo_list("Work", "Invoice", 5, "2023-10-30")
+    manager.delete_todo_list("Home")
+    assert names(manager.query(order='due_date', due_before="2023-11-06")) == [
+        ("Work", "Invoice"), ("Work", "Email"),
+    ]
+
+def test_due_date_index_applies_changes(manager):
+    manager.query(order='due_date')
+    ordered = manager._due_index.entries("Work", manager.todo_lists["Work"])[0]
+    rng = random.Random(7)
+    for n in range(200):
+        name = rng.choice(["Work", "Home"])
+        if rng.random() < 0.6 or not manager.todo_lists[name]:
+            manager.add_item_to_todo_list(name, f"Task {n}", rng.choice([None, 0, 1]),
+                                          rng.choice([None, "2023-11-01", "2023-11-02"]))
+        else:
+            manager.remove_item_from_todo_list(name, rng.randrange(len(manager.todo_lists[name])))
+        if n % 50 == 0:
+            manager.undo()
+        expected = run_query(manager.todo_lists, list(manager.todo_lists), DueDateIndex(), order='due_date')
+        assert manager.query(order='due_date') == expected
+    # The list kept in due date order was updated in place instead of being sorted again
+    assert manager._due_index.entries("Work", manager.todo_lists["Work"])[0] is ordered
+
+def test_due_date_index_with_batches(manager):
+    manager.query(order='due_date')
+    with manager.batch():
+        manager.add_item_to_todo_list("Work", "Invoice", 5, "2023-10-30")
+        assert names(manager.query(order='due_date', limit=1)) == [("Work", "Invoice")]
+        manager.remove_item_from_todo_list("Work", 0)
+        manager.change_todo_list_name("Work", "Office")
+    assert names(manager.query(order='due_date', limit=3)) == [("Office", "Invoice"), ("Home", "Dishes"), ("Home", "Garden")]
+    assert [item_data.item for item_data in manager._due_index.entries("Office", manager.todo_lists["Office"])[0]] == [
+        "Invoice", "Email", "Meeting", "Slides"]
+
+def test_query_invalid_arguments(manager):
+    assert manager.query(due_before="11/10/2023") == "Due date must be in YYYY-MM-DD format."
+    assert manager.query(max_priority=-1) == "Priority must be a non-negative integer."
+    assert manager.query(limit="3") == "Limit must be a non-negative integer."
+    assert manager.query(order='name') == "Order must be 'priority' or 'due_date'."
+    assert manager.query(lists=["Garage"]) == "No TodoList named Garage found."
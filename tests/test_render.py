@@ -0,0 +1,119 @@
+from todopkg import AsyncTodoListManager, TodoListManager
+from todopkg.items import SortedItemList, TodoItem
+from todopkg.render import write_grid
+from datetime import date
+import pytest
+import asyncio
+import io
+import sys
+
+# Fixture for manager setup
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.json")
+    return TodoListManager(str(filename))
+
+# Grid table printed by tabulate for the same items
+def tabulate_grid(items):
+    tabulate = pytest.importorskip("tabulate").tabulate
+    rows = [[item_data['item'], 'N/A' if item_data['priority'] == float('inf') else item_data['priority'],
+             item_data['due_date'].strftime('%Y-%m-%d') if item_data['due_date'] else 'No due date']
+            for item_data in items]
+    return tabulate(rows, ["Item", "Priority", "Due Date"], tablefmt="grid") + "\n"
+
+def render(items, sample=None):
+    stream = io.StringIO()
+    write_grid(stream, items, sample)
+    return stream.getvalue()
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for write_grid function
+@pytest.mark.parametrize("items", [
+    [TodoItem("Report", 1, date(2023, 11, 10)), TodoItem("Email"), TodoItem("Call the bank", 12)],
+    [TodoItem("Report", 1, date(2023, 11, 10)), TodoItem("Email", 3)],
+    [TodoItem("12", 1), TodoItem(7), TodoItem("-3")],
+    [TodoItem("1.50", 1), TodoItem("10"), TodoItem(2.25, 2), TodoItem("1e3")],
+    [TodoItem("first line\nsecond, longer line", 1), TodoItem("  padded  ")],
+    [TodoItem(""), TodoItem(None, 4), TodoItem(True)],
+    [TodoItem("Ünïcødé ✓", 0, date(2024, 2, 29))],
+    [TodoItem("  12  ", 1), TodoItem("3")],
+    [TodoItem("1,000.5", 1), TodoItem("1"), TodoItem("True")],
+    [TodoItem("True", 1), TodoItem("False")],
+    [TodoItem("\n  indented\nlast\n", 1), TodoItem("12\n"), TodoItem("a\r\nb")],
+])
+def test_write_grid_matches_tabulate(items):
+    assert render(items) == tabulate_grid(items)
+
+def test_write_grid_long_list():
+    items = SortedItemList(TodoItem(f"Task {n}" * (n % 7), n % 13 if n % 5 else None,
+                                    date.fromordinal(738000 + n % 400) if n % 3 else None) for n in range(5000))
+    assert render(items) == tabulate_grid(items)
+
+def test_write_grid_sample_truncates():
+    items = [TodoItem("Short", 1), TodoItem("A much longer item name", 2)]
+    lines = render(items, sample=1).splitlines()
+    assert lines[1] == "| Item   |   Priority | Due Date    |"
+    assert lines[5] == "| A m... |          2 | No due date |"
+    assert len({len(line) for line in lines}) == 1
+
+def test_write_grid_accepts_dictionaries():
+    items = [{'item': 'Report', 'priority': 1, 'due_date': date(2023, 11, 10)}]
+    assert render(items) == render([TodoItem("Report", 1, date(2023, 11, 10))])
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for print_all_todo_lists options
+def test_print_limit_and_offset(capsys, manager):
+    manager.create_todo_list('Work')
+    manager.add_items('Work', [(f"Task {n}", n) for n in range(10)])
+    capsys.readouterr()
+    manager.print_all_todo_lists('Work', limit=3, offset=4)
+    out = capsys.readouterr().out
+    assert [line.split('|')[1].strip() for line in out.splitlines() if line.startswith('| Task')] == ["Task 4", "Task 5", "Task 6"]
+    assert "Showing items 5-7 of 10." in out
+    manager.print_all_todo_lists('Work', offset=20)
+    assert "No items to show, the TodoList has 10 items." in capsys.readouterr().out
+    assert manager.print_all_todo_lists('Work', limit=-1) == "Limit must be a non-negative integer."
+
+def test_print_to_stream(capsys, manager):
+    manager.create_todo_list('Work')
+    manager.add_item_to_todo_list('Work', 'Task 1', 1, '2023-11-20')
+    capsys.readouterr()
+    stream = io.StringIO()
+    assert manager.print_all_todo_lists(file=stream)
+    assert capsys.readouterr().out == ""
+    assert stream.getvalue() == (
+        "--------------------------\nTodo List: Work\n--------------------------\n"
+        + render(manager.todo_lists['Work']) + "\n")
+
+def test_print_other_table_format(capsys, manager):
+    pytest.importorskip("tabulate")
+    manager.create_todo_list('Work')
+    manager.add_item_to_todo_list('Work', 'Task 1', 1, '2023-11-20')
+    manager.print_all_todo_lists('Work', tablefmt="simple")
+    assert "Task 1           1  2023-11-20" in capsys.readouterr().out
+
+def test_print_without_tabulate(capsys, manager, monkeypatch):
+    monkeypatch.setitem(sys.modules, "tabulate", None)
+    manager.create_todo_list('Work')
+    manager.add_item_to_todo_list('Work', 'Task 1', 1)
+    assert manager.print_all_todo_lists('Work')
+    assert "| Task 1 |          1 | No due date |" in capsys.readouterr().out
+    stream = io.StringIO()
+    assert manager.print_all_todo_lists('Work', tablefmt="simple", file=stream) == \
+        "The simple table format requires the tabulate package."
+    assert capsys.readouterr().out == ""
+    assert stream.getvalue().endswith("The simple table format requires the tabulate package.\n")
+
+def test_aio_print_options(tmpdir):
+    stream = io.StringIO()
+    async def main():
+        manager = await AsyncTodoListManager.open(str(tmpdir.join("todo.json")))
+        await manager.create_todo_list('Work')
+        await manager.add_items('Work', [(f"Task {n}", n) for n in range(5)])
+        return await manager.print_all_todo_lists('Work', limit=2, offset=1, sample=1, tablefmt="grid", file=stream)
+    assert asyncio.run(main())
+    out = stream.getvalue()
+    assert [line.split('|')[1].strip() for line in out.splitlines() if line.startswith('| Task')] == ["Task 1", "Task 2"]
+    assert "Showing items 2-3 of 5." in out
+#--------------------------------------------------------------------------------------------
@@ -0,0 +1,53 @@
+from todopkg.restore import restore_todo_lists
+from datetime import date
+import pytest
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for restore_todo_lists function
+def test_restore_todo_lists_sorted(capsys):
+    data = {
+        "Work": [
+            {"item": "Email", "priority": "Infinity", "due_date": None},
+            {"item": "Report", "priority": 2, "due_date": "2023-12-01"},
+            {"item": "Slides", "priority": 2, "due_date": "2023-11-20"},
+            {"item": "Review", "priority": 1, "due_date": None},
+        ]
+    }
+    todo_lists = restore_todo_lists(data, {})
+    assert [item['item'] for item in todo_lists['Work']] == ["Review", "Slides", "Report", "Email"]
+    assert todo_lists['Work'][1]['due_date'] == date(2023, 11, 20)
+    assert todo_lists['Work'][3]['priority'] == float('inf')
+
+def test_restore_todo_lists_invalid_root():
+    with pytest.raises(ValueError, match="The file does not contain a valid todo list format."):
+        restore_todo_lists(["Work"], {})
+
+def test_restore_todo_lists_invalid_tasks():
+    todo_lists = {}
+    data = {"Home": [], "Work": ["Report"]}
+    with pytest.raises(ValueError, match="Tasks for Work are not in a valid format."):
+        restore_todo_lists(data, todo_lists)
+    assert todo_lists == {}  # nothing is applied when validation fails
+
+def test_restore_todo_lists_invalid_priority():
+    data = {"Work": [{"item": "Report", "priority": "High", "due_date": None}]}
+    with pytest.raises(ValueError, match="Invalid priority for Report in Work."):
+        restore_todo_lists(data, {})
+
+def test_restore_todo_lists_skips_rejected_items(capsys):
+    existing = {"Work": [{"item": "Report", "priority": 1, "due_date": None}]}
+    data = {
+        "Work": [
+            {"item": "Report", "priority": 3, "due_date": None},
+            {"item": "Slides", "priority": -1, "due_date": None},
+            {"item": "Essay", "priority": 1, "due_date": "2024-02-30"},
+            {"item": "Email", "priority": 0, "due_date": None},
+        ]
+    }
+    todo_lists = restore_todo_lists(data, existing)
+    assert [item['item'] for item in todo_lists['Work']] == ["Email", "Report"]
+    captured = capsys.readouterr()
+    assert "Item Report already exists in the TodoList Work." in captured.out
+    assert "Priority must be a non-negative integer." in captured.out
+    assert "Due date must be in YYYY-MM-DD format." in captured.out
+#--------------------------------------------------------------------------------------------
@@ -0,0 +1,85 @@
+from todopkg import TodoListManager
+from todopkg.storage import ShardedJsonBackend, convert_store, open_backend
+import json
+import os
+import pytest
+
+# Fixture for a manager stored in a sharded directory with a few lists
+@pytest.fixture
+def manager(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.shards")), backend=ShardedJsonBackend(str(tmpdir.join("todo.shards")), 4))
+    for n in range(8):
+        manager.create_todo_list(f"List {n}")
+        manager.add_items(f"List {n}", [(f"Task {i}", i % 3, "2023-11-10" if i % 2 else None) for i in range(5)])
+    return manager
+
+def shard_files(manager):
+    return {file for file in os.listdir(manager.filename) if file.startswith("shard-")}
+
+def manifest(manager):
+    with open(os.path.join(manager.filename, "manifest.json")) as f:
+        return json.load(f)
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for writing a sharded store
+def test_sharded_round_trip(manager):
+    assert manifest(manager)['shard_count'] == 4
+    assert len(shard_files(manager)) == 4
+    restarted = TodoListManager(manager.filename)
+    assert list(restarted.todo_lists) == list(manager.todo_lists)
+    assert restarted.todo_lists == manager.todo_lists
+
+def test_only_changed_shards_are_rewritten(manager):
+    before = shard_files(manager)
+    manager.add_item_to_todo_list("List 5", "New task", 1)
+    after = shard_files(manager)
+    assert len(after - before) == 1 and len(before - after) == 1
+    manager.save_to_file()
+    assert shard_files(manager) == after
+
+def test_rename_only_rewrites_the_manifest(manager):
+    before = shard_files(manager)
+    manager.change_todo_list_name("List 3", "Renamed")
+    assert shard_files(manager) == before
+    assert ["Renamed", 3] in manifest(manager)['lists']
+    manager.create_todo_list("List 3")
+    manager.add_item_to_todo_list("List 3", "Other task")
+    restarted = TodoListManager(manager.filename)
+    assert len(restarted.todo_lists["Renamed"]) == 5
+    assert [item_data.item for item_data in restarted.todo_lists["List 3"]] == ["Other task"]
+
+def test_delete_and_crash_leftovers(manager):
+    open(os.path.join(manager.filename, "shard-9-999.json"), 'w').close()
+    restarted = TodoListManager(manager.filename)
+    restarted.delete_todo_list("List 0")
+    assert "shard-9-999.json" not in shard_files(manager) and len(shard_files(manager)) == 4
+    restarted = TodoListManager(manager.filename)
+    assert "List 0" not in restarted.todo_lists and len(restarted.todo_lists) == 7
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for loading and opening sharded stores
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_parallel_load(manager, pool):
+    backend = ShardedJsonBackend(manager.filename, workers=2, pool=pool)
+    todo_lists = backend.load({})
+    assert list(todo_lists) == list(manager.todo_lists)
+    assert todo_lists == manager.todo_lists
+    assert todo_lists["List 1"].has_item("Task 4")
+
+def test_open_backend_sharded(tmpdir):
+    assert isinstance(open_backend(str(tmpdir.join("todo.shards"))), ShardedJsonBackend)
+    assert isinstance(open_backend(str(tmpdir.join("store")), 'sharded'), ShardedJsonBackend)
+    with pytest.raises(ValueError, match="Journal mode"):
+        TodoListManager(str(tmpdir.join("todo.shards")), journal=True)
+    with pytest.raises(ValueError, match="Shard count"):
+        ShardedJsonBackend(str(tmpdir.join("todo.shards")), 0)
+
+def test_invalid_manifest(tmpdir):
+    tmpdir.mkdir("todo.shards").join("manifest.json").write('{"format": 2}')
+    with pytest.raises(ValueError, match="not a todopkg shard manifest"):
+        ShardedJsonBackend(str(tmpdir.join("todo.shards"))).load({})
+
+def test_convert_to_sharded(manager, tmpdir):
+    assert convert_store(manager.filename, str(tmpdir.join("todo.json"))) == 8
+    assert convert_store(str(tmpdir.join("todo.json")), str(tmpdir.join("copy.shards"))) == 8
+    assert TodoListManager(str(tmpdir.join("copy.shards"))).todo_lists == manager.todo_lists
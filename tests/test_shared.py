@@ -0,0 +1,102 @@
+from todopkg import TodoListManager
+from todopkg.locking import StoreLock
+from todopkg import shutdown
+import multiprocessing
+import json
+import pytest
+
+pytestmark = pytest.mark.skipif(not StoreLock.available(), reason="shared mode needs fcntl")
+
+PROCESSES = 4
+ADDS_PER_PROCESS = 25
+
+# Fixture for two managers sharing one json file, like two worker processes would
+@pytest.fixture
+def managers(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    first = TodoListManager(filename, shared=True)
+    second = TodoListManager(filename, shared=True)
+    return first, second
+
+# Worker process adding items to its own list and to a list every worker uses
+def add_items_worker(filename, worker, start):
+    manager = TodoListManager(filename, shared=True)
+    shutdown.unregister(manager)
+    start.wait()
+    manager.create_todo_list(f"Worker {worker}")
+    for n in range(ADDS_PER_PROCESS):
+        manager.add_item_to_todo_list(f"Worker {worker}", f"Task {n}", n % 3)
+        manager.add_item_to_todo_list("Common", f"Task {worker}-{n}")
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for shared mode
+def test_shared_writes_merge(managers):
+    first, second = managers
+    first.create_todo_list("Work")
+    second.create_todo_list("Home")
+    first.add_item_to_todo_list("Work", "Report", 1)
+    second.add_item_to_todo_list("Home", "Laundry")
+    with open(first.filename, 'r') as f:
+        data = json.load(f)
+    assert [task["item"] for task in data["Work"]] == ["Report"]
+    assert [task["item"] for task in data["Home"]] == ["Laundry"]
+
+def test_shared_reads_see_other_processes(managers):
+    first, second = managers
+    first.create_todo_list("Work")
+    first.add_item_to_todo_list("Work", "Report", 1)
+    assert second.refresh()
+    assert not second.refresh()
+    assert [item_data.item for item_data in second.todo_lists["Work"]] == ["Report"]
+    # Mutators refresh on their own before validating
+    assert second.add_item_to_todo_list("Work", "Report") == "Item already exists in the TodoList."
+
+def test_shared_batch_merges_on_write(managers):
+    first, second = managers
+    first.create_todo_list("Work")
+    second.refresh()
+    with second.batch():
+        second.add_item_to_todo_list("Work", "Email", 2)
+        first.add_item_to_todo_list("Work", "Report", 1)
+        first.create_todo_list("Home")
+    assert [item_data.item for item_data in second.todo_lists["Work"]] == ["Report", "Email"]
+    assert "Home" in second.todo_lists
+
+def test_shared_conflicting_records_are_dropped(managers):
+    first, second = managers
+    first.create_todo_list("Work")
+    second.refresh()
+    with second.batch():
+        second.add_item_to_todo_list("Work", "Email")
+        first.delete_todo_list("Work")
+    assert second.todo_lists == {}
+    with open(first.filename, 'r') as f:
+        assert json.load(f) == {}
+
+def test_shared_processes_lose_no_updates(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    manager = TodoListManager(filename, shared=True)
+    manager.create_todo_list("Common")
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    workers = [context.Process(target=add_items_worker, args=(filename, worker, start))
+               for worker in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    start.set()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+    manager.refresh()
+    assert len(manager.todo_lists["Common"]) == PROCESSES * ADDS_PER_PROCESS
+    for worker in range(PROCESSES):
+        assert len(manager.todo_lists[f"Worker {worker}"]) == ADDS_PER_PROCESS
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# One test function for shared mode options
+def test_shared_requires_plain_json(tmpdir):
+    with pytest.raises(ValueError, match="Shared mode is only available"):
+        TodoListManager(str(tmpdir.join("todo.db")), shared=True)
+    with pytest.raises(ValueError, match="Shared mode is only available"):
+        TodoListManager(str(tmpdir.join("todo.json")), shared=True, journal=True)
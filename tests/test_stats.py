@@ -0,0 +1,57 @@
+from todopkg import TodoListManager
+import os
+import pytest
+
+# Fixture for an instrumented manager stored in a temporary json file
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("test_todo.json")
+    return TodoListManager(str(filename), instrument=True)
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for the stats method
+def test_operation_timers(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report", 1)
+    manager.add_item_to_todo_list("Work", "Email")
+    manager.show_all_items_in_todo_list("Work")
+    operations = manager.stats()['operations']
+    assert set(operations) == {'create_todo_list', 'add_item_to_todo_list', 'show_all_items_in_todo_list'}
+    timer = operations['add_item_to_todo_list']
+    assert timer['calls'] == 2
+    assert 0 < timer['max_seconds'] <= timer['seconds']
+    assert timer['mean_seconds'] == pytest.approx(timer['seconds'] / 2)
+
+def test_saves_and_bytes_written(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [f"Task {n}" for n in range(20)])
+    stats = manager.stats()
+    assert stats['saves'] == 2
+    assert stats['sorts'] == 1
+    assert stats['bytes_written'] > os.path.getsize(manager.filename)
+
+def test_journal_bytes(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("test_todo.json")), journal=True, instrument=True)
+    manager.create_todo_list("Work")
+    manager.save_to_file()
+    written = manager.stats(reset=True)['bytes_written']
+    assert written >= os.path.getsize(manager.filename)
+    manager.add_item_to_todo_list("Work", "Report")
+    assert 0 < manager.stats()['bytes_written'] < 100
+
+def test_reset_and_disabled(manager, tmpdir):
+    manager.create_todo_list("Work")
+    assert manager.stats(reset=True)['saves'] == 1
+    assert manager.stats() == {'operations': {}, 'sorts': 0, 'saves': 0, 'bytes_written': 0}
+    plain = TodoListManager(str(tmpdir.join("plain.json")))
+    assert plain.stats() == "Statistics are only collected by a manager created with instrument=True."
+
+def test_sorts_per_manager(manager, tmpdir):
+    other = TodoListManager(str(tmpdir.join("other.json")), instrument=True)
+    other.create_todo_list("Home")
+    other.add_items("Home", [f"Chore {n}" for n in range(20)])
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [f"Task {n}" for n in range(20)])
+    manager.add_items("Work", [f"Call {n}" for n in range(20)])
+    assert manager.stats()['sorts'] == 2
+    assert other.stats()['sorts'] == 1
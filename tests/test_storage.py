@@ -0,0 +1,190 @@
+from todopkg import TodoListManager
+from todopkg import CustomEncoder
+from todopkg.items import thread_sorts
+from todopkg.storage import JsonFileBackend, LazyTodoLists, SqliteBackend, open_backend, scan_json_index
+from datetime import date
+import pytest
+import json
+import sqlite3
+
+# Fixture for a manager stored in an SQLite database
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.db")
+    manager = TodoListManager(str(filename))
+    return manager
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for open_backend function
+def test_open_backend_from_extension(tmpdir):
+    assert isinstance(open_backend(str(tmpdir.join("todo.json"))), JsonFileBackend)
+    assert isinstance(open_backend(str(tmpdir.join("todo.db"))), SqliteBackend)
+    assert isinstance(open_backend(str(tmpdir.join("todo.SQLITE3"))), SqliteBackend)
+
+def test_open_backend_explicit(tmpdir):
+    assert isinstance(open_backend(str(tmpdir.join("todo.data")), 'sqlite'), SqliteBackend)
+    backend = JsonFileBackend(str(tmpdir.join("todo.data")))
+    assert open_backend("ignored.db", backend) is backend
+
+def test_open_backend_unknown(tmpdir):
+    with pytest.raises(ValueError, match="Unknown storage backend: yaml"):
+        open_backend(str(tmpdir.join("todo.yaml")), 'yaml')
+
+def test_open_backend_journal_requires_json(tmpdir):
+    with pytest.raises(ValueError, match="Journal mode is only available for the json and binary backends."):
+        TodoListManager(str(tmpdir.join("todo.db")), journal=True)
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for SqliteBackend class
+def test_sqlite_round_trip(manager):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Email")
+    manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+    manager.add_item_to_todo_list("Work", "Slides", 1, "2023-11-09")
+    manager.add_item_to_todo_list("Work", "Plan", 1)
+    manager.create_todo_list("Home")
+    manager.change_todo_list_name("Home", "House")
+    restarted = TodoListManager(manager.filename)
+    assert list(restarted.todo_lists) == ["Work", "House"]
+    sorts = thread_sorts()
+    assert restarted.todo_lists["Work"] == manager.todo_lists["Work"]
+    assert thread_sorts() == sorts  # rows are read in sorted order
+    assert restarted.todo_lists["Work"][0]['due_date'] == date(2023, 11, 9)
+
+def test_sqlite_remove_and_delete(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", ["Email", "Report", "Slides"])
+    manager.remove_item_from_todo_list("Work", 1)
+    manager.create_todo_list("Home")
+    manager.delete_todo_list("Home")
+    restarted = TodoListManager(manager.filename)
+    assert list(restarted.todo_lists) == ["Work"]
+    assert [item['item'] for item in restarted.todo_lists["Work"]] == ["Email", "Slides"]
+
+def test_sqlite_mutation_touches_one_row(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [f"Task {n}" for n in range(100)])
+    connection = manager.backend.connection
+    before = connection.total_changes
+    manager.change_todo_list_name("Work", "Office")
+    assert connection.total_changes - before == 1
+    before = connection.total_changes
+    manager.add_item_to_todo_list("Office", "Email", 3)
+    assert connection.total_changes - before == 1
+
+def test_sqlite_lists_load_lazily(manager):
+    manager.create_todo_list("Work")
+    manager.create_todo_list("Home")
+    manager.add_item_to_todo_list("Home", "Laundry")
+    restarted = TodoListManager(manager.filename)
+    assert isinstance(restarted.todo_lists, LazyTodoLists)
+    assert "Home" in restarted.todo_lists
+    assert not restarted.todo_lists.is_loaded("Home")
+    assert restarted.show_all_items_in_todo_list("Home") == [
+        "Item: Laundry, Priority: No priority specified, Due date: No due date"
+    ]
+    assert restarted.todo_lists.is_loaded("Home")
+    assert not restarted.todo_lists.is_loaded("Work")
+
+def test_sqlite_indexed_columns(manager):
+    manager.create_todo_list("Work")
+    connection = sqlite3.connect(manager.filename)
+    indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    connection.close()
+    assert {"todo_items_order", "todo_items_priority", "todo_items_due_date"} <= indexes
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for save_to_file and load_from_file with SQLite
+def test_sqlite_save_to_file(manager):
+    manager.todo_lists["Imported"] = [{'item': "Email", 'priority': 2, 'due_date': None}]
+    manager.save_to_file()
+    restarted = TodoListManager(manager.filename)
+    assert restarted.todo_lists["Imported"][0]['priority'] == 2
+
+def test_sqlite_save_skips_unchanged_lists(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [f"Task {n}" for n in range(100)])
+    manager.create_todo_list("Home")
+    restarted = TodoListManager(manager.filename)
+    restarted.add_item_to_todo_list("Home", "Laundry")
+    assert len(restarted.todo_lists["Work"]) == 100
+    connection = restarted.backend.connection
+    before = connection.total_changes
+    restarted.save_to_file()
+    restarted._save_at_exit()
+    assert connection.total_changes == before
+    restarted.todo_lists["Work"].add({'item': "Email", 'priority': 1, 'due_date': None})  # no record for it
+    restarted.save_to_file()
+    assert connection.total_changes - before == 201  # only Work is written again
+    assert len(TodoListManager(manager.filename).todo_lists["Work"]) == 101
+
+def test_sqlite_load_missing_file(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.db")))
+    with pytest.raises(FileNotFoundError, match=r"The file .* does not exist."):
+        manager.load_from_file()
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Five test functions for lazy json loading
+def test_lazy_json_loads_lists_on_use(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    manager = TodoListManager(filename, lazy=True)
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+    manager.create_todo_list("Home")
+    manager.add_item_to_todo_list("Home", "Laundry")
+    restarted = TodoListManager(filename, lazy=True)
+    assert isinstance(restarted.todo_lists, LazyTodoLists)
+    assert list(restarted.todo_lists) == ["Work", "Home"]
+    assert not restarted.todo_lists.is_loaded("Work")
+    assert restarted.show_all_items_in_todo_list("Work") == ["Item: Report, Priority: 1, Due date: 2023-11-10"]
+    assert restarted.todo_lists.is_loaded("Work")
+    assert not restarted.todo_lists.is_loaded("Home")
+    assert restarted.todo_lists == manager.todo_lists
+
+def test_lazy_json_writes_same_document(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    manager = TodoListManager(filename, lazy=True)
+    manager.create_todo_list("Wörk \"quoted\"")
+    manager.add_item_to_todo_list("Wörk \"quoted\"", "Rep[ort]", 1, "2023-11-10")
+    manager.create_todo_list("Empty")
+    with open(filename, 'r') as f:
+        assert f.read() == json.dumps(dict(manager.todo_lists), cls = CustomEncoder)
+    assert TodoListManager(filename, lazy=True).todo_lists == manager.todo_lists
+
+def test_lazy_json_scans_without_index(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    data = {
+        "Wörk {1}": [{"item": "Rep\"ort]", "priority": 2, "due_date": "2023-11-10"}],
+        "Home": [],
+        "Garden": [{"item": "Mow", "priority": "Infinity", "due_date": None}],
+    }
+    with open(filename, 'w') as f:
+        json.dump(data, f, indent=2)
+    manager = TodoListManager(filename, lazy=True)
+    assert list(manager.todo_lists) == list(data)
+    assert manager.todo_lists["Wörk {1}"][0]['item'] == "Rep\"ort]"
+    assert manager.todo_lists["Garden"][0]['priority'] == float('inf')
+
+def test_scan_json_index_invalid_data():
+    with pytest.raises(ValueError, match="The file does not contain a valid todo list format."):
+        scan_json_index(b'["Work"]')
+    with pytest.raises(ValueError, match="Tasks for Work are not in a valid format."):
+        scan_json_index(b'{"Work": "Report", "Home": []}')
+    with pytest.raises(ValueError, match="Tasks for Work are not in a valid format."):
+        scan_json_index(b'{"Work": {"item": "Report"}}')
+
+def test_lazy_json_with_journal(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    manager = TodoListManager(filename, lazy=True, journal=True)
+    manager.create_todo_list("Work")
+    manager.create_todo_list("Home")
+    manager.add_item_to_todo_list("Home", "Laundry")
+    restarted = TodoListManager(filename, lazy=True, journal=True)
+    assert not restarted.todo_lists.is_loaded("Work")
+    restarted.add_item_to_todo_list("Home", "Dishes")
+    assert not restarted.todo_lists.is_loaded("Work")
+    assert len(restarted.todo_lists["Home"]) == 2
+#--------------------------------------------------------------------------------------------
@@ -0,0 +1,121 @@
+from todopkg import TodoListManager
+import pytest
+import threading
+import time
+import json
+
+THREADS = 8
+ADDS_PER_THREAD = 50
+
+# Fixture for a manager with two lists
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.json")
+    manager = TodoListManager(str(filename))
+    manager.create_todo_list("Work")
+    manager.create_todo_list("Home")
+    return manager
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(number,)) for number in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+        assert not thread.is_alive()
+
+#--------------------------------------------------------------------------------------------
+# Six test functions for using a manager from several threads
+def test_threads_lose_no_changes(manager):
+    def work(number):
+        for n in range(ADDS_PER_THREAD):
+            manager.add_item_to_todo_list("Work", f"Task {number}-{n}", n % 4)
+            manager.add_item_to_todo_list("Home", f"Chore {number}-{n}")
+            if n % 5 == 0:
+                manager.remove_item_from_todo_list("Home", 0)
+    run_threads(work, THREADS)
+    assert len(manager.todo_lists["Work"]) == THREADS * ADDS_PER_THREAD
+    assert len(manager.todo_lists["Home"]) == THREADS * ADDS_PER_THREAD * 4 // 5
+    work = manager.todo_lists["Work"]
+    assert all(not work[n + 1] < work[n] for n in range(len(work) - 1))
+    assert TodoListManager(manager.filename).todo_lists == manager.todo_lists
+
+def test_list_lock_only_blocks_its_list(manager):
+    results = {}
+    def add(name):
+        results[name] = manager.add_item_to_todo_list(name, "Task")
+    with manager._locks.holding("Work"):
+        work = threading.Thread(target=add, args=("Work",))
+        home = threading.Thread(target=add, args=("Home",))
+        work.start()
+        home.start()
+        # The Home item is added right away, its write waits for a consistent copy of every list
+        deadline = time.monotonic() + 5
+        while not manager.todo_lists["Home"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [item_data.item for item_data in manager.todo_lists["Home"]] == ["Task"]
+        assert len(manager.todo_lists["Work"]) == 0
+    work.join(5)
+    home.join(5)
+    assert results == {"Work": "Item added successfully.", "Home": "Item added successfully."}
+    assert TodoListManager(manager.filename).todo_lists == manager.todo_lists
+
+def test_changes_continue_during_write(manager):
+    writing = threading.Event()
+    release = threading.Event()
+    persist = manager.backend.persist
+    def slow_persist(todo_lists, records):
+        writing.set()
+        release.wait(5)
+        persist(todo_lists, records)
+    manager.backend.persist = slow_persist
+    writer = threading.Thread(target=manager.add_item_to_todo_list, args=("Work", "Report"))
+    writer.start()
+    assert writing.wait(5)
+    # The write runs without the list locks, so this add is not blocked by it
+    manager.backend.persist = persist
+    adder = threading.Thread(target=manager.add_item_to_todo_list, args=("Home", "Laundry"))
+    adder.start()
+    adder.join(0.5)
+    assert manager.todo_lists["Home"][0].item == "Laundry"
+    release.set()
+    writer.join(5)
+    adder.join(5)
+    with open(manager.filename, 'r') as f:
+        data = json.load(f)
+    assert [task["item"] for task in data["Work"]] == ["Report"]
+    assert [task["item"] for task in data["Home"]] == ["Laundry"]
+
+def test_rename_waits_for_list_lock(manager):
+    renamed = threading.Event()
+    with manager._locks.holding("Work"):
+        thread = threading.Thread(target=lambda: manager.change_todo_list_name("Work", "Job") and renamed.set())
+        thread.start()
+        assert not renamed.wait(0.2)
+        manager.todo_lists["Work"].add({"item": "Report", "priority": None, "due_date": None})
+    thread.join(5)
+    assert renamed.is_set()
+    assert [item_data.item for item_data in manager.todo_lists["Job"]] == ["Report"]
+    assert manager.add_item_to_todo_list("Work", "Email") == "No TodoList named Work found."
+
+def test_missing_list_holds_store_lock(manager):
+    created = threading.Event()
+    with manager._locks.holding("Garden"):
+        thread = threading.Thread(target=lambda: manager.create_todo_list("Garden") and created.set())
+        thread.start()
+        assert not created.wait(0.2)
+    thread.join(5)
+    assert created.is_set()
+
+def test_batch_blocks_other_threads(manager):
+    results = []
+    with manager.batch():
+        manager.add_item_to_todo_list("Work", "Report")
+        thread = threading.Thread(target=lambda: results.append(manager.add_item_to_todo_list("Home", "Laundry")))
+        thread.start()
+        thread.join(0.2)
+        assert results == []
+    thread.join(5)
+    assert results == ["Item added successfully."]
+    assert TodoListManager(manager.filename).todo_lists == manager.todo_lists
+#--------------------------------------------------------------------------------------------
@@ -316,7 +316,7 @@ def test_save_to_file_overwrite(manager):
 #--------------------------------------------------------------------------------------------
 
 #--------------------------------------------------------------------------------------------
-# Three test functions for load_from_file function
+# Four test functions for load_from_file function
 def test_load_from_empty_file(manager):
     if os.path.exists(manager.filename):
         os.remove(manager.filename)
@@ -344,6 +344,17 @@ def test_load_from_invalid_data(manager, tmpdir):
         f.write(sample_data)
     with pytest.raises(Exception):
         manager.load_from_file()
+
+def test_load_from_file_does_not_write(manager, tmpdir):
+    sample_data = {"Groceries": [{"item": "Milk", "priority": 1, "due_date": "2023-11-10"}]}
+    filename = tmpdir.join("todo.json")
+    with open(str(filename), 'w') as f:
+        json.dump(sample_data, f)
+    mtime = os.stat(str(filename)).st_mtime_ns
+    os.utime(str(filename), ns=(mtime - 10**9, mtime - 10**9))
+    manager.load_from_file()
+    assert os.stat(str(filename)).st_mtime_ns == mtime - 10**9
+    assert manager.todo_lists['Groceries'][0]['item'] == "Milk"
 #--------------------------------------------------------------------------------------------
 
 #--------------------------------------------------------------------------------------------
@@ -0,0 +1,160 @@
+from todopkg import AsyncTodoListManager, TodoListManager
+from todopkg.transfer import chunked, read_tasks, task_format
+import asyncio
+import io
+import json
+import pytest
+
+CSV_TASKS = """list,item,priority,due_date
+Work,Report,1,2023-11-10
+Work,Email,,
+Work,Report,2,
+Home,Dishes,high,
+Home,Laundry,3,2023-13-01
+,Orphan,,
+Home,Vacuum,0,2023-1-5
+"""
+
+# Fixture for a manager stored in a temporary json file
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("test_todo.json")
+    return TodoListManager(str(filename))
+
+# Fixture for a manager with a few lists to export
+@pytest.fixture
+def filled(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [("Report", 1, "2023-11-10"), "Email", ("Café, \"draft\"", 0)])
+    manager.create_todo_list("Home")
+    manager.add_items("Home", [("Dishes", None, "2023-12-01")])
+    return manager
+
+#--------------------------------------------------------------------------------------------
+# Seven test functions for the import_tasks method
+def test_import_csv(manager, tmpdir):
+    tmpdir.join("tasks.csv").write(CSV_TASKS)
+    report = manager.import_tasks(str(tmpdir.join("tasks.csv")))
+    assert report == {'imported': 3, 'rejected': [(4, "Item already exists in the TodoList."),
+                                                  (5, "Priority must be a non-negative integer."),
+                                                  (6, "Due date must be in YYYY-MM-DD format."),
+                                                  (7, "Row must have a list name and an item.")]}
+    assert manager.show_all_items_in_todo_list("Work") == [
+        "Item: Report, Priority: 1, Due date: 2023-11-10",
+        "Item: Email, Priority: No priority specified, Due date: No due date"]
+    assert manager.show_all_items_in_todo_list("Home") == ["Item: Vacuum, Priority: 0, Due date: 2023-01-05"]
+    assert TodoListManager(manager.filename).todo_lists == manager.todo_lists
+
+def test_import_ndjson_rejects(manager, tmpdir):
+    lines = ['{"list": "Work", "item": "Report", "priority": 2}', 'not json', '[1, 2]', '',
+             '{"list": "Work", "item": "Plan", "due_date": 20231110}',
+             '{"list": "Work", "item": "Plan", "priority": -1}',
+             '{"list": "Work", "item": "Plan", "priority": null, "due_date": "2023-11-10"}']
+    tmpdir.join("tasks.jsonl").write("\n".join(lines))
+    report = manager.import_tasks(str(tmpdir.join("tasks.jsonl")))
+    assert report == {'imported': 2, 'rejected': [(2, "Row is not valid JSON."), (3, "Row must be a JSON object."),
+                                                  (5, "Due date must be in YYYY-MM-DD format."),
+                                                  (6, "Priority must be a non-negative integer.")]}
+    assert [item_data.item for item_data in manager.todo_lists["Work"]] == ["Report", "Plan"]
+
+def test_import_chunks_and_existing_lists(manager, tmpdir):
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Task 3")
+    rows = ["list,item"] + [f"{'Work' if n % 2 else 'Home'},Task {n}" for n in range(10)]
+    tmpdir.join("tasks.csv").write("\n".join(rows))
+    events = []
+    manager.subscribe(events.append)
+    report = manager.import_tasks(str(tmpdir.join("tasks.csv")), create_lists=False, chunk_size=3)
+    assert report['imported'] == 4
+    assert report['rejected'] == [(2, "No TodoList named Home found."), (4, "No TodoList named Home found."),
+                                  (5, "Item already exists in the TodoList.")] + \
+        [(n, "No TodoList named Home found.") for n in (6, 8, 10)]
+    assert [event.kind for event in events] == ["add"] * 4
+    assert len(manager.todo_lists["Work"]) == 5
+
+def test_import_errors(manager, tmpdir):
+    tmpdir.join("tasks.csv").write("name,task\nWork,Report\n")
+    assert manager.import_tasks(str(tmpdir.join("tasks.csv"))) == \
+        "CSV files need a header row with 'list' and 'item' columns."
+    assert manager.import_tasks(str(tmpdir.join("tasks.txt"))) == \
+        f"Can't tell the format of {tmpdir.join('tasks.txt')}, pass format='csv' or format='ndjson'."
+    assert manager.import_tasks(str(tmpdir.join("tasks.txt")), format="xml") == "Unknown format xml, use 'csv' or 'ndjson'."
+    assert manager.import_tasks(str(tmpdir.join("missing.csv"))).startswith("Could not open")
+    assert manager.import_tasks(str(tmpdir.join("tasks.csv")), chunk_size=0) == "Chunk size must be a positive integer."
+    assert manager.todo_lists == {}
+
+def test_import_invalid_utf8(manager, tmpdir):
+    tmpdir.join("tasks.csv").write_binary(b"\xef\xbb\xbflist,item\nWork,Report\nWork,Caf\xe9\nHome,\"Two\nlines \xff\"\n"
+                                          b"Home,Dishes\n")
+    assert manager.import_tasks(str(tmpdir.join("tasks.csv"))) == {
+        'imported': 2, 'rejected': [(3, "Row is not valid UTF-8."), (5, "Row is not valid UTF-8.")]}
+    tmpdir.join("tasks.ndjson").write_binary(b'{"list": "Garden", "item": "Caf\xe9"}\n{"list": "Home", "item": "Laundry"}\n')
+    assert manager.import_tasks(str(tmpdir.join("tasks.ndjson"))) == {
+        'imported': 1, 'rejected': [(1, "Row is not valid UTF-8.")]}
+    assert list(manager.todo_lists) == ["Work", "Home"]
+    assert [item_data.item for item_data in manager.todo_lists["Home"]] == ["Dishes", "Laundry"]
+
+def test_import_is_one_undo_step(manager, tmpdir):
+    manager.create_todo_list("Work")
+    tmpdir.join("tasks.csv").write(CSV_TASKS)
+    events = []
+    manager.subscribe(events.append)
+    manager.import_tasks(str(tmpdir.join("tasks.csv")), chunk_size=2)
+    assert [event.kind for event in events] == ["add", "add", "create", "add"]
+    assert manager.undo() is True
+    assert manager.todo_lists == {"Work": []}
+    assert manager.redo() is True
+    assert list(manager.todo_lists) == ["Work", "Home"] and len(manager.todo_lists["Work"]) == 2
+
+def test_import_error_leaves_lists_unchanged(manager, tmpdir, monkeypatch):
+    tmpdir.join("tasks.csv").write(CSV_TASKS)
+    insert_items = manager._insert_items
+    def failing(name, items, added):
+        if name == "Home":
+            raise MemoryError("out of memory")
+        insert_items(name, items, added)
+    monkeypatch.setattr(manager, "_insert_items", failing)
+    with pytest.raises(MemoryError):
+        manager.import_tasks(str(tmpdir.join("tasks.csv")))
+    assert manager.todo_lists == {}
+    assert manager.undo() == "Nothing to undo."
+    assert TodoListManager(manager.filename).todo_lists == {}
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for the export_tasks method and the transfer module
+@pytest.mark.parametrize("extension", ["csv", "ndjson"])
+def test_export_round_trip(filled, tmpdir, extension):
+    target = str(tmpdir.join(f"tasks.{extension}"))
+    assert filled.export_tasks(target) == 4
+    copy = TodoListManager(str(tmpdir.join("copy.json")))
+    assert copy.import_tasks(target) == {'imported': 4, 'rejected': []}
+    assert copy.todo_lists == filled.todo_lists
+    assert list(copy.todo_lists) == ["Work", "Home"]
+
+def test_export_formats(filled, tmpdir):
+    filled.export_tasks(str(tmpdir.join("work.csv")), lists=["Work"])
+    assert tmpdir.join("work.csv").read_text("utf-8").splitlines() == [
+        "list,item,priority,due_date", 'Work,"Café, ""draft""",0,', "Work,Report,1,2023-11-10", "Work,Email,,"]
+    filled.export_tasks(str(tmpdir.join("home.txt")), format="ndjson", lists=["Home"])
+    assert [json.loads(line) for line in tmpdir.join("home.txt").readlines()] == [
+        {'list': "Home", 'item': "Dishes", 'priority': None, 'due_date': "2023-12-01"}]
+    assert filled.export_tasks(str(tmpdir.join("none.csv")), lists=["Garden"]) == "No TodoList named Garden found."
+    assert not tmpdir.join("none.csv").exists()
+    assert sorted(file.basename for file in tmpdir.listdir()) == ["home.txt", "test_todo.json", "work.csv"]
+
+def test_read_tasks_streams():
+    rows = read_tasks(io.StringIO("item,priority,list\nReport,2,Work\n\nEmail,,Work,extra\nPlan\n"), "csv")
+    assert next(rows) == (2, ("Work", "Report", 2, None))
+    assert list(rows) == [(4, ("Work", "Email", None, None)), (5, ('', "Plan", None, None))]
+    assert [len(chunk) for chunk in chunked(iter(range(7)), 3)] == [3, 3, 1]
+    assert task_format("TASKS.JSONL") == "ndjson"
+
+def test_aio_import_export(tmpdir):
+    tmpdir.join("tasks.csv").write(CSV_TASKS)
+    async def main():
+        manager = await AsyncTodoListManager.open(str(tmpdir.join("test_todo.json")))
+        report = await manager.import_tasks(str(tmpdir.join("tasks.csv")))
+        count = await manager.export_tasks(str(tmpdir.join("tasks.ndjson")))
+        return report['imported'], count
+    assert asyncio.run(main()) == (3, 3)
+    assert len(TodoListManager(str(tmpdir.join("test_todo.json"))).todo_lists["Work"]) == 2
@@ -0,0 +1,102 @@
+from todopkg import TodoListManager, TodoStoreView
+from todopkg.items import TodoItem
+from datetime import date
+import pytest
+import io
+
+# Fixture for a binary store with a few lists
+@pytest.fixture
+def manager(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.tdb")))
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+    manager.add_item_to_todo_list("Work", "Email")
+    manager.add_item_to_todo_list("Work", "Réunion ✓", 0)
+    manager.create_todo_list("Empty")
+    return manager
+
+# Fixture for a view of the same store
+@pytest.fixture
+def view(manager):
+    with TodoStoreView(manager.filename) as view:
+        yield view
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for reading lists through a view
+def test_view_lists(view, manager):
+    assert list(view) == ["Work", "Empty"]
+    assert len(view) == 2
+    assert "Work" in view and "Home" not in view
+    assert len(view["Work"]) == 3
+    assert list(view["Work"]) == list(manager.todo_lists["Work"])
+    assert view["Empty"] == []
+
+def test_view_item_access(view):
+    items = view["Work"]
+    assert items[0] == TodoItem("Réunion ✓", 0)
+    assert items[-1]['priority'] == float('inf')
+    assert items[1]['due_date'] == date(2023, 11, 10)
+    with pytest.raises(IndexError):
+        items[3]
+    with pytest.raises(KeyError):
+        view["Home"]
+
+def test_view_slices_are_lazy(view):
+    tail = view["Work"][1:]
+    assert len(tail) == 2
+    assert tail[0].item == "Report"
+    assert [item_data.item for item_data in view["Work"][::2]] == ["Réunion ✓", "Email"]
+    assert len(view["Work"][5:]) == 0
+
+def test_view_matches_manager_output(view, manager, capsys):
+    assert view.show_all_items_in_todo_list("Work") == manager.show_all_items_in_todo_list("Work")
+    for options in ({}, {'list_name': "Work", 'limit': 1, 'offset': 1}, {'sample': 1}):
+        expected, shown = io.StringIO(), io.StringIO()
+        assert manager.print_all_todo_lists(file=expected, **options) is True
+        assert view.print_all_todo_lists(file=shown, **options) is True
+        assert shown.getvalue() == expected.getvalue()
+    assert view.show_all_items_in_todo_list("Home") == "No TodoList named Home found."
+    capsys.readouterr()
+    for viewer in (manager, view):
+        errors = io.StringIO()
+        assert viewer.print_all_todo_lists("Home", file=errors) is False
+        assert viewer.print_all_todo_lists(limit=-1, file=errors) == "Limit must be a non-negative integer."
+        assert errors.getvalue() == "No TodoList named 'Home' found.\nLimit must be a non-negative integer.\n"
+    assert capsys.readouterr().out == ""
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for refreshing and closing a view
+def test_view_keeps_its_snapshot_until_refresh(view, manager):
+    items = view["Work"]
+    manager.add_item_to_todo_list("Work", "Slides", 2)
+    manager.delete_todo_list("Empty")
+    assert len(items) == 3
+    first = items[0]
+    tail = items[1:]
+    assert view.refresh() is True
+    assert list(view) == ["Work"]
+    assert [item_data.item for item_data in view["Work"]] == ["Réunion ✓", "Report", "Slides", "Email"]
+    assert first.item == "Réunion ✓"
+    for stale in (items, tail):
+        with pytest.raises(ValueError, match="refreshed"):
+            stale[0]
+        with pytest.raises(ValueError, match="refreshed"):
+            list(stale)
+    assert view.refresh() is False
+
+def test_closed_view(manager):
+    view = TodoStoreView(manager.filename)
+    items = view["Work"]
+    view.close()
+    view.close()
+    with pytest.raises(ValueError, match="closed"):
+        items[0]
+
+def test_view_rejects_other_files(tmpdir):
+    manager = TodoListManager(str(tmpdir.join("todo.json")))
+    manager.create_todo_list("Work")
+    with pytest.raises(ValueError, match="not a todopkg binary snapshot"):
+        TodoStoreView(manager.filename)
+    tmpdir.join("empty.tdb").write_binary(b"")
+    with pytest.raises(ValueError, match="not a todopkg binary snapshot"):
+        TodoStoreView(str(tmpdir.join("empty.tdb")))
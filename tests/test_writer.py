@@ -0,0 +1,87 @@
+from todopkg import TodoListManager, CustomEncoder
+from todopkg.writer import JsonStoreWriter, encode_items
+from todopkg.items import SortedItemList, TodoItem
+from datetime import date
+import pytest
+import os
+import json
+
+# Fixture for manager setup
+@pytest.fixture
+def manager(tmpdir):
+    filename = tmpdir.join("todo.json")
+    manager = TodoListManager(str(filename))
+    return manager
+
+#--------------------------------------------------------------------------------------------
+# Three test functions for encode_items function
+def test_encode_items_matches_custom_encoder():
+    items = SortedItemList([
+        TodoItem("Report", 1, date(2023, 11, 10)),
+        TodoItem("Emåil \"draft\"", None, None),
+        TodoItem(None, 0, date(2024, 2, 29)),
+        TodoItem(42, True, None),
+    ])
+    assert encode_items(items) == json.dumps(items, cls = CustomEncoder).encode('ascii')
+
+def test_encode_items_empty_list():
+    assert encode_items(SortedItemList()) == b'[]'
+
+def test_encode_items_plain_dictionaries():
+    items = [{'item': "Report", 'priority': float('inf'), 'due_date': date(2023, 11, 10)}]
+    assert encode_items(items) == b'[{"item": "Report", "priority": Infinity, "due_date": "2023-11-10"}]'
+#--------------------------------------------------------------------------------------------
+
+#--------------------------------------------------------------------------------------------
+# Four test functions for JsonStoreWriter class
+def test_writer_output_matches_json_dump(manager):
+    manager.create_todo_list("Work")
+    manager.add_items("Work", [("Report", 1, "2023-11-10"), "Email", ("Slides", 0)])
+    manager.create_todo_list("Hømé")
+    with open(manager.filename, 'r') as f:
+        assert f.read() == json.dumps(manager.todo_lists, cls = CustomEncoder)
+
+def test_writer_reuses_unchanged_lists(manager, monkeypatch):
+    manager.create_todo_list("Work")
+    manager.create_todo_list("Home")
+    manager.add_item_to_todo_list("Work", "Report")
+    encoded = []
+    import todopkg.writer
+    original = todopkg.writer.encode_items
+    monkeypatch.setattr(todopkg.writer, 'encode_items', lambda items: encoded.append(items) or original(items))
+    manager.add_item_to_todo_list("Home", "Laundry")
+    assert encoded == [manager.todo_lists["Home"]]
+    manager.remove_item_from_todo_list("Work", 0)
+    # Lists are encoded from the copy taken for the write, Home is not encoded again
+    assert len(encoded) == 2 and encoded[-1] == manager.todo_lists["Work"] == []
+    with open(manager.filename, 'r') as f:
+        assert f.read() == '{"Work": [], "Home": [{"item": "Laundry", "priority": Infinity, "due_date": null}]}'
+    assert TodoListManager(manager.filename).todo_lists == manager.todo_lists
+
+def test_writer_failure_keeps_previous_file(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    writer = JsonStoreWriter()
+    writer.write(filename, {"Work": SortedItemList([TodoItem("Report")])})
+    with open(filename, 'rb') as f:
+        before = f.read()
+    class Broken(list):
+        def __iter__(self):
+            raise RuntimeError("disk full")
+    with pytest.raises(RuntimeError):
+        writer.write(filename, {"Work": SortedItemList(), "Home": Broken()})
+    with open(filename, 'rb') as f:
+        assert f.read() == before
+    assert os.listdir(str(tmpdir)) == [os.path.basename(filename)]
+
+def test_writer_copies_unloaded_lazy_lists(tmpdir):
+    filename = str(tmpdir.join("todo.json"))
+    manager = TodoListManager(filename, lazy=True)
+    manager.create_todo_list("Work")
+    manager.add_item_to_todo_list("Work", "Report", 1, "2023-11-10")
+    manager.create_todo_list("Home")
+    restarted = TodoListManager(filename, lazy=True)
+    restarted.add_item_to_todo_list("Home", "Laundry")
+    assert not restarted.todo_lists.is_loaded("Work")
+    assert restarted.todo_lists["Work"] == manager.todo_lists["Work"]
+    assert TodoListManager(filename, lazy=True).todo_lists == restarted.todo_lists
+#--------------------------------------------------------------------------------------------